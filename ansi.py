@@ -0,0 +1,10 @@
+import re
+
+# Escape sequences a terminal consumes without printing: CSI (colours, cursor
+# moves, modes), charset selection and keypad mode switches
+ANSI = re.compile(r"\x1b\[[0-?]*[ -/]*[@-~]|\x1b[()][0-9A-Za-z]|\x1b[=>]")
+
+
+def strip_ansi(text):
+    """``text`` without escape sequences (returned as is when it has none)."""
+    return ANSI.sub("", text) if "\x1b" in text else text
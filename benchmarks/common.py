@@ -0,0 +1,57 @@
+"""Helpers shared by the benchmark scripts."""
+import os
+import resource
+import statistics
+import subprocess
+import sys
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def summarize(samples):
+    """p50/p95/max of a list of seconds, in milliseconds."""
+    if not samples:
+        return None
+    samples = sorted(samples)
+    return {
+        "p50": round(statistics.median(samples) * 1000, 3),
+        "p95": round(samples[max(0, int(len(samples) * 0.95) - 1)] * 1000, 3),
+        "max": round(samples[-1] * 1000, 3),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except OSError:
+        return None
+
+
+def bench_identities(directory):
+    """Point models at a throwaway vault, under an ephemeral key, whose default profiles log in as bench/bench."""
+    import base64
+    import models
+    os.environ["NEUROSSH_VAULT_KEY"] = base64.urlsafe_b64encode(os.urandom(32)).decode()
+    store = models.IdentityStore(os.path.join(directory, "identities.yaml"))
+    store.unlock()
+    for profile in ("DEV", "PROD"):
+        store.set(profile, "bench", "bench")
+    models.IDENTITIES = store
+    return store
+
+
+def start_server(*args):
+    """Launch benchmarks.fakeserver (with extra command-line ``args``) in a child process; returns (process, port)."""
+    server = subprocess.Popen([sys.executable, "-m", "benchmarks.fakeserver", *args],
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    return server, int(server.stdout.readline())
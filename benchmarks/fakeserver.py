@@ -0,0 +1,321 @@
+"""Local paramiko SSH server for benchmarks: accepts any password, echoes the shell.
+
+    python -m benchmarks.fakeserver [--port N] [--host ADDR] [--sftp-root DIR]
+
+Prints the listening port on the first line of stdout, then serves until killed.
+
+Besides echoing input, the shell understands a few commands that generate
+the output patterns the benchmarks need (each ends with ``DONE_MARKER``):
+
+    bulk <bytes>              a `show ... | no-more` style dump, as fast as the window allows
+    top <frames> [ms]         colourised full-screen `top` redraws, optionally paced
+    drip <lines> [ms]         one short line every ``ms`` milliseconds
+    config <lines> [edits] [seed]   a `display set` style config, with ``edits`` lines
+                              changed according to ``seed`` (no marker; meant for exec)
+
+The same commands work over exec channels (without echo or prompt), for
+sequences.run_commands.
+
+The sftp subsystem serves ``--sftp-root`` (a fresh temporary directory by
+default), one subdirectory per local address connected to, so listening on
+0.0.0.0 lets 127.0.0.1, 127.0.0.2... stand in for separate hosts.
+
+It is also a jump host: direct-tcpip channels are connected to whatever
+address they ask for, so one of those hosts can front the others as a
+bastion.
+"""
+import argparse
+import os
+import random
+import select
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+import paramiko
+
+PROMPT = b"bench$ "
+DONE_MARKER = b"__BENCH_DONE__"
+CHUNK = 32768
+
+
+def dump_block(size=1 << 20):
+    """Interface-counter lines, repeated and cut to the requested size."""
+    lines = []
+    for i in range(2000):
+        lines.append(f"ge-0/0/{i % 48}.{i}  up    up   inet 10.{i % 256}.{i // 256}.1/30   "
+                     f"input packets: {i * 7919:>12}  output packets: {i * 104729:>12}\r\n")
+    block = "".join(lines).encode()
+    return (block * (size // len(block) + 1))[:size]
+
+
+BULK = dump_block()
+
+
+def top_frame(n, rows=40, columns=120):
+    """One full-screen redraw: home, header, then SGR-coloured process rows."""
+    rng = random.Random(n)
+    out = [f"\x1b[H\x1b[1mtop - {n:06d} up 42 days,  load average: {rng.random() * 4:.2f}\x1b[0m\x1b[K\r\n",
+           f"\x1b[7m{'  PID USER      %CPU %MEM     TIME+ COMMAND':<{columns}}\x1b[0m\r\n"]
+    for row in range(rows - 3):
+        cpu = rng.random() * 100
+        colour = 31 if cpu > 80 else 33 if cpu > 40 else 32
+        out.append(f"\x1b[{colour}m{rng.randrange(1, 65535):>5}\x1b[0m \x1b[36mroot    \x1b[0m "
+                   f"\x1b[1;{colour}m{cpu:5.1f}\x1b[0m {rng.random() * 10:4.1f} {rng.randrange(9999):>6}:{rng.randrange(60):02d} "
+                   f"rpd-worker-{row}\x1b[K\r\n")
+    return "".join(out).encode()
+
+
+def config_text(lines, edits=0, seed=0):
+    """Set-style configuration lines; ``edits`` of them vary with ``seed``."""
+    out = []
+    for i in range(lines):
+        unit, vlan = i % 48, 100 + i % 3900
+        out.append(f"set interfaces ge-0/0/{unit} unit {i} vlan-id {vlan}\n" if i % 3 else
+                   f"set interfaces ge-0/0/{unit} unit {i} family inet address 10.{i % 256}.{i // 256 % 256}.1/30\n")
+    rng = random.Random(seed)
+    for _ in range(edits if seed else 0):
+        i = rng.randrange(lines)
+        out[i] = f"set interfaces ge-0/0/{i % 48} unit {i} description \"edit {seed}-{rng.randrange(10 ** 6)}\"\n"
+    return "".join(out).encode()
+
+
+def generate(channel, command):
+    """Run a pattern command; returns False if it isn't one."""
+    parts = command.split()
+    if not parts or parts[0] not in ("bulk", "top", "drip", "config"):
+        return False
+    kind, args = parts[0], [int(a) for a in parts[1:]]
+
+    def arg(i, default):
+        return args[i] if len(args) > i else default
+
+    if kind == "config":
+        data = config_text(arg(0, 5000), arg(1, 0), arg(2, 0))
+        for i in range(0, len(data), CHUNK):
+            channel.sendall(data[i:i + CHUNK])
+        return True
+    if kind == "bulk":
+        remaining = arg(0, len(BULK))
+        while remaining > 0:
+            n = min(remaining, len(BULK))
+            for i in range(0, n, CHUNK):
+                channel.sendall(BULK[i:min(i + CHUNK, n)])
+            remaining -= n
+    elif kind == "top":
+        frames, delay = arg(0, 100), arg(1, 0)
+        for n in range(frames):
+            channel.sendall(top_frame(n))
+            if delay:
+                time.sleep(delay / 1000)
+    else:
+        lines, delay = arg(0, 100), arg(1, 10)
+        for n in range(lines):
+            channel.sendall(f"{time.time():.6f} drip {n}\r\n".encode())
+            time.sleep(delay / 1000)
+    channel.sendall(b"\r\n" + DONE_MARKER + b"\r\n")
+    return True
+
+
+class BenchServer(paramiko.ServerInterface):
+    def __init__(self, transport):
+        self.transport = transport
+        self.forwards = {}    # direct-tcpip channel id -> (host, port)
+        self.forwarding = False
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED
+
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        threading.Thread(target=echo_shell, args=(channel,), daemon=True).start()
+        return True
+
+    def check_channel_exec_request(self, channel, command):
+        threading.Thread(target=run_exec, args=(channel, command.decode()), daemon=True).start()
+        return True
+
+    def check_channel_direct_tcpip_request(self, chanid, origin, destination):
+        # The channel itself only turns up in transport.accept(), after this returns
+        if not self.forwarding:
+            self.forwarding = True
+            threading.Thread(target=accept_forwards, args=(self.transport, self.forwards), daemon=True).start()
+        self.forwards[chanid] = destination
+        return paramiko.OPEN_SUCCEEDED
+
+
+class LocalHandle(paramiko.SFTPHandle):
+    def stat(self):
+        return paramiko.SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+
+
+class LocalSFTP(paramiko.SFTPServerInterface):
+    """The sftp subsystem: plain file access under one root directory."""
+
+    def __init__(self, server, root, *args, **kwargs):
+        super().__init__(server, *args, **kwargs)
+        self.root = root
+
+    def local(self, path):
+        return os.path.join(self.root, self.canonicalize(path).lstrip("/"))
+
+    @staticmethod
+    def attempt(call, *args):
+        try:
+            result = call(*args)
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK if result is None else result
+
+    def open(self, path, flags, attr):
+        def opened():
+            fd = os.open(self.local(path), flags | getattr(os, "O_BINARY", 0), 0o644)
+            handle = LocalHandle(flags)
+            mode = "rb" if not flags & (os.O_WRONLY | os.O_RDWR) else "r+b" if flags & os.O_RDWR else "wb"
+            handle.readfile = handle.writefile = os.fdopen(fd, mode.replace("w", "a") if flags & os.O_APPEND else mode)
+            return handle
+        return self.attempt(opened)
+
+    def list_folder(self, path):
+        def listing():
+            out = []
+            for name in os.listdir(self.local(path)):
+                attr = paramiko.SFTPAttributes.from_stat(os.stat(os.path.join(self.local(path), name)))
+                attr.filename = name
+                out.append(attr)
+            return out
+        return self.attempt(listing)
+
+    def stat(self, path):
+        return self.attempt(lambda: paramiko.SFTPAttributes.from_stat(os.stat(self.local(path))))
+
+    lstat = stat
+
+    def remove(self, path):
+        return self.attempt(os.remove, self.local(path))
+
+    def rename(self, oldpath, newpath):
+        if os.path.exists(self.local(newpath)):
+            return paramiko.SFTP_FAILURE
+        return self.attempt(os.rename, self.local(oldpath), self.local(newpath))
+
+    def posix_rename(self, oldpath, newpath):
+        return self.attempt(os.replace, self.local(oldpath), self.local(newpath))
+
+    def mkdir(self, path, attr):
+        return self.attempt(os.mkdir, self.local(path))
+
+    def rmdir(self, path):
+        return self.attempt(os.rmdir, self.local(path))
+
+    def chattr(self, path, attr):
+        if attr.st_atime is not None and attr.st_mtime is not None:
+            return self.attempt(os.utime, self.local(path), (attr.st_atime, attr.st_mtime))
+        return paramiko.SFTP_OK
+
+
+def run_exec(channel, command):
+    # Let paramiko answer the exec request before output (and close) go out; on
+    # a busy single-CPU box with dozens of transports 10 ms was not always enough
+    time.sleep(0.1)
+    if not generate(channel, command):
+        channel.sendall(command.encode() + b"\n")
+    channel.send_exit_status(0)
+    channel.close()
+
+
+def accept_forwards(transport, forwards):
+    """Hand each direct-tcpip channel of a transport to a tunnel thread."""
+    while transport.is_active():
+        channel = transport.accept(1)
+        destination = forwards.pop(channel.get_id(), None) if channel else None
+        if destination:
+            threading.Thread(target=tunnel, args=(channel, destination), daemon=True).start()
+
+
+def tunnel(channel, destination):
+    try:
+        sock = socket.create_connection(destination, 10)
+    except OSError:
+        channel.close()
+        return
+    ends = {channel: sock, sock: channel}
+    try:
+        while True:
+            for end in select.select(list(ends), [], [])[0]:
+                data = end.recv(CHUNK)
+                if not data:
+                    return
+                ends[end].sendall(data)
+    except OSError:
+        pass
+    finally:
+        channel.close()
+        sock.close()
+
+
+def echo_shell(channel):
+    channel.sendall(PROMPT)
+    line = b""
+    while True:
+        data = channel.recv(65536)
+        if not data:
+            return
+        channel.sendall(data)
+        # Enter sends CR; scripted sessions (PromptSession) send LF, as a PTY allows
+        line += data.replace(b"\r\n", b"\r").replace(b"\n", b"\r")
+        while b"\r" in line:
+            command, line = line.split(b"\r", 1)
+            command = command.rsplit(b"\x15", 1)[-1]  # ^U kills the line typed so far
+            if command.strip() == b"exit":
+                channel.send_exit_status(0)
+                channel.close()
+                return
+            channel.sendall(b"\n")
+            generate(channel, command.decode(errors="replace"))
+            channel.sendall(PROMPT)
+
+
+def serve(port=0, host="127.0.0.1", sftp_root=None):
+    """Start accepting in a background thread; returns the bound port."""
+    key = paramiko.RSAKey.generate(2048)
+    sftp_root = sftp_root or tempfile.mkdtemp(prefix="neurossh-sftp-")
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(1024)
+
+    def accept():
+        while True:
+            conn, _ = sock.accept()
+            transport = paramiko.Transport(conn)
+            transport.add_server_key(key)
+            root = os.path.join(sftp_root, conn.getsockname()[0])
+            os.makedirs(root, exist_ok=True)
+            transport.set_subsystem_handler("sftp", paramiko.SFTPServer, LocalSFTP, root)
+            transport.start_server(server=BenchServer(transport))
+    threading.Thread(target=accept, daemon=True).start()
+    return sock.getsockname()[1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Echo SSH server for NeuroSSH benchmarks")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--sftp-root")
+    args = parser.parse_args()
+    print(serve(args.port, args.host, args.sftp_root), flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,70 @@
+"""Opening many devices behind one jump host: connect time, handshakes and echo latency.
+
+    python -m benchmarks.jump_bench [--devices 10 100] [--json out.json]
+
+The fake server listens on 0.0.0.0; 127.0.0.1 plays the bastion and
+127.0.0.2, 127.0.0.3... the devices behind it. Each round opens a shell to
+every device at once, the way a folder connect does, first directly and
+then through the bastion, and reports the time until all are up, the
+number of SSH handshakes it took and the echo round trip on each shell.
+"""
+import argparse
+import json
+import time
+
+from benchmarks.common import summarize, git_commit, start_server
+from pool import POOL, CONNECTOR
+
+# Echo round trips timed per run, spread over the open shells
+ECHO_SAMPLES = 200
+
+
+def echo(channel):
+    sent = time.perf_counter()
+    channel.send(b"x")
+    while b"x" not in channel.recv(1024):
+        pass
+    return time.perf_counter() - sent
+
+
+def run(port, devices, jump):
+    started = time.monotonic()
+    futures = [CONNECTOR.submit(POOL.open_shell, f"127.0.0.{i + 2}", port, "bench", "bench", jump=jump)
+               for i in range(devices)]
+    channels = [future.result()[0] for future in futures]
+    connect = time.monotonic() - started
+    handshakes = len(POOL.entries)
+    time.sleep(0.5)  # let the prompts land
+    for channel in channels:
+        channel.recv(65536)
+    latencies = [echo(channels[n % devices]) for n in range(ECHO_SAMPLES)]
+    for channel in channels:
+        channel.close()
+    POOL.close_all()
+    return {"connect_s": round(connect, 3), "handshakes": handshakes, "echo_ms": summarize(latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    server, port = start_server("--host", "0.0.0.0")
+    try:
+        result = {"commit": git_commit(), "runs": {}}
+        for devices in args.devices:
+            result["runs"][str(devices)] = {
+                "direct": run(port, devices, None),
+                "jump": run(port, devices, ("127.0.0.1", port, "bastion", "bench")),
+            }
+    finally:
+        server.kill()
+    print(json.dumps(result))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Quick-connect palette latency: index build and per-keystroke search over a large archive.
+
+    python -m benchmarks.palette_bench [--sessions 50000] [--json out.json]
+
+Builds a SessionIndex over a synthetic archive (role-site-number names,
+10.x.y.z hosts, site/floor folders, DEV/PROD profiles) and times every
+prefix of each query, the way the palette searches as the user types.
+Reports p50/p95/max per query; the palette aims for under 10 ms.
+"""
+import argparse
+import json
+import random
+import time
+
+from benchmarks.common import summarize, git_commit
+from models import SessionConfig
+from palette import SessionIndex
+
+ROLES = ["core", "edge", "access", "dist", "fw", "lb", "wan", "oob"]
+SITES = ["ams", "fra", "lon", "nyc", "sfo", "sin", "syd", "tyo", "dev", "lab"]
+QUERIES = ["10.0", "10.2.3.4", "dev", "F1", "core-ams", "edge nyc", "access-lon-01234", "PROD fw", "crore-ams"]
+
+
+class ListStore:
+    """Just enough of SessionStore for SessionIndex."""
+
+    def __init__(self, configs):
+        self.configs = configs
+
+    def all(self):
+        return self.configs
+
+    def subscribe(self, callback):
+        pass
+
+
+def archive(count, rng):
+    configs = []
+    for n in range(count):
+        site = rng.choice(SITES)
+        configs.append(SessionConfig(name=f"{rng.choice(ROLES)}-{site}-{n:05d}",
+                                     host=f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}",
+                                     folder=f"{site.upper()}/F{rng.randrange(1, 10)}",
+                                     profile=rng.choice(["DEV", "PROD"])))
+    return configs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50000)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    configs = archive(args.sessions, random.Random(0))
+    started = time.perf_counter()
+    index = SessionIndex(ListStore(configs))
+    result = {"commit": git_commit(), "sessions": args.sessions,
+              "build_s": round(time.perf_counter() - started, 3), "queries": {}}
+    for query in QUERIES:
+        samples = []
+        for end in range(1, len(query) + 1):
+            started = time.perf_counter()
+            index.search(query[:end])
+            samples.append(time.perf_counter() - started)
+        result["queries"][query] = summarize(samples)
+    print(json.dumps(result))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
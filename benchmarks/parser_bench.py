@@ -0,0 +1,61 @@
+"""Terminal parser ingest rate: plain pyte.Stream against fastpath.FastStream.
+
+    python -m benchmarks.parser_bench [--mb 4] [--json out.json] [file...]
+
+Feeds the fake server's `no-more` dump and `top` redraws (plus any saved
+sessions, logs or .cast recordings given) through a 120x40 screen with
+scrollback in 32 KB pieces, the way the reader hands them over, and prints
+MB/s for both parsers. Each input is also checked for identical final
+screens, so a speedup never comes at the cost of a different picture.
+"""
+import argparse
+import json
+import time
+
+import pyte
+
+from benchmarks.common import git_commit
+from benchmarks.fakeserver import BULK, top_frame
+from fastpath import FastStream, differential, read_output
+from scrollback import Scrollback, ScrollbackScreen
+
+PIECE = 32768
+
+
+def rate(stream_class, text):
+    stream = stream_class(ScrollbackScreen(120, 40, Scrollback()))
+    started = time.perf_counter()
+    for i in range(0, len(text), PIECE):
+        stream.feed(text[i:i + PIECE])
+    return len(text.encode("utf-8")) / (time.perf_counter() - started) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=float, default=4, help="size of each generated input")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("files", nargs="*")
+    args = parser.parse_args()
+
+    size = int(args.mb * 1e6)
+    bulk = BULK.decode()
+    top = top_frame(0).decode()
+    inputs = {"bulk": (bulk * (size // len(bulk) + 1))[:size],
+              "top": "".join(top_frame(n).decode() for n in range(size // len(top) + 1))}
+    for path in args.files:
+        inputs[path] = read_output(path)
+
+    result = {"commit": git_commit(), "inputs": {}}
+    for name, text in inputs.items():
+        pyte_rate, fast_rate = rate(pyte.Stream, text), rate(FastStream, text)
+        result["inputs"][name] = {"mb": round(len(text) / 1e6, 2), "pyte_mb_s": round(pyte_rate, 2),
+                                  "fast_mb_s": round(fast_rate, 2), "speedup": round(fast_rate / pyte_rate, 2),
+                                  "identical": differential(text[:2_000_000], PIECE) is None}
+    print(json.dumps(result))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
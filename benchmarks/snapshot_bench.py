@@ -0,0 +1,66 @@
+"""Config snapshot throughput and store growth across many hosts.
+
+    python -m benchmarks.snapshot_bench [--hosts 200] [--lines 20000] [--edits 10] [--json out.json]
+
+Each host is a separate loopback address on the fake server (up to 254), so
+every one gets its own SSH connection. Runs three rounds into a scratch
+store: a cold pull, the same configs again, and configs with ``--edits``
+lines changed, printing seconds, configs/s and the bytes each round added
+to the store against the raw config volume.
+"""
+import argparse
+import json
+import tempfile
+import time
+
+from benchmarks.common import git_commit, start_server, bench_identities
+from models import SessionConfig
+from snapshots import SnapshotStore, take_snapshots, SNAPSHOT_WORKERS
+
+
+def timed(configs, command, store, workers):
+    started = time.perf_counter()
+    snaps = take_snapshots(configs, command, store, workers)
+    elapsed = time.perf_counter() - started
+    failed = [s.error for s in snaps if s.error]
+    if failed:
+        raise SystemExit(f"snapshot failed: {failed[0]}")
+    return {"seconds": round(elapsed, 2), "configs_s": round(len(snaps) / elapsed, 1),
+            "raw_mb": round(sum(s.size for s in snaps) / 1e6, 1), "changed": sum(s.changed for s in snaps),
+            "stored_kb": round(sum(s.stored for s in snaps) / 1024, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=20000)
+    parser.add_argument("--edits", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=SNAPSHOT_WORKERS)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    configs = [SessionConfig(name=f"bench{i}", host=f"127.0.0.{i}") for i in range(1, min(args.hosts, 254) + 1)]
+    with tempfile.TemporaryDirectory(prefix="neurossh-snapshots-") as root:
+        bench_identities(root)
+        server, port = start_server("--host", "0.0.0.0")
+        try:
+            for config in configs:
+                config.port = port
+            store = SnapshotStore(root)
+            result = {"commit": git_commit(), "hosts": len(configs), "lines": args.lines, "workers": args.workers}
+            result["cold"] = timed(configs, f"config {args.lines}", store, args.workers)
+            result["unchanged"] = timed(configs, f"config {args.lines}", store, args.workers)
+            result["edited"] = timed(configs, f"config {args.lines} {args.edits} 1", store, args.workers)
+            result["store_objects"], store_bytes = store.usage()
+            result["store_kb"] = round(store_bytes / 1024, 1)
+            store.close()
+        finally:
+            server.kill()
+    print(json.dumps(result))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
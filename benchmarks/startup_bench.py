@@ -0,0 +1,96 @@
+"""Time from interpreter start to an interactive archive tree.
+
+    python -m benchmarks.startup_bench [--sessions 10000] [--runs 5] [--json out.json]
+
+Writes a synthetic sessions.yaml with ``--sessions`` entries into a temp
+directory, then launches the app headless in fresh interpreters: the first
+run starts without a session cache, the rest start from the cache it left
+behind. Each run reports seconds from process spawn to ``import main``
+finishing and to the first frame with the tree populated. For reference,
+an empty Textual app with a Tree takes roughly 0.4 s to its first frame on
+the same machine, so that is the floor for ``ready_s``.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import git_commit
+
+
+def write_archive(path, sessions):
+    import yaml
+    folders = max(1, sessions // 100)
+    data = [{"id": f"s{i:06d}", "name": f"router-{i:05d}", "host": f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+             "port": 22, "folder": f"SITE-{i % folders:03d}", "profile": "DEV", "scrollback": 100000,
+             "log": "off", "pacing": 0, "tags": ["core"] if i % 7 == 0 else []} for i in range(sessions)]
+    with open(path, "w") as f:
+        yaml.dump(data, f, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper))
+
+
+def child(directory, spawned):
+    import base64
+    # Ephemeral vault key without importing cryptography up front
+    os.environ["NEUROSSH_VAULT_KEY"] = base64.urlsafe_b64encode(os.urandom(32)).decode()
+    import main
+    imported = time.time() - spawned
+    import models
+    models.IDENTITIES = main.IDENTITIES = models.IdentityStore(os.path.join(directory, "identities.yaml"))
+    main.LOCAL_VAULT = os.path.join(directory, "sessions.yaml")
+    result = {}
+
+    async def auto_pilot(pilot):
+        await pilot.pause()
+        tree = pilot.app.query_one("#session-tree")
+        result["ready_s"] = round(time.time() - spawned, 4)
+        result["tree_folders"] = len(tree.root.children)
+        pilot.app.exit()
+
+    main.NeuroSSH().run(headless=True, auto_pilot=auto_pilot)
+    result["import_s"] = round(imported, 4)
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--spawned", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.spawned)
+        return
+
+    directory = tempfile.mkdtemp(prefix="neurossh-startup-")
+    write_archive(os.path.join(directory, "sessions.yaml"), args.sessions)
+    runs = []
+    for _ in range(args.runs):
+        out = subprocess.run([sys.executable, "-m", "benchmarks.startup_bench", "--child", directory,
+                              "--spawned", repr(time.time())], capture_output=True, text=True)
+        if out.returncode:
+            print(out.stderr, file=sys.stderr)
+            sys.exit(1)
+        runs.append(json.loads(out.stdout.splitlines()[-1]))
+    cached = runs[1:] or runs
+    result = {
+        "commit": git_commit(),
+        "sessions": args.sessions,
+        "first": runs[0],
+        "cached_import_s": round(statistics.median(r["import_s"] for r in cached), 4),
+        "cached_ready_s": round(statistics.median(r["ready_s"] for r in cached), 4),
+    }
+    print(json.dumps(result))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
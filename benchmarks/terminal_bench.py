@@ -0,0 +1,220 @@
+"""End-to-end benchmark: N CyberTerminals in a headless NeuroSSH against a local fake server.
+
+    python -m benchmarks.terminal_bench [--sessions 1 10 25] [--bulk-bytes N] [--json out.json]
+
+Each session count runs in a fresh interpreter (so memory figures are not
+polluted by the previous run) and reports, as JSON:
+
+    connect_s             time until every tab has an open shell
+    rss_per_session_kb    resident memory added per connected tab
+    idle_cpu_pct          process CPU while every tab sits at a prompt
+    echo_ms               keystroke -> echoed byte fed to the screen (active tab)
+    bulk / top / drip     bytes/s ingested, frames painted, render time per
+                          frame and CPU for a `no-more` dump, full-screen
+                          `top` redraws and a slow drip (plus its line latency)
+    exec                  sequences.run_commands throughput over exec channels
+
+Compare runs across commits with the ``commit`` field. The backend follows
+$NEUROSSH_BACKEND, as in the app.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import rss_mb, summarize, git_commit, start_server, bench_identities
+from benchmarks.fakeserver import DONE_MARKER
+
+ECHO_SAMPLES = 50
+IDLE_SECONDS = 3.0
+PATTERN_TIMEOUT = 120
+DRIP = re.compile(rb"(\d+\.\d{6}) drip")
+
+
+def isolate(directory):
+    """Point the app at throwaway session/identity files and an ephemeral vault key."""
+    import main
+    main.IDENTITIES = bench_identities(directory)
+    main.LOCAL_VAULT = os.path.join(directory, "sessions.yaml")
+    return main
+
+
+def bench_terminal_class(base):
+    """CyberTerminal subclass that times the ingest and render paths."""
+
+    class BenchTerminal(base):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.reset_counters()
+            self._tail = b""
+
+        def reset_counters(self):
+            self.bytes_in = 0
+            self.feed_time = 0.0
+            self.frames = 0
+            self.frame_time = 0.0
+            self.lines_rendered = 0
+            self.markers = 0
+            self.drip_latency = []
+
+        def feed_output(self, data):
+            started = time.perf_counter()
+            super().feed_output(data)
+            self.feed_time += time.perf_counter() - started
+            self.bytes_in += len(data)
+            window = self._tail + data
+            self.markers += window.count(DONE_MARKER)
+            self._tail = window[-(len(DONE_MARKER) - 1):]
+            now = time.time()
+            self.drip_latency.extend(now - float(ts) for ts in DRIP.findall(data))
+
+        def flush_frame(self):
+            started = time.perf_counter()
+            super().flush_frame()
+            self.frame_time += time.perf_counter() - started
+            self.frames += 1
+
+        def render_line(self, y):
+            started = time.perf_counter()
+            strip = super().render_line(y)
+            self.frame_time += time.perf_counter() - started
+            self.lines_rendered += 1
+            return strip
+
+    return BenchTerminal
+
+
+async def wait_for(condition, timeout=PATTERN_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("benchmark step timed out")
+        await asyncio.sleep(0.002)
+
+
+async def run_pattern(terminals, command):
+    """Send ``command`` to every tab and wait for all of them to finish it."""
+    for t in terminals:
+        t.reset_counters()
+    cpu, started = time.process_time(), time.monotonic()
+    for t in terminals:
+        t.send_input(command + "\r")
+    await wait_for(lambda: all(t.markers for t in terminals))
+    elapsed = time.monotonic() - started
+    cpu = time.process_time() - cpu
+    active = terminals[0]
+    total = sum(t.bytes_in for t in terminals)
+    return {
+        "seconds": round(elapsed, 3),
+        "bytes": total,
+        "mb_per_s": round(total / elapsed / 1e6, 2),
+        "feed_ms": round(sum(t.feed_time for t in terminals) * 1000, 1),
+        "frames": active.frames,
+        "render_ms_per_frame": round(active.frame_time / max(1, active.frames) * 1000, 3),
+        "cpu_pct": round(cpu / elapsed * 100, 1),
+    }
+
+
+def bench_exec(configs, size):
+    from sequences import run_commands
+    commands = [f"bulk {size}"] * 3
+    started = time.monotonic()
+    results = run_commands(configs, commands)
+    elapsed = time.monotonic() - started
+    total = sum(len(item.output) for host in results for item in host.results)
+    errors = sum(1 for host in results if host.error) + sum(1 for host in results for item in host.results if item.error)
+    return {"seconds": round(elapsed, 3), "commands": len(configs) * len(commands),
+            "mb_per_s": round(total / elapsed / 1e6, 2), "errors": errors}
+
+
+def run_one(port, sessions, bulk_bytes):
+    directory = tempfile.mkdtemp(prefix="neurossh-bench-")
+    main = isolate(directory)
+    from models import SessionConfig
+    from transport import get_backend
+    main.CyberTerminal = bench_terminal_class(main.CyberTerminal)
+    configs = [SessionConfig(name=f"bench{i}", host="127.0.0.1", port=port, folder="BENCH", id=f"bench{i}")
+               for i in range(sessions)]
+    result = {"commit": git_commit(), "backend": get_backend(), "python": sys.version.split()[0],
+              "sessions": sessions}
+
+    async def drive():
+        app = main.NeuroSSH()
+        async with app.run_test(size=(160, 50)) as pilot:
+            await pilot.pause(0.2)
+            baseline = rss_mb()
+            started = time.monotonic()
+            for i, conf in enumerate(configs):
+                app.open_session(conf, focus=(i == 0))
+            await wait_for(lambda: len(app.query(main.CyberTerminal)) == sessions)
+            terminals = list(app.query(main.CyberTerminal))
+            await wait_for(lambda: all(t.writer for t in terminals) and all(t.bytes_in for t in terminals))
+            result["connect_s"] = round(time.monotonic() - started, 3)
+
+            await pilot.pause(0.5)
+            cpu = time.process_time()
+            await pilot.pause(IDLE_SECONDS)
+            result["idle_cpu_pct"] = round((time.process_time() - cpu) / IDLE_SECONDS * 100, 2)
+            result["rss_per_session_kb"] = round((rss_mb() - baseline) * 1024 / sessions, 1)
+
+            active, latencies = terminals[0], []
+            for _ in range(ECHO_SAMPLES):
+                before = active.bytes_in
+                sent = time.perf_counter()
+                active.send_input("x")
+                await wait_for(lambda: active.bytes_in > before, 5)
+                latencies.append(time.perf_counter() - sent)
+                await asyncio.sleep(0.01)
+            result["echo_ms"] = summarize(latencies)
+            active.send_input("\x15")  # clear the typed line
+
+            result["bulk"] = await run_pattern(terminals, f"bulk {bulk_bytes}")
+            result["top"] = await run_pattern(terminals, "top 300")
+            result["top"]["frames_per_s"] = round(result["top"]["frames"] / result["top"]["seconds"], 1)
+            result["drip"] = await run_pattern(terminals, "drip 200 10")
+            result["drip"]["latency_ms"] = summarize(active.drip_latency)
+
+    asyncio.run(drive())
+    result["exec"] = bench_exec(configs, bulk_bytes // 10)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 25])
+    parser.add_argument("--bulk-bytes", type=int, default=1_000_000)
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.port:
+        print(json.dumps(run_one(args.port, args.sessions[0], args.bulk_bytes)))
+        return
+
+    server, port = start_server()
+    results = []
+    try:
+        for sessions in args.sessions:
+            out = subprocess.run([sys.executable, "-m", "benchmarks.terminal_bench", "--port", str(port),
+                                  "--sessions", str(sessions), "--bulk-bytes", str(args.bulk_bytes)],
+                                 capture_output=True, text=True)
+            if out.returncode:
+                print(f"{sessions} sessions failed:\n{out.stderr}", file=sys.stderr)
+                continue
+            result = json.loads(out.stdout.splitlines()[-1])
+            results.append(result)
+            print(json.dumps(result))
+    finally:
+        server.kill()
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
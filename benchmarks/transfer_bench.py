@@ -0,0 +1,67 @@
+"""Bulk SFTP transfer throughput: one file to and from many hosts at once.
+
+    python -m benchmarks.transfer_bench [--hosts 8] [--mb 32] [--workers 16] [--json out.json]
+
+Each host is a separate loopback address (127.0.0.1, 127.0.0.2...) on the
+fake server, so every one gets its own SSH connection and SFTP root. Runs a
+cold upload, the same upload again (every target current, nothing sent) and
+a download of the uploaded file from every host, printing aggregate MB/s.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.common import git_commit, start_server, bench_identities
+from models import SessionConfig
+from transfer import TransferJob, TRANSFER_WORKERS
+
+
+def timed(job):
+    started = time.perf_counter()
+    job.run()
+    elapsed = time.perf_counter() - started
+    failed = [item.error for item in job.items if item.status == "failed"]
+    if failed:
+        raise SystemExit(f"transfer failed: {failed[0]}")
+    sent = sum(item.done - item.resumed for item in job.items if item.status == "done")
+    return {"seconds": round(elapsed, 3), "mb_s": round(sent / elapsed / 1e6, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=8)
+    parser.add_argument("--mb", type=float, default=32, help="size of the file sent to each host")
+    parser.add_argument("--workers", type=int, default=TRANSFER_WORKERS)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="neurossh-transfer-") as scratch:
+        root, local = os.path.join(scratch, "remote"), os.path.join(scratch, "local")
+        os.makedirs(local)
+        bench_identities(scratch)
+        server, port = start_server("--host", "0.0.0.0", "--sftp-root", root)
+        try:
+            source = os.path.join(local, "image.bin")
+            with open(source, "wb") as f:
+                f.write(os.urandom(int(args.mb * 1e6)))
+            configs = [SessionConfig(name=f"bench{i}", host=f"127.0.0.{i}", port=port)
+                       for i in range(1, args.hosts + 1)]
+            for config in configs:
+                os.makedirs(os.path.join(root, config.host, "tmp"))
+            result = {"commit": git_commit(), "hosts": args.hosts, "mb": args.mb, "workers": args.workers}
+            result["upload"] = timed(TransferJob(configs, "upload", [source], "/tmp", workers=args.workers))
+            result["upload_current"] = timed(TransferJob(configs, "upload", [source], "/tmp", workers=args.workers))
+            result["download"] = timed(TransferJob(configs, "download", [], "/tmp/image.bin",
+                                                   local_dir=os.path.join(local, "downloads"), workers=args.workers))
+        finally:
+            server.kill()
+    print(json.dumps(result))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Compare the paramiko and asyncssh backends: threads, memory and echo latency.
+
+    python -m benchmarks.transport_bench [--sessions 10 100 500] [--backend paramiko asyncssh] [--json out.json]
+
+Every (backend, sessions) pair runs in a fresh interpreter against a local
+echo server (benchmarks.fakeserver), with one SSH connection per session so
+nothing is shared through the pool. Each session gets the same plumbing the
+app uses: a ChannelReader thread for paramiko, a TerminalSession callback on
+the event loop for asyncssh.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.common import rss_mb, summarize, git_commit, start_server
+
+# Echo round trips timed per run, spread over the open sessions
+ECHO_SAMPLES = 200
+
+
+def bench_paramiko(port, sessions):
+    from pool import POOL, CONNECTOR
+    from reader import ChannelReader
+
+    started = time.monotonic()
+    futures = [CONNECTOR.submit(POOL.open_shell, "127.0.0.1", port, f"bench{i}", "bench")
+               for i in range(sessions)]
+    shells = []
+    for future in futures:
+        channel, _ = future.result()
+        ready = threading.Event()
+        reader = ChannelReader(channel, ready.set)
+        reader.start()
+        shells.append((channel, reader, ready))
+    connect = time.monotonic() - started
+    time.sleep(0.5)  # let the prompts land
+    threads, rss = threading.active_count(), rss_mb()
+
+    latencies = []
+    for n in range(ECHO_SAMPLES):
+        channel, reader, ready = shells[n % sessions]
+        reader.drain()
+        ready.clear()
+        sent = time.perf_counter()
+        channel.send(b"x")
+        ready.wait(5)
+        latencies.append(time.perf_counter() - sent)
+    for channel, reader, _ in shells:
+        reader.stop()
+        channel.close()
+    POOL.close_all()
+    return connect, threads, rss, latencies
+
+
+def bench_asyncssh(port, sessions):
+    from pool import CONNECT_WORKERS
+    from transport import ASYNC_POOL
+
+    async def run():
+        limit = asyncio.Semaphore(CONNECT_WORKERS)
+        waiters = {}
+
+        async def open_one(i):
+            def on_data(data):
+                waiter = waiters.pop(i, None)
+                if waiter and not waiter.done():
+                    waiter.set_result(None)
+            async with limit:
+                channel, _ = await ASYNC_POOL.open_shell("127.0.0.1", port, f"bench{i}", "bench",
+                                                         on_data, lambda exc: None)
+            return channel
+
+        started = time.monotonic()
+        channels = await asyncio.gather(*(open_one(i) for i in range(sessions)))
+        connect = time.monotonic() - started
+        await asyncio.sleep(0.5)
+        threads, rss = threading.active_count(), rss_mb()
+
+        loop = asyncio.get_running_loop()
+        latencies = []
+        for n in range(ECHO_SAMPLES):
+            i = n % sessions
+            waiters[i] = loop.create_future()
+            sent = time.perf_counter()
+            channels[i].send(b"x")
+            await asyncio.wait_for(waiters[i], 5)
+            latencies.append(time.perf_counter() - sent)
+        for channel in channels:
+            channel.close()
+        ASYNC_POOL.close_all()
+        return connect, threads, rss, latencies
+
+    return asyncio.run(run())
+
+
+def run_one(backend, port, sessions):
+    import reader, transport  # noqa: F401 -- keep import cost out of the per-session figure
+    baseline = rss_mb()
+    bench = bench_asyncssh if backend == "asyncssh" else bench_paramiko
+    connect, threads, rss, latencies = bench(port, sessions)
+    return {
+        "commit": git_commit(),
+        "backend": backend,
+        "sessions": sessions,
+        "connect_s": round(connect, 3),
+        "threads": threads,
+        "rss_mb": round(rss, 1),
+        "rss_per_session_kb": round((rss - baseline) * 1024 / sessions, 1),
+        "echo_ms": summarize(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--backend", nargs="+", default=["paramiko", "asyncssh"],
+                        choices=["paramiko", "asyncssh"])
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.port:
+        # Child run: one backend, one session count, JSON on stdout
+        print(json.dumps(run_one(args.backend[0], args.port, args.sessions[0])))
+        return
+
+    server, port = start_server()
+    try:
+        results = []
+        for sessions in args.sessions:
+            for backend in args.backend:
+                out = subprocess.run([sys.executable, "-m", "benchmarks.transport_bench", "--port", str(port),
+                                      "--backend", backend, "--sessions", str(sessions)],
+                                     capture_output=True, text=True, env=dict(os.environ, NEUROSSH_BACKEND=backend))
+                if out.returncode:
+                    print(f"{backend} x{sessions} failed:\n{out.stderr}", file=sys.stderr)
+                    continue
+                result = json.loads(out.stdout.splitlines()[-1])
+                results.append(result)
+                echo = result["echo_ms"]
+                print(f"{backend:<9} {sessions:>4} sessions  threads={result['threads']:<5} "
+                      f"rss={result['rss_mb']:>7.1f}MB ({result['rss_per_session_kb']:.0f}KB/session)  "
+                      f"connect={result['connect_s']:.2f}s  echo p50={echo['p50']:.2f}ms p95={echo['p95']:.2f}ms")
+    finally:
+        server.kill()
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
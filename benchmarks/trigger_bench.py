@@ -0,0 +1,100 @@
+"""Output trigger overhead: terminal ingest with and without triggers.
+
+    python -m benchmarks.trigger_bench [--mb 2] [--patterns 0 10 100 500] [--tabs 100] [--json out.json]
+
+Generates syslog-style triggers (``%FAC-N-MNEMONIC``, some case-insensitive,
+a few regexes and instant prompts) and feeds the fake server's bulk dump
+and `top` redraws, with matching lines sprinkled in, through a 120x40
+screen in 32 KB pieces, the way feed_output does, spread round-robin over
+``--tabs`` tabs that share one compiled set. Prints MB/s for the parser
+alone, the trigger scan alone and both, and the scan's cost as a
+percentage of the parser's (the no-trigger baseline).
+"""
+import argparse
+import json
+import random
+import time
+
+from benchmarks.common import git_commit
+from benchmarks.fakeserver import BULK, top_frame
+from fastpath import FastStream
+from scrollback import Scrollback, ScrollbackScreen
+from triggers import Trigger, TriggerSet, TriggerScanner
+
+PIECE = 32768
+FACILITIES = ["BGP", "LINK", "LINEPROTO", "OSPF", "SYS", "SEC", "CDP", "ISIS", "LDP", "PIM", "SNMP", "NTP"]
+
+
+def make_triggers(count, rng):
+    triggers = [Trigger("more", "--More--", "respond", response=" ", instant=True),
+                Trigger("error", "error:", "alert", ignore_case=True),
+                Trigger("peer", r"%BGP-5-ADJCHANGE: neighbor (?P<peer>\S+)", "capture")][:count]
+    while len(triggers) < count:
+        mnemonic = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(rng.randrange(5, 12)))
+        pattern = f"%{rng.choice(FACILITIES)}-{rng.randrange(8)}-{mnemonic}"
+        triggers.append(Trigger(f"t{len(triggers)}", pattern, rng.choice(["highlight", "alert"]),
+                                ignore_case=len(triggers) % 5 == 0))
+    return triggers
+
+
+def sprinkle(text, triggers, rng, every=200):
+    """Insert a line matching a random trigger after every ``every``-th line."""
+    lines = text.split("\n")
+    for i in range(every, len(lines), every):
+        if triggers:
+            sample = rng.choice(triggers).pattern.replace(r"(?P<peer>\S+)", "10.0.0.1").replace("\\", "")
+            lines[i] = f"Oct 18 12:00:00 router {sample} state changed\r"
+    return "\n".join(lines)
+
+
+def rate(text, trigger_set, tabs, feed=True, scan=True):
+    streams = [FastStream(ScrollbackScreen(120, 40, Scrollback())) for _ in range(tabs)]
+    scanners = [TriggerScanner(trigger_set) for _ in range(tabs)] if trigger_set else None
+    started = time.perf_counter()
+    for n, i in enumerate(range(0, len(text), PIECE)):
+        piece = text[i:i + PIECE]
+        if scan and scanners:
+            piece, _ = scanners[n % tabs].scan(piece)
+        if feed:
+            streams[n % tabs].feed(piece)
+    return len(text.encode("utf-8")) / (time.perf_counter() - started) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=float, default=2, help="size of each generated input")
+    parser.add_argument("--patterns", type=int, nargs="+", default=[0, 10, 100, 500])
+    parser.add_argument("--tabs", type=int, default=100)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    size = int(args.mb * 1e6)
+    bulk = BULK.decode()
+    top = top_frame(0).decode()
+    inputs = {"bulk": (bulk * (size // len(bulk) + 1))[:size],
+              "top": "".join(top_frame(n).decode() for n in range(size // len(top) + 1))}
+    result = {"commit": git_commit(), "tabs": args.tabs, "inputs": {}}
+    for name, base in inputs.items():
+        rate(base[:PIECE * 8], None, 1, scan=False)  # warm the cell caches
+        runs = {}
+        for count in args.patterns:
+            rng = random.Random(count)
+            triggers = make_triggers(count, rng)
+            text = sprinkle(base, triggers, rng)
+            compiled = TriggerSet(triggers) if triggers else None
+            feed_only = rate(text, None, args.tabs, scan=False)
+            scan_only = rate(text, compiled, args.tabs, feed=False) if compiled else None
+            # Overhead as the scan's time against the parser's on the same text:
+            # end-to-end runs differ by more than that from run to run
+            runs[str(count)] = {"feed_mb_s": round(feed_only, 2), "with_triggers_mb_s": round(rate(text, compiled, args.tabs), 2),
+                                "scan_mb_s": round(scan_only, 1) if scan_only else None,
+                                "overhead_pct": round(feed_only / scan_only * 100, 1) if scan_only else 0.0}
+        result["inputs"][name] = runs
+    print(json.dumps(result))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
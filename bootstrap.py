@@ -1,3 +1,4 @@
+import hashlib
 import os
 import sys
 import subprocess
@@ -11,12 +12,19 @@ def print_status(message: str):
 def print_error(message: str):
     print(f"\033[1;31m[!] Error:\033[0m {message}")
 
+def requirements_hash(requirements_file: Path) -> str:
+    """Fingerprint of the dependency list and the interpreter it was installed for."""
+    digest = hashlib.sha256(requirements_file.read_bytes())
+    digest.update(sys.version.encode())
+    return digest.hexdigest()
+
 def setup_and_launch():
     app_dir = Path(__file__).parent
     venv_dir = app_dir / ".venv"
     main_script = app_dir / "main.py"
-    # Added all specific dependencies for the final build
-    requirements = ["textual", "paramiko", "pyte", "cryptography", "PyYAML"]
+    requirements_file = app_dir / "requirements.txt"
+    # Written after a successful install; pip only runs again when requirements.txt changes
+    stamp_file = venv_dir / ".neurossh-deps.sha256"
 
     if not main_script.exists():
         print_error("main.py not found in the current directory.")
@@ -35,15 +43,20 @@ def setup_and_launch():
         python_exe = venv_dir / "bin" / "python"
         pip_exe = venv_dir / "bin" / "pip"
 
-    print_status(f"Syncing dependencies: {', '.join(requirements)}...")
-    try:
-        subprocess.check_call([str(pip_exe), "install", "--upgrade", "pip"], 
-                              stdout=subprocess.DEVNULL)
-        subprocess.check_call([str(pip_exe), "install", *requirements], 
-                              stdout=subprocess.DEVNULL)
-    except subprocess.CalledProcessError as e:
-        print_error(f"Failed to install dependencies: {e}")
-        sys.exit(1)
+    fingerprint = requirements_hash(requirements_file)
+    if stamp_file.exists() and stamp_file.read_text().strip() == fingerprint:
+        print_status("Dependencies up to date.")
+    else:
+        print_status(f"Syncing dependencies from {requirements_file.name}...")
+        try:
+            subprocess.check_call([str(pip_exe), "install", "--upgrade", "pip"], 
+                                  stdout=subprocess.DEVNULL)
+            subprocess.check_call([str(pip_exe), "install", "-r", str(requirements_file)], 
+                                  stdout=subprocess.DEVNULL)
+        except subprocess.CalledProcessError as e:
+            print_error(f"Failed to install dependencies: {e}")
+            sys.exit(1)
+        stamp_file.write_text(fingerprint)
 
     print_status("Launching NeuroSSH Interface...")
     try:
@@ -0,0 +1,118 @@
+import queue
+import threading
+
+from textual.app import ComposeResult
+from textual.message import Message
+from textual.screen import ModalScreen
+from textual.widgets import Static, Button, Select
+from textual.containers import Vertical, Horizontal
+
+
+class BroadcastFailed(Message):
+    """Posted to the app with ``[(target name, reason), ...]`` for a failed fan-out."""
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+
+class Broadcaster:
+    """Fans typed input out to a set of CyberTerminals.
+
+    ``send()`` runs on the UI thread and only enqueues one item, whatever the
+    number of targets. A single thread encodes the payload once and hands it
+    to every target's ChannelWriter, skipping (and reporting) targets that
+    are closed. The writers queue and wait for the SSH window themselves, so
+    one stalled router neither holds up the rest nor drops keystrokes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.targets = ()
+        self.label = ""
+        self.queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def active(self):
+        return bool(self.targets)
+
+    def set_targets(self, terminals, label=""):
+        self.targets = tuple(terminals)
+        self.label = label
+
+    def clear(self):
+        self.targets = ()
+        self.label = ""
+
+    def send(self, data, origin=None):
+        targets = self.targets
+        if origin is not None and origin not in targets:
+            targets = targets + (origin,)
+        self.queue.put((targets, data))
+
+    def _run(self):
+        reported = frozenset()
+        while True:
+            targets, data = self.queue.get()
+            payload = data.encode("utf-8")
+            failures = []
+            for terminal in targets:
+                channel = terminal.channel
+                name = terminal.config.name or terminal.config.host
+                if channel is None or channel.closed or terminal.writer is None:
+                    if not terminal.closed:
+                        failures.append((name, "not connected"))
+                    continue
+                # Each tab's writer coalesces, paces and waits out a full send
+                # window, so a slow target never blocks the others or loses keys
+                terminal.writer.write(payload)
+            # Report when the set of failing targets changes, not on every keystroke
+            failing = frozenset(name for name, _ in failures)
+            if failing and failing != reported:
+                self.app.post_message(BroadcastFailed(failures))
+            reported = failing
+
+
+def broadcast_choices(terminals):
+    """Select options for every folder and tag among the open terminals."""
+    folders = sorted({t.config.folder for t in terminals})
+    tags = sorted({tag for t in terminals for tag in t.config.tags})
+    options = [(f"All open links ({len(terminals)})", ("all", ""))]
+    options.extend((f"Folder: {f}", ("folder", f)) for f in folders)
+    options.extend((f"Tag: {t}", ("tag", t)) for t in tags)
+    return options
+
+
+def select_targets(terminals, choice):
+    kind, value = choice
+    if kind == "folder":
+        return [t for t in terminals if t.config.folder == value]
+    if kind == "tag":
+        return [t for t in terminals if value in t.config.tags]
+    return list(terminals)
+
+
+class BroadcastModal(ModalScreen):
+    """Pick the broadcast target set (all, folder or tag)."""
+
+    def __init__(self, terminals):
+        super().__init__()
+        self.terminals = terminals
+
+    def compose(self) -> ComposeResult:
+        options = broadcast_choices(self.terminals)
+        with Vertical(id="modal-dialog"):
+            yield Static("BROADCAST LINK", id="modal-title")
+            yield Static("Every keystroke in the active tab is mirrored to:", classes="field-label")
+            yield Select(options, id="targets", value=options[0][1], allow_blank=False)
+            with Horizontal(classes="button-row"):
+                yield Button("ENGAGE", id="confirm", classes="btn-neuro-confirm")
+                yield Button("ABORT", id="cancel", classes="btn-neuro-cancel")
+
+    def on_button_pressed(self, event: Button.Pressed):
+        if event.button.id == "confirm":
+            self.dismiss(self.query_one("#targets").value)
+        else:
+            self.dismiss(None)
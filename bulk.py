@@ -0,0 +1,82 @@
+import os
+import time
+
+from rich.markup import escape
+from textual.app import ComposeResult
+from textual.screen import ModalScreen
+from textual.widgets import Static, Button, DataTable
+from textual.containers import Vertical, Horizontal
+
+from pool import CONNECT_WORKERS
+
+# Every connect in a folder batch must finish within this many seconds,
+# including time spent queued behind the connect workers
+BULK_CONNECT_TIMEOUT = float(os.environ.get("NEUROSSH_BULK_TIMEOUT", 60))
+# Result of a tab closed before its connect finished
+CANCELLED = "cancelled"
+
+
+class BulkConnectModal(ModalScreen):
+    """Live progress and summary for a 'connect folder' batch."""
+
+    def __init__(self, folder, configs):
+        super().__init__()
+        self.folder = folder
+        self.configs = {c.id: c for c in configs}
+        self.results = {}
+        self.started = time.monotonic()
+        self.deadline = self.started + BULK_CONNECT_TIMEOUT
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="modal-dialog", classes="bulk-dialog"):
+            yield Static(f"BULK LINK // {self.folder} ({CONNECT_WORKERS} at a time, "
+                         f"{BULK_CONNECT_TIMEOUT:.0f}s limit)", id="modal-title")
+            yield Static(id="bulk-summary")
+            yield DataTable(id="bulk-table", cursor_type="row")
+            with Horizontal(classes="button-row"):
+                yield Button("CLOSE", id="cancel", classes="btn-neuro-cancel")
+
+    def on_mount(self):
+        table = self.query_one("#bulk-table")
+        table.add_column("Host", key="host")
+        table.add_column("Status", key="status")
+        table.add_column("Latency", key="latency")
+        for sid, conf in self.configs.items():
+            table.add_row(escape(conf.name or conf.host), "[yellow]PENDING[/yellow]", "-", key=sid)
+        self.update_summary()
+
+    def record(self, session_id, latency, error=None):
+        """Called by the app for each CyberTerminal.Connected in this batch."""
+        if session_id not in self.configs or session_id in self.results:
+            return
+        self.results[session_id] = (latency, error)
+        table = self.query_one("#bulk-table")
+        if error == CANCELLED:
+            status = "[dim]CANCELLED[/dim]"
+        else:
+            status = f"[red]FAILED: {escape(error)}[/red]" if error else "[green]LINKED[/green]"
+        table.update_cell(session_id, "status", status)
+        table.update_cell(session_id, "latency", f"{latency * 1000:.0f} ms")
+        self.update_summary()
+
+    def cancel(self, session_id):
+        """Called when a tab in this batch is closed; a no-op if its connect already finished."""
+        self.record(session_id, time.monotonic() - self.started, CANCELLED)
+
+    def update_summary(self):
+        cancelled = sum(1 for _, error in self.results.values() if error == CANCELLED)
+        failed = sum(1 for _, error in self.results.values() if error) - cancelled
+        done = len(self.results)
+        text = f"{done}/{len(self.configs)} complete  |  {done - failed - cancelled} linked  |  {failed} failed"
+        if cancelled:
+            text += f"  |  {cancelled} cancelled"
+        if done == len(self.configs):
+            latencies = sorted(l for l, error in self.results.values() if not error)
+            elapsed = time.monotonic() - self.started
+            text += f"  |  total {elapsed:.1f}s"
+            if latencies:
+                text += f"  |  median {latencies[len(latencies) // 2] * 1000:.0f} ms"
+        self.query_one("#bulk-summary").update(text)
+
+    def on_button_pressed(self, event: Button.Pressed):
+        self.dismiss(None)
@@ -0,0 +1,92 @@
+import datetime
+import threading
+
+from rich.markup import escape
+from textual.app import ComposeResult
+from textual.screen import ModalScreen
+from textual.widgets import Static, Button, DataTable, Select, TextArea
+from textual.containers import Vertical, Horizontal
+
+from sequences import run_commands, export_json, export_csv
+
+EXEC_MODES = [("Exec channel", "exec"), ("Interactive prompt", "prompt")]
+
+
+class ExecModal(ModalScreen):
+    """Run a command list across a folder of sessions and collect the output."""
+
+    def __init__(self, folder, configs):
+        super().__init__()
+        self.folder = folder
+        self.configs = configs
+        self.results = []
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="modal-dialog", classes="exec-dialog"):
+            yield Static(f"PARALLEL EXEC // {self.folder} ({len(self.configs)} links)", id="modal-title")
+            yield Static("Commands (one per line)", classes="field-label")
+            yield TextArea("show interfaces terse", id="exec-commands")
+            yield Select(EXEC_MODES, id="exec-mode", value="exec", allow_blank=False)
+            yield Static(id="exec-summary")
+            yield DataTable(id="exec-table", cursor_type="row")
+            with Horizontal(classes="button-row"):
+                yield Button("RUN", id="run", classes="btn-neuro-confirm")
+                yield Button("JSON", id="export_json", classes="btn-neuro-cancel")
+                yield Button("CSV", id="export_csv", classes="btn-neuro-cancel")
+                yield Button("CLOSE", id="cancel", classes="btn-neuro-cancel")
+
+    def on_mount(self):
+        table = self.query_one("#exec-table")
+        table.add_columns("Host", "Command", "Status", "Time", "Lines")
+
+    def start(self):
+        commands = [c.strip() for c in self.query_one("#exec-commands").text.splitlines() if c.strip()]
+        if not commands:
+            return
+        mode = self.query_one("#exec-mode").value
+        self.results = []
+        self.query_one("#exec-table").clear()
+        self.query_one("#run").disabled = True
+        self.query_one("#exec-summary").update(f"Running {len(commands)} command(s) on {len(self.configs)} links...")
+
+        def work():
+            results = run_commands(self.configs, commands, mode,
+                                   on_result=lambda r: self.app.call_from_thread(self.add_result, r))
+            self.app.call_from_thread(self.finish, results)
+        threading.Thread(target=work, daemon=True).start()
+
+    def add_result(self, host):
+        table = self.query_one("#exec-table")
+        label = escape(host.name or host.host)
+        if host.error:
+            table.add_row(label, "-", f"[red]{escape(host.error)}[/red]", "-", "-")
+        for item in host.results:
+            status = f"[red]{escape(item.error)}[/red]" if item.error else "[green]OK[/green]"
+            if item.exit_status not in (None, 0):
+                status = f"[yellow]exit {item.exit_status}[/yellow]"
+            table.add_row(label, escape(item.command), status, f"{item.elapsed:.2f}s", str(item.output.count("\n") + 1))
+
+    def finish(self, results):
+        self.results = results
+        failed = sum(1 for h in results if h.error or any(i.error for i in h.results))
+        self.query_one("#exec-summary").update(f"{len(results) - failed}/{len(results)} links OK, {failed} with errors")
+        self.query_one("#run").disabled = False
+
+    def export(self, kind):
+        if not self.results:
+            self.app.notify("[bold yellow]Nothing to export yet[/bold yellow]")
+            return
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"exec_{self.folder}_{timestamp}.{kind}"
+        (export_json if kind == "json" else export_csv)(self.results, filename)
+        self.app.notify(f"[bold green]Results saved to:[/bold green] {escape(filename)}")
+
+    def on_button_pressed(self, event: Button.Pressed):
+        if event.button.id == "run":
+            self.start()
+        elif event.button.id == "export_json":
+            self.export("json")
+        elif event.button.id == "export_csv":
+            self.export("csv")
+        else:
+            self.dismiss(None)
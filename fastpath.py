@@ -0,0 +1,196 @@
+import random
+import re
+import sys
+
+import pyte
+from pyte import modes as mo
+from pyte.charsets import LAT1_MAP
+
+# Printable ASCII plus CR/LF: the bulk of a `show ... | no-more` dump
+RUN = re.compile(r"[\x20-\x7e\r\n]+")
+PIECE = re.compile(r"[\r\n]|[^\r\n]+")
+# A CSI sequence with plain numeric parameters (SGR colours, erase, cursor moves)
+CSI = re.compile(r"\x1b\[([0-9;]*)([\x40-\x7e])")
+# What goes to pyte instead: a whole CSI sequence, or everything up to the next plain character
+SLOW = re.compile(r"\x1b\[[\x30-\x3f]*[\x20-\x2f]*[\x40-\x7e]|[^\x20-\x7e\r\n]+")
+PRINTABLE = "".join(map(chr, range(0x20, 0x7f)))
+# Cell tables kept per attribute set (colours, bold...); cleared when it grows past this
+CELL_CACHE = 512
+
+_cells = {}
+
+
+def cells_for(attrs):
+    """Ready-made pyte Chars for every printable ASCII character in the given attributes."""
+    cells = _cells.get(attrs)
+    if cells is None:
+        if len(_cells) >= CELL_CACHE:
+            _cells.clear()
+        cells = _cells[attrs] = {c: attrs._replace(data=c) for c in PRINTABLE}
+    return cells
+
+
+def draw_ascii(screen, text):
+    """Same effect as ``screen.draw(text)`` for printable ASCII, a line at a time.
+
+    pyte's draw looks up the width, checks the modes and builds a cell for
+    every character; here each line's share of ``text`` goes into the row
+    with one dict update of cached cells. Insert mode and translated
+    charsets are left to pyte.
+    """
+    charset = screen.g1_charset if screen.charset else screen.g0_charset
+    if charset is not LAT1_MAP or mo.IRM in screen.mode:
+        screen.draw(text)
+        return
+    cursor, columns = screen.cursor, screen.columns
+    cells = cells_for(cursor.attrs)
+    pos, size = 0, len(text)
+    while pos < size:
+        if cursor.x >= columns:
+            if mo.DECAWM not in screen.mode:
+                # Without autowrap every further character lands in the last column
+                screen.buffer[cursor.y][columns - 1] = cells[text[-1]]
+                break
+            screen.dirty.add(cursor.y)
+            screen.carriage_return()
+            screen.linefeed()
+        count = min(size - pos, columns - cursor.x)
+        screen.buffer[cursor.y].update(zip(range(cursor.x, cursor.x + count),
+                                           map(cells.__getitem__, text[pos:pos + count])))
+        cursor.x += count
+        pos += count
+    screen.dirty.add(cursor.y)
+
+
+class FastStream(pyte.Stream):
+    """pyte Stream that handles plain-text bursts itself.
+
+    While the parser is between escape sequences, runs of printable ASCII
+    and CR/LF are applied to the screen directly (``draw_ascii``,
+    ``carriage_return``, ``linefeed``: what pyte would call for them), and
+    so are CSI sequences with plain numeric parameters, parsed the way
+    pyte parses them. Everything else (private modes, OSC, other controls,
+    non-ASCII text) goes through pyte's state machine as before. The screen ends up identical to
+    plain pyte; ``python fastpath.py check`` verifies that on real output.
+    """
+
+    def attach(self, screen):
+        super().attach(screen)
+        self.csi_dispatch = {char: getattr(screen, name) for char, name in self.csi.items()}
+
+    def feed(self, data):
+        screen = self.listener
+        if type(screen).draw is not pyte.Screen.draw:
+            super().feed(data)  # the screen wants to see every draw
+            return
+        pos, size = 0, len(data)
+        while pos < size:
+            if self._taking_plain_text:
+                match = RUN.match(data, pos)
+                if match:
+                    for piece in PIECE.findall(match.group()):
+                        if piece == "\n":
+                            screen.linefeed()
+                        elif piece == "\r":
+                            screen.carriage_return()
+                        else:
+                            draw_ascii(screen, piece)
+                    pos = match.end()
+                    continue
+                match = CSI.match(data, pos)
+                if match and match.group(2) in self.csi_dispatch:
+                    params = [min(int(p or 0), 9999) for p in match.group(1).split(";")]
+                    self.csi_dispatch[match.group(2)](*params)
+                    pos = match.end()
+                    continue
+                end = SLOW.match(data, pos).end()
+            else:
+                # Inside a sequence pyte has not finished: one character at a time
+                end = pos + 1
+            super().feed(data[pos:end])
+            pos = end
+
+
+def screen_state(screen):
+    """Everything a feed can change on a screen, in comparable form."""
+    state = {k: v for k, v in vars(screen).items() if k not in ("buffer", "cursor", "history", "savepoints")}
+    state["buffer"] = {y: dict(row) for y, row in screen.buffer.items() if row}
+    state["cursor"] = (screen.cursor.x, screen.cursor.y, screen.cursor.attrs, screen.cursor.hidden)
+    state["savepoints"] = [(s.cursor.x, s.cursor.y, s.cursor.attrs) for s in screen.savepoints]
+    history = getattr(screen, "history", None)
+    if history is not None:
+        state["history"] = (history.total, list(history.lines), list(history.attrs))
+    return state
+
+
+def differential(text, chunks=None, columns=120, lines=40, seed=0):
+    """Feed ``text`` through pyte and FastStream (split at random points); None if the screens match."""
+    from scrollback import Scrollback, ScrollbackScreen
+    screens = []
+    for stream_class in (pyte.Stream, FastStream):
+        screen = ScrollbackScreen(columns, lines, Scrollback())
+        stream = stream_class(screen)
+        rng = random.Random(seed)
+        pos = 0
+        while pos < len(text):
+            step = rng.randint(1, chunks) if chunks else len(text)
+            stream.feed(text[pos:pos + step])
+            pos += step
+        screens.append(screen_state(screen))
+    if screens[0] == screens[1]:
+        return None
+    return sorted(k for k in screens[0] if screens[0][k] != screens[1][k])
+
+
+def fuzz_text(rng, size):
+    """Random mix of plain text, line endings, wrapping, SGR/CSI, mode toggles and wide characters."""
+    pieces = ["\r\n", "\n", "\r", "\t", "\b", "\x07", "\x1b[0m", "\x1b[1;31m", "\x1b[7m", "\x1b[38;5;200m",
+              "\x1b[K", "\x1b[2J", "\x1b[H", "\x1b[5;10H", "\x1b[?7l", "\x1b[?7h", "\x1b[4h", "\x1b[4l",
+              "\x1b[20h", "\x1b[20l", "\x1b[3;20r", "\x1b[r", "\x1b7", "\x1b8", "\x1bM", "\x1b]0;title\x07",
+              "\x1b(0", "\x1b(B", "\x0e", "\x0f", "é", "─", "漢字", "é", "\x1b[2@", "\x1b[3P",
+              "\x1b[;7H", "\x1b[99999C", "\x1b[1;2;3;4;5m", "\x1b[5y", "\x1b[?25l", "\x1b[>c"]
+    out = []
+    while sum(map(len, out)) < size:
+        if rng.random() < 0.5:
+            out.append("".join(rng.choice(PRINTABLE) for _ in range(rng.randint(1, 300))))
+        else:
+            out.append(rng.choice(pieces))
+    return "".join(out)
+
+
+def read_output(path):
+    """Terminal output held in a saved session, a session log or an asciicast recording."""
+    if path.endswith(".cast"):
+        from recording import load_cast
+        return "".join(text for _, text in load_cast(path)[1])
+    from sessionlog import read_log
+    return b"".join(read_log(path)).decode("utf-8", "replace")
+
+
+if __name__ == "__main__":
+    # Usage: python fastpath.py check <file>...   (saved sessions, logs, .cast recordings)
+    #        python fastpath.py fuzz [rounds]
+    if len(sys.argv) < 2 or sys.argv[1] not in ("check", "fuzz") or (sys.argv[1] == "check" and len(sys.argv) < 3):
+        print("usage: python fastpath.py check <file>... | python fastpath.py fuzz [rounds]")
+        sys.exit(1)
+    failed = 0
+    if sys.argv[1] == "check":
+        for path in sys.argv[2:]:
+            text = read_output(path)
+            for chunks in (None, 7, 4096):
+                diff = differential(text, chunks)
+                if diff:
+                    failed += 1
+                    print(f"{path} (chunks {chunks}): screens differ in {', '.join(diff)}")
+            print(f"{path}: {len(text):,} chars checked")
+    else:
+        rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+        for seed in range(rounds):
+            rng = random.Random(seed)
+            text = fuzz_text(rng, rng.randint(100, 20000))
+            diff = differential(text, rng.choice([None, 1, 13, 500]), seed=seed)
+            if diff:
+                failed += 1
+                print(f"seed {seed}: screens differ in {', '.join(diff)}")
+        print(f"{rounds} rounds, {failed} mismatches")
+    sys.exit(1 if failed else 0)
@@ -20,6 +20,7 @@ class HelpScreen(ModalScreen):
             ("Enter", "Connect to Node / Expand"),
             ("Ctrl + N", "New Neural Link"),
             ("Ctrl + B", "Broadcast Command to All"),
+            ("Ctrl + O/F/G", "Quick Link / Search / Telemetry"),
             ("Ctrl + S", "Save Session to Log"),
             ("Q", "Quit Application")
         ])
@@ -1,19 +1,43 @@
 import os
-import yaml
+import threading
+import time
 import uuid
 from textual.app import App, ComposeResult
 from textual.widgets import Header, Footer, Tree, Tabs, Tab, ContentSwitcher, Button, Static, Input, Select
 from textual.containers import Horizontal, Vertical
 from textual.screen import ModalScreen
 from textual import on, events
+from rich.markup import escape
 
 # Importing your project-specific modules
-from models import SessionConfig, LOCAL_VAULT, IDENTITY_FILE, get_all_profiles
-from terminal import CyberTerminal
+from dataclasses import asdict
+from models import LOCAL_VAULT, IDENTITIES, get_all_profiles, parse_jump
+from store import SessionStore
+from palette import SessionIndex, QuickConnectModal
+from sessionlog import LOG_MODES, wait_for_writers
+from recording import RECORD_MODES, CastPlayer
+from bulk import BulkConnectModal
+from exec_modal import ExecModal
+from transfer_modal import TransferModal
+from snapshot_modal import SnapshotModal
+from broadcast import Broadcaster, BroadcastModal, BroadcastFailed, select_targets
+from terminal import CyberTerminal, HIBERNATE_AFTER
+from triggers import TRIGGERS, TRIGGERS_CHECK
+from metrics import METRICS
+from perf_overlay import MetricsOverlay
+from replay import RecordingPicker, ReplayScreen
+from search import ArchiveIndex
+from search_modal import SearchModal
+from reconnect import tabs_path, save_open_tabs, load_open_tabs
 from textual.containers import VerticalScroll, Horizontal
 from textual.widgets import Tabs, Tab, Button
 from textual import on
 
+# Archives with more sessions than this open with folders collapsed
+EXPAND_LIMIT = 500
+# Tab changes are written out at most this often
+TABS_SAVE_DELAY = 1.0
+
 # --- CUSTOM TAB WITH CLOSE BUTTON ---
 
 class ClosableTab(Tab):
@@ -69,6 +93,24 @@ class SessionModal(ModalScreen):
             
             yield Static("Identity Profile", classes="field-label")
             yield Select(profiles, id="profile", value=self.config.profile if is_edit else (profiles[0][0] if profiles else None))
+
+            yield Static("Jump Host ([user@]host[:port], blank = direct)", classes="field-label")
+            yield Input(value=self.config.jump if is_edit else "", placeholder="bastion.example.net", id="jump")
+            yield Static("Jump Identity Profile", classes="field-label")
+            yield Select(profiles, id="jump_profile", prompt="Same as session",
+                         value=(self.config.jump_profile or Select.NULL) if is_edit else Select.NULL)
+
+            yield Static("Tags (comma separated)", classes="field-label")
+            yield Input(value=", ".join(self.config.tags) if is_edit else "", placeholder="core, edge", id="tags")
+
+            yield Static("Session Log", classes="field-label")
+            yield Select(LOG_MODES, id="log", value=self.config.log if is_edit else "off", allow_blank=False)
+
+            yield Static("Recording", classes="field-label")
+            yield Select(RECORD_MODES, id="record", value=self.config.record if is_edit else False, allow_blank=False)
+
+            yield Static("Paste Pacing (ms per line, 0 = off)", classes="field-label")
+            yield Input(value=str(self.config.pacing) if is_edit else "0", type="integer", id="pacing")
             
             with Horizontal(classes="button-row"):
                 yield Button("SAVE", id="save", classes="btn-neuro-confirm")
@@ -86,14 +128,29 @@ class SessionModal(ModalScreen):
         if event.button.id == "save":
             folder_choice = self.query_one("#folder_select").value
             final_folder = self.query_one("#new_folder_input").value if folder_choice == "NEW" else folder_choice
+            jump = self.query_one("#jump").value.strip()
+            if jump:
+                try:
+                    parse_jump(jump)
+                except ValueError as e:
+                    self.app.notify(str(e), severity="error")
+                    return
             
-            self.dismiss({
-                "id": self.config.id if self.config else str(uuid.uuid4()),
+            # Start from the existing config so fields without a form control survive edits
+            data = asdict(self.config) if self.config else {"id": str(uuid.uuid4())}
+            data.update({
                 "name": self.query_one("#name").value,
                 "host": self.query_one("#host").value,
                 "folder": final_folder or "Default",
-                "profile": self.query_one("#profile").value
+                "profile": self.query_one("#profile").value,
+                "log": self.query_one("#log").value,
+                "record": self.query_one("#record").value,
+                "pacing": int(self.query_one("#pacing").value or 0),
+                "jump": jump,
+                "jump_profile": "" if self.query_one("#jump_profile").is_blank() else self.query_one("#jump_profile").value,
+                "tags": [t.strip() for t in self.query_one("#tags").value.split(",") if t.strip()]
             })
+            self.dismiss(data)
         else: self.dismiss(None)
 
 class ManageIdentitiesModal(ModalScreen):
@@ -115,11 +172,12 @@ class ManageIdentitiesModal(ModalScreen):
         if event.button.id == "save_id":
             name, user, pw = self.query_one("#p_name").value, self.query_one("#p_user").value, self.query_one("#p_pass").value
             if name and user and pw:
-                data = {}
-                if os.path.exists(IDENTITY_FILE):
-                    with open(IDENTITY_FILE, "r") as f: data = yaml.safe_load(f) or {}
-                data[name] = {"user": user, "pass": pw}
-                with open(IDENTITY_FILE, "w") as f: yaml.dump(data, f)
+                # Encrypted, atomic write; the in-memory cache is updated in place
+                try:
+                    IDENTITIES.set(name, user, pw)
+                except PermissionError as e:
+                    self.app.notify(f"[bold red]{e}[/bold red]", severity="error")
+                    return
                 self.app.notify(f"Identity '{name}' Secured.")
                 self.dismiss(True)
         else: self.dismiss(False)
@@ -139,6 +197,15 @@ class NeuroSSH(App):
         ("ctrl+l", "focus_terminal", "Terminal"),
         ("e", "edit_node", "Edit"),
         ("d", "delete_node", "Delete"),
+        ("c", "connect_folder", "Connect All"),
+        ("ctrl+b", "broadcast", "Broadcast"),
+        ("x", "exec_folder", "Exec"),
+        ("t", "transfer_folder", "Transfer"),
+        ("s", "snapshot_folder", "Snapshot"),
+        ("p", "replay", "Replay"),
+        ("ctrl+o", "quick_connect", "Quick Link"),
+        ("ctrl+g", "toggle_metrics", "Telemetry"),
+        ("ctrl+f", "search", "Search"),
         ("f1", "help", "Help")
     ]
 
@@ -152,6 +219,7 @@ class NeuroSSH(App):
                 yield Tabs(id="session-tabs")
                 with ContentSwitcher(initial="splash", id="view-stack"):
                     yield Static(">> SYSTEM IDLE. SELECT A NODE TO INITIALIZE LINK.", id="splash")
+                yield MetricsOverlay(id="metrics-overlay")
         yield Footer()
 
     def on_key(self, event: events.Key) -> None:
@@ -164,58 +232,303 @@ class NeuroSSH(App):
             event.stop()
 
     def on_mount(self):
+        self.bulk = None
+        self.index = None
+        self.archive_index = None
+        # Decrypt identities right after the first frame (it imports cryptography);
+        # connects then hit the in-memory cache
+        self.call_after_refresh(self.unlock_identities)
+        self.broadcaster = Broadcaster(self)
+        self.set_interval(60, self.hibernate_hidden_tabs)
+        self.set_interval(TRIGGERS_CHECK, self.reload_triggers)
+        if os.environ.get("NEUROSSH_METRICS_FILE"):
+            # Prometheus textfile-collector style export; enables the hot-path timers
+            METRICS.start_export(os.environ["NEUROSSH_METRICS_FILE"])
+        self.store = SessionStore(LOCAL_VAULT).load()
+        self.store.subscribe(self.on_store_change)
+        self.store.on_error = self.on_store_error
         self.load_sessions()
         self.query_one("#session-tree").focus()
+        self.tabs_file = tabs_path(LOCAL_VAULT)
+        self.tabs_timer = None
+        self.restore_tabs()
+
+    def restore_tabs(self):
+        """Reopen the tabs that were open when the app last exited."""
+        ids, active = load_open_tabs(self.tabs_file)
+        configs = [self.store.by_id[i] for i in ids if i in self.store.by_id]
+        if not configs: return
+        for conf in configs:
+            self.open_session(conf, focus=False)
+        # Tabs activates the first tab added once it mounts; switch to the saved one after that
+        active = self.store.by_id.get(active, configs[0])
+        self.call_after_refresh(self.open_session, active)
+
+    def schedule_tabs_save(self):
+        if self.tabs_timer is None:
+            self.tabs_timer = self.set_timer(TABS_SAVE_DELAY, self.save_tabs)
+
+    async def action_quit(self):
+        # Don't lose a tab change still waiting for its debounced save
+        if self.tabs_timer:
+            self.tabs_timer.stop()
+            self.save_tabs()
+        await super().action_quit()
+
+    def save_tabs(self):
+        self.tabs_timer = None
+        tabs = self.query_one("#session-tabs")
+        ids = [tab.id[3:] for tab in tabs.query(Tab)]
+        try:
+            save_open_tabs(self.tabs_file, ids, tabs.active[3:] if tabs.active else None)
+        except OSError:
+            pass  # read-only config directory: tabs just won't come back
+
+    def unlock_identities(self):
+        try:
+            IDENTITIES.unlock()
+        except Exception as e:
+            self.notify(f"[bold red]Identity vault locked:[/bold red] {e!r}", timeout=10)
+            return
+        if IDENTITIES.error:
+            self.notify(f"[bold red]Identity vault locked:[/bold red] {IDENTITIES.error}; "
+                        "profiles are unavailable until the right key is set", timeout=10)
+
+    def session_index(self):
+        """Palette search index, built on first Ctrl+O rather than at startup."""
+        if self.index is None:
+            self.index = SessionIndex(self.store)
+        return self.index
 
     def get_existing_folders(self):
-        folders = set()
-        if os.path.exists(LOCAL_VAULT):
-            with open(LOCAL_VAULT, "r") as f:
-                data = yaml.safe_load(f) or []
-                for s in data: folders.add(s.get('folder', 'Default'))
-        return sorted(list(folders))
+        return self.store.folders()
 
     def load_sessions(self):
+        """Build the archive tree from the in-memory store (full rebuild).
+
+        Small archives open fully expanded. Above EXPAND_LIMIT sessions the
+        folders start collapsed and get their leaves on first expand, so
+        startup cost follows the number of folders, not sessions.
+        """
         tree = self.query_one("#session-tree")
         tree.clear()
         tree.root.expand()
-        if os.path.exists(LOCAL_VAULT):
-            with open(LOCAL_VAULT, "r") as f:
-                sessions = yaml.safe_load(f) or []
-                for s in sessions:
-                    conf = SessionConfig(**s)
-                    folder_node = next((n for n in tree.root.children if str(n.label) == conf.folder), None)
-                    if not folder_node:
-                        folder_node = tree.root.add(conf.folder, expand=True)
-                    folder_node.add_leaf(conf.name or conf.host, data=conf)
+        self.folder_nodes, self.session_nodes, self.populated = {}, {}, set()
+        expand = len(self.store) <= EXPAND_LIMIT
+        for folder in self.store.by_folder:
+            node = self.add_folder_node(folder)
+            if expand:
+                self.populate_folder(folder)
+                node.expand()
+
+    def add_folder_node(self, folder):
+        self.folder_nodes[folder] = self.query_one("#session-tree").root.add(folder, allow_expand=True)
+        return self.folder_nodes[folder]
+
+    def populate_folder(self, folder):
+        if folder in self.populated: return
+        self.populated.add(folder)
+        folder_node = self.folder_nodes[folder]
+        for conf in self.store.in_folder(folder):
+            self.session_nodes[conf.id] = folder_node.add_leaf(conf.name or conf.host, data=conf)
+
+    @on(Tree.NodeExpanded)
+    def expand_folder(self, event):
+        if event.node.parent is event.node.tree.root:
+            self.populate_folder(str(event.node.label))
+
+    def add_session_node(self, conf):
+        folder_node = self.folder_nodes.get(conf.folder)
+        if not folder_node:
+            # A new folder holds only this session, so it can be filled and shown at once
+            folder_node = self.add_folder_node(conf.folder)
+            self.populated.add(conf.folder)
+            folder_node.expand()
+        if conf.folder in self.populated:
+            self.session_nodes[conf.id] = folder_node.add_leaf(conf.name or conf.host, data=conf)
+
+    def remove_session_node(self, conf):
+        node = self.session_nodes.pop(conf.id, None)
+        if self.store.in_folder(conf.folder) or conf.folder not in self.folder_nodes:
+            if node: node.remove()
+            return
+        # Folders only exist while they hold sessions
+        folder_node = self.folder_nodes.pop(conf.folder)
+        self.populated.discard(conf.folder)
+        for child in folder_node.children:
+            self.session_nodes.pop(child.data.id, None)
+        folder_node.remove()
+
+    def on_store_error(self, error):
+        """Called from the store's write timer when sessions.yaml could not be written."""
+        self.call_from_thread(self.notify, f"[bold red]Sessions not saved:[/bold red] {escape(str(error))}; "
+                              "retrying on the next change or at exit", severity="error", timeout=10)
+
+    def on_store_change(self, old, new):
+        """Patch only the tree nodes touched by a store change."""
+        node = self.session_nodes.get(old.id) if old else None
+        if node and new and old.folder == new.folder:
+            node.set_label(new.name or new.host)
+            node.data = new
+            return
+        if old:
+            self.remove_session_node(old)
+        if new:
+            self.add_session_node(new)
 
     @on(Tree.NodeSelected)
     def handle_selection(self, event):
         if event.node.data:
             self.open_session(event.node.data)
 
-    def open_session(self, config):
+    def open_session(self, config, focus=True, deadline=None):
         tabs, stack = self.query_one("#session-tabs"), self.query_one("#view-stack")
         tid = f"id_{config.id}"
         label = str(config.name or config.host)
 
-        if tid not in [t.id for t in tabs.query("Tab")]:
+        is_new = tid not in [t.id for t in tabs.query("Tab")]
+        if is_new:
             # Use ClosableTab instead of regular Tab
             tabs.add_tab(ClosableTab(label, id=tid))
             # Wrap terminal in scrollable container
-            term = CyberTerminal(config)
+            term = CyberTerminal(config, deadline=deadline)
+            # Tabs opened in the background parse output but don't render it
+            term.set_background(not focus)
             scroll_container = VerticalScroll(term, id=tid)
             stack.mount(scroll_container)
+            # Follow new output until the user scrolls back
+            scroll_container.anchor()
+            self.schedule_tabs_save()
+
+        if focus:
+            tabs.active = tid
+            stack.current = tid
+            self.show_terminal(tid)
+            self.action_focus_terminal()
+        return is_new
 
-        tabs.active = tid
-        stack.current = tid
-        self.action_focus_terminal()
+    def selected_folder(self):
+        """Folder node under the tree cursor (a session's parent), or None."""
+        node = self.query_one("#session-tree").cursor_node
+        if not node or node == self.query_one("#session-tree").root: return None
+        return node if not node.data else node.parent
+
+    def action_replay(self):
+        """Pick one of the selected session's recordings and play it back."""
+        node = self.query_one("#session-tree").cursor_node
+        if not node or not node.data: return
+        self.push_screen(RecordingPicker(node.data.name or node.data.host), self.open_replay)
+
+    def open_replay(self, path):
+        if not path: return
+        self.notify(f"Loading {escape(os.path.basename(path))}...", timeout=3)
+        def load():
+            # Parsing the whole recording for its seek snapshots takes a while on long ones
+            try:
+                player = CastPlayer(path)
+            except (OSError, ValueError) as e:
+                self.call_from_thread(self.notify, f"[bold red]Cannot replay:[/bold red] {escape(str(e))}", timeout=10)
+                return
+            self.call_from_thread(self.push_screen, ReplayScreen(player, os.path.basename(path)))
+        threading.Thread(target=load, daemon=True).start()
+
+    def action_search(self):
+        if self.archive_index is None:
+            self.archive_index = ArchiveIndex().load()
+        self.push_screen(SearchModal(self.archive_index), self.jump_to_hit)
+
+    def jump_to_hit(self, hit):
+        """Show the tab a live search hit came from, scrolled to the hit's line."""
+        if not hit: return
+        tabs, stack = self.query_one("#session-tabs"), self.query_one("#view-stack")
+        try:
+            scroll_container = stack.query_one(f"#{hit.source}")
+        except Exception:
+            self.notify("That tab has been closed.", severity="warning")
+            return
+        tabs.active = hit.source
+        stack.current = hit.source
+        self.show_terminal(hit.source)
+        term = scroll_container.query_one(CyberTerminal)
+        y = hit.line - term.history.first
+        if y < 0:
+            self.notify("That line has scrolled out of the buffer.", severity="warning")
+            return
+        # Scrolling away from the bottom releases the anchor, so new output won't yank the view back
+        scroll_container.scroll_to(y=max(0, y - scroll_container.size.height // 2), animate=False)
+        term.focus()
+
+    def action_toggle_metrics(self):
+        self.query_one("#metrics-overlay").toggle()
+
+    def action_quick_connect(self):
+        self.push_screen(QuickConnectModal(self.session_index()), lambda conf: conf and self.open_session(conf))
+
+    def action_exec_folder(self):
+        folder = self.selected_folder()
+        if not folder: return
+        configs = self.store.in_folder(str(folder.label))
+        if configs:
+            self.push_screen(ExecModal(str(folder.label), configs))
+
+    def action_transfer_folder(self):
+        folder = self.selected_folder()
+        if not folder: return
+        configs = self.store.in_folder(str(folder.label))
+        if configs:
+            self.push_screen(TransferModal(str(folder.label), configs))
+
+    def action_snapshot_folder(self):
+        folder = self.selected_folder()
+        if not folder: return
+        configs = self.store.in_folder(str(folder.label))
+        if configs:
+            self.push_screen(SnapshotModal(str(folder.label), configs))
+
+    def action_connect_folder(self):
+        """Open every session in the selected folder; connects run on the bounded worker pool."""
+        folder = self.selected_folder()
+        if not folder: return
+        configs = self.store.in_folder(str(folder.label))
+        if not configs: return
+        self.bulk = BulkConnectModal(str(folder.label), configs)
+        self.push_screen(self.bulk, lambda _: setattr(self, "bulk", None))
+        for i, conf in enumerate(configs):
+            if not self.open_session(conf, focus=(i == 0), deadline=self.bulk.deadline):
+                # Already open: nothing to connect, report it as linked
+                self.call_after_refresh(self.bulk.record, conf.id, 0.0)
+
+    def on_cyber_terminal_connected(self, message: CyberTerminal.Connected):
+        if self.bulk:
+            self.bulk.record(message.terminal.config.id, message.latency, message.error)
 
     @on(Tabs.TabActivated)
     def sync_tabs(self, event: Tabs.TabActivated):
         if event.tab and event.tab.id:
             self.query_one("#view-stack").current = event.tab.id
+            self.show_terminal(event.tab.id)
             self.action_focus_terminal()
+            self.schedule_tabs_save()
+
+    def show_terminal(self, tid):
+        """Render only the terminal in the visible tab; the rest keep parsing in the background."""
+        for term in self.query(CyberTerminal):
+            term.set_background(getattr(term.parent, "id", None) != tid)
+
+    def reload_triggers(self):
+        """Give every open tab the edited rules once triggers.yaml changes."""
+        if not TRIGGERS.refresh():
+            return
+        for term in self.query(CyberTerminal):
+            term.triggers = TRIGGERS.for_config(term.config)
+        if TRIGGERS.errors:
+            self.notify(escape("\n".join(TRIGGERS.errors[:5])), title="triggers.yaml", severity="warning")
+
+    def hibernate_hidden_tabs(self):
+        now = time.monotonic()
+        for term in self.query(CyberTerminal):
+            if term.hidden_since is not None and now - term.hidden_since > HIBERNATE_AFTER:
+                term.hibernate()
 
     def action_focus_sidebar(self):
         self.query_one("#session-tree").focus()
@@ -257,10 +570,18 @@ class NeuroSSH(App):
             terminal = scroll_container.query_one(CyberTerminal)
             if terminal:
                 terminal.close_ssh()
+                if self.bulk:
+                    # Closed while queued or connecting: its connect never reports back
+                    self.bulk.cancel(terminal.config.id)
+                if terminal in self.broadcaster.targets:
+                    self.broadcaster.set_targets(
+                        [t for t in self.broadcaster.targets if t is not terminal], self.broadcaster.label)
+                    self.update_broadcast_banner()
 
             # Remove tab and container
             tabs.remove_tab(tab_id)
             scroll_container.remove()
+            self.schedule_tabs_save()
 
             # Show splash if no tabs left
             if not tabs.active:
@@ -282,29 +603,46 @@ class NeuroSSH(App):
 
     def process_delete_confirmed(self, confirmed, node):
         if not confirmed: return
-        if not os.path.exists(LOCAL_VAULT): return
-        with open(LOCAL_VAULT, "r") as f: sessions = yaml.safe_load(f) or []
-        if node.data: sessions = [s for s in sessions if s.get('id') != node.data.id]
-        else: sessions = [s for s in sessions if s.get('folder') != str(node.label)]
-        with open(LOCAL_VAULT, "w") as f: yaml.dump(sessions, f)
-        self.load_sessions()
+        if node.data: self.store.remove(node.data.id)
+        else: self.store.remove_folder(str(node.label))
 
     def save_session_callback(self, data):
         if not data: return
-        sessions = []
-        if os.path.exists(LOCAL_VAULT):
-            with open(LOCAL_VAULT, "r") as f: sessions = yaml.safe_load(f) or []
-        
-        found = False
-        for i, s in enumerate(sessions):
-            if s.get('id') == data['id']:
-                sessions[i] = data
-                found = True
-                break
-        if not found: sessions.append(data)
-            
-        with open(LOCAL_VAULT, "w") as f: yaml.dump(sessions, f)
-        self.load_sessions()
+        self.store.upsert(data)
+
+    def action_broadcast(self):
+        """Toggle broadcast mode; when enabling, pick targets by folder or tag."""
+        if self.broadcaster.active:
+            self.broadcaster.clear()
+            self.update_broadcast_banner()
+            self.notify("Broadcast disengaged.")
+            return
+        terminals = list(self.query(CyberTerminal))
+        if not terminals:
+            self.notify("[bold yellow]No open links to broadcast to[/bold yellow]")
+            return
+        self.push_screen(BroadcastModal(terminals), lambda choice: self.engage_broadcast(terminals, choice))
+
+    def engage_broadcast(self, terminals, choice):
+        if not choice: return
+        targets = [t for t in select_targets(terminals, choice) if not t.closed]
+        label = choice[1] or "ALL"
+        self.broadcaster.set_targets(targets, label)
+        self.update_broadcast_banner()
+        self.action_focus_terminal()
+
+    def update_broadcast_banner(self):
+        if self.broadcaster.active:
+            self.sub_title = f"BROADCAST >> {self.broadcaster.label} ({len(self.broadcaster.targets)} links)"
+        else:
+            self.sub_title = ""
+
+    def on_broadcast_failed(self, message: BroadcastFailed):
+        lines = "\n".join(f"{name}: {reason}" for name, reason in message.failures[:10])
+        more = len(message.failures) - 10
+        if more > 0:
+            lines += f"\n... and {more} more"
+        self.notify(f"[bold red]Broadcast failed on {len(message.failures)} link(s)[/bold red]\n{lines}")
 
     def action_manage_ids(self):
         self.push_screen(ManageIdentitiesModal())
@@ -316,6 +654,11 @@ class NeuroSSH(App):
             "CTRL+H: Focus Archive  |  CTRL+L: Focus Terminal\n\n"
             "[cyan]Management:[/cyan]\n"
             "CTRL+N: New Link  |  E: Edit  |  D: Delete\n"
+            "C: Connect Entire Folder  |  CTRL+B: Broadcast\n"
+            "X: Run Commands on Folder  |  T: Transfer Files to Folder\n"
+            "S: Config Snapshots of Folder\n"
+            "CTRL+O: Quick Link  |  CTRL+G: Performance Telemetry\n"
+            "P: Replay Recording  |  CTRL+F: Search Scrollback + Logs\n"
             "CTRL+I: Identity Vault\n\n"
             "CTRL+W: Kill Tab  |  CTRL+S: Save Session\n"
             "Q: Shutdown"
@@ -342,4 +685,10 @@ class NeuroSSH(App):
             self.notify(f"[bold red]Error saving session:[/bold red] {str(e)}")
 
 if __name__ == "__main__":
-    NeuroSSH().run()
+    app = NeuroSSH()
+    app.run()
+    # Don't lose an edit still waiting on the store's debounce timer
+    if getattr(app, "store", None):
+        app.store.close()
+    # Closed tabs hand their log and recording tails to background writers
+    wait_for_writers()
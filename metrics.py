@@ -0,0 +1,196 @@
+import bisect
+import os
+import tempfile
+import threading
+import time
+
+# Upper bounds (seconds) shared by every latency histogram
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# Seconds between writes of the Prometheus text file
+EXPORT_INTERVAL = 15
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; ``observe`` is a bisect and two adds."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, q):
+        """Estimate of the q-quantile (0..1), interpolated inside its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = self.buckets[i - 1] if i else 0.0
+                high = self.buckets[i] if i < len(self.buckets) else self.buckets[-1] * 2
+                return low + (high - low) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+class SessionMetrics:
+    """Counters for one terminal.
+
+    Every field has a single writer thread (recv: the reader thread, feed and
+    render: the UI thread, send: the ChannelWriter thread), so plain
+    attribute updates need no lock.
+    """
+
+    def __init__(self, session_id, name, host):
+        self.session_id = session_id
+        self.name = name
+        self.host = host
+        self.bytes_in = 0
+        self.recv_batches = 0
+        self.bytes_out = 0
+        self.writes = 0
+        self.reconnects = 0
+        self.trigger_hits = 0
+        self.connect = {}
+        self.feed = Histogram()
+        self.triggers = Histogram()
+        self.frame = Histogram()
+        self.send = Histogram()
+        self.frame_pending = 0.0
+        # Zero-argument callables returning current queue depths
+        self.queues = {}
+
+    def record_recv(self, data):
+        self.bytes_in += len(data)
+        self.recv_batches += 1
+
+    def record_send(self, size, seconds):
+        self.bytes_out += size
+        self.writes += 1
+        self.send.observe(seconds)
+
+    def queue_depths(self):
+        depths = {}
+        for name, probe in self.queues.items():
+            try:
+                depths[name] = probe()
+            except Exception:
+                depths[name] = 0
+        return depths
+
+
+class MetricsRegistry:
+    """Process-wide collection of SessionMetrics.
+
+    Byte counters are always kept. The timers around feed, render and send
+    only run while ``enabled`` is set (overlay open or export running), so
+    the hot paths pay a single attribute check otherwise.
+    """
+
+    def __init__(self):
+        self.sessions = {}
+        self.overlay = False
+        self.export_path = None
+        self._exporter = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.overlay or self.export_path is not None
+
+    def register(self, session_id, name, host):
+        metrics = SessionMetrics(session_id, name, host)
+        with self._lock:
+            self.sessions[session_id] = metrics
+        return metrics
+
+    def unregister(self, metrics):
+        with self._lock:
+            if self.sessions.get(metrics.session_id) is metrics:
+                del self.sessions[metrics.session_id]
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.sessions.values())
+
+    def start_export(self, path, interval=EXPORT_INTERVAL):
+        """Rewrite ``path`` in Prometheus text format every ``interval`` seconds."""
+        self.export_path = path
+        if self._exporter is None:
+            def run():
+                while self.export_path:
+                    self.write_prometheus(self.export_path)
+                    time.sleep(interval)
+            self._exporter = threading.Thread(target=run, daemon=True)
+            self._exporter.start()
+
+    def write_prometheus(self, path):
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(prefix=".metrics-", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(prometheus_text(self.snapshot()))
+            # Atomic so a textfile collector never scrapes a half-written file
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(m, **extra):
+    pairs = {"session": m.name, "host": m.host, **extra}
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs.items()) + "}"
+
+
+def prometheus_text(sessions):
+    out = []
+
+    def family(name, kind, help_text):
+        out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} {kind}")
+
+    for name, attr, help_text in (
+            ("neurossh_received_bytes_total", "bytes_in", "Bytes read from the SSH channel."),
+            ("neurossh_sent_bytes_total", "bytes_out", "Bytes written to the SSH channel."),
+            ("neurossh_reconnects_total", "reconnects", "Links re-established after the first connect."),
+            ("neurossh_trigger_hits_total", "trigger_hits", "Output triggers fired (highlights not counted).")):
+        family(name, "counter", help_text)
+        out.extend(f"{name}{_labels(m)} {getattr(m, attr)}" for m in sessions)
+
+    family("neurossh_connect_phase_seconds", "gauge", "Duration of each phase of the last connect.")
+    for m in sessions:
+        out.extend(f"neurossh_connect_phase_seconds{_labels(m, phase=p)} {v:.6f}" for p, v in m.connect.items())
+
+    family("neurossh_queue_depth", "gauge", "Items waiting in the session's reader/writer queues.")
+    for m in sessions:
+        out.extend(f"neurossh_queue_depth{_labels(m, queue=q)} {d}" for q, d in m.queue_depths().items())
+
+    for name, attr, help_text in (
+            ("neurossh_feed_seconds", "feed", "Time parsing a received batch into the screen."),
+            ("neurossh_trigger_seconds", "triggers", "Time matching output triggers against a received batch."),
+            ("neurossh_frame_seconds", "frame", "Time building the rows of one repaint."),
+            ("neurossh_send_seconds", "send", "Time per coalesced channel write.")):
+        family(name, "histogram", help_text)
+        for m in sessions:
+            hist = getattr(m, attr)
+            cumulative = 0
+            for bound, n in zip(hist.buckets + (float("inf"),), hist.counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                out.append(f"{name}_bucket{_labels(m, le=le)} {cumulative}")
+            out.append(f"{name}_sum{_labels(m)} {hist.sum:.6f}")
+            out.append(f"{name}_count{_labels(m)} {hist.count}")
+    return "\n".join(out) + "\n"
+
+
+METRICS = MetricsRegistry()
@@ -1,9 +1,13 @@
-import uuid, os, yaml
+import uuid, os, yaml, tempfile, threading
 from dataclasses import dataclass, field
 
 BASE_DIR = os.path.dirname(__file__)
 LOCAL_VAULT = os.path.join(BASE_DIR, "sessions.yaml")
 IDENTITY_FILE = os.path.join(BASE_DIR, "identities.yaml")
+# Master key for the identity vault; NEUROSSH_VAULT_KEY overrides the key file
+VAULT_KEY_FILE = os.path.join(BASE_DIR, "vault.key")
+# Every Fernet token starts with version byte 0x80, i.e. "gAAAAA" in base64
+ENCRYPTED_PREFIX = b"gAAAAA"
 
 @dataclass
 class SessionConfig:
@@ -12,20 +16,163 @@ class SessionConfig:
     port: int = 22
     folder: str = "Root"
     profile: str = "DEV"
+    scrollback: int = 100000
+    log: str = "off"
+    # Record output and keystrokes as asciicast v2 under recordings/
+    record: bool = False
+    # Milliseconds to pause after each pasted line, for CLIs that drop fast input
+    pacing: int = 0
+    # Bastion to tunnel through, "[user@]host[:port]" as in OpenSSH's ProxyJump
+    jump: str = ""
+    # Identity profile for the bastion; blank uses the session's own
+    jump_profile: str = ""
+    tags: list = field(default_factory=list)
     id: str = field(default_factory=lambda: str(uuid.uuid4())[:8])
 
+class IdentityStore:
+    """Encrypted identity vault with an in-memory cache.
+
+    identities.yaml holds a single Fernet token (see vault.Vault) wrapping the
+    YAML mapping ``{profile: {"user": ..., "pass": ...}}``. It is decrypted
+    once at unlock; later lookups only stat the file and re-decrypt when its
+    mtime or size changed. A legacy plaintext file is encrypted in place on
+    first unlock.
+
+    If the master key doesn't open the file (a rotated or mistyped
+    NEUROSSH_VAULT_KEY, the wrong vault.key) the store stays locked: lookups
+    see no identities, ``error`` says why, and ``set`` refuses to overwrite
+    the file.
+    """
+
+    def __init__(self, path=IDENTITY_FILE):
+        self.path = path
+        self.vault = None
+        self.data = {}
+        self.error = None
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def unlock(self, key=None):
+        with self._lock:
+            self._unlock(key)
+
+    def _unlock(self, key=None):
+        from vault import Vault, load_master_key
+        try:
+            self.vault = Vault(key or load_master_key())
+        except ValueError as e:
+            # Not a Fernet key at all: stay locked, and try again on the next lookup
+            self.vault, self.data = None, {}
+            self.error = f"vault locked: bad master key ({e})"
+            return
+        self._load()
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self):
+        self.error = None
+        self._stamp = self._file_stamp()
+        if self._stamp is None:
+            self.data = {}
+            return
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        if raw.startswith(ENCRYPTED_PREFIX):
+            from cryptography.fernet import InvalidToken
+            try:
+                self.data = yaml.safe_load(self.vault.reveal(raw)) or {}
+            except InvalidToken:
+                self.data = {}
+                self.error = "vault locked: identities.yaml was sealed with a different key " \
+                             "(check NEUROSSH_VAULT_KEY / vault.key)"
+                return
+        else:
+            # Plaintext identities from older releases: encrypt them now
+            self.data = yaml.safe_load(raw) or {}
+            self._write(self.data)
+
+    def _write(self, data):
+        token = self.vault.seal(yaml.safe_dump(data))
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(prefix=".identities-", dir=directory)
+        try:
+            os.fchmod(fd, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(token)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.data = data
+        self._stamp = self._file_stamp()
+
+    def current(self):
+        """The decrypted mapping, reloaded only if the file changed on disk."""
+        with self._lock:
+            # Bulk-connect workers can all get here first; only one unlocks
+            if self.vault is None:
+                self._unlock()
+            elif self._file_stamp() != self._stamp:
+                self._load()
+            return self.data
+
+    def get(self, profile_name, default=None):
+        return self.current().get(profile_name, default)
+
+    def profiles(self):
+        return list(self.current())
+
+    def set(self, profile_name, user, password):
+        self.current()
+        with self._lock:
+            if self.error:
+                raise PermissionError(self.error)
+            data = dict(self.data)
+            data[profile_name] = {"user": user, "pass": password}
+            self._write(data)
+
+IDENTITIES = IdentityStore()
+
 def get_credentials(profile_name):
-    default = {"user": "admin", "pass": "admin"}
-    if os.path.exists(IDENTITY_FILE):
-        with open(IDENTITY_FILE, "r") as f:
-            data = yaml.safe_load(f) or {}
-            return data.get(profile_name, default)
-    return default
+    """{"user", "pass"} for a profile, or None if it is missing or the vault is locked."""
+    return IDENTITIES.get(profile_name)
+
+def missing_credentials(profile_name):
+    """Why get_credentials returned None, for error messages."""
+    return IDENTITIES.error or f"Identity profile {profile_name!r} not found."
+
+def parse_jump(spec):
+    """(user or None, host, port) from "[user@]host[:port]"; IPv6 hosts go in brackets."""
+    user, _, hostport = spec.strip().rpartition("@")
+    if hostport.startswith("["):
+        host, _, rest = hostport[1:].partition("]")
+        port = rest[1:]
+    elif hostport.count(":") == 1:
+        host, _, port = hostport.partition(":")
+    else:
+        host, port = hostport, ""
+    if not host or (port and not port.isdigit()):
+        raise ValueError(f"bad jump host {spec!r}: expected [user@]host[:port]")
+    return user or None, host, int(port or 22)
+
+def get_jump(config):
+    """(host, port, user, password) of the session's bastion, or None for a direct link."""
+    if not config.jump:
+        return None
+    user, host, port = parse_jump(config.jump)
+    profile = config.jump_profile or config.profile
+    creds = get_credentials(profile)
+    if not creds:
+        raise LookupError(missing_credentials(profile))
+    return host, port, user or creds['user'], creds['pass']
 
 def get_all_profiles():
-    if os.path.exists(IDENTITY_FILE):
-        with open(IDENTITY_FILE, "r") as f:
-            data = yaml.safe_load(f) or {}
-            if data:
-                return [(name, name) for name in data.keys()]
+    profiles = IDENTITIES.profiles()
+    if profiles:
+        return [(name, name) for name in profiles]
     return [("DEV", "DEV"), ("PROD", "PROD")]
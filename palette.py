@@ -0,0 +1,265 @@
+import bisect
+import heapq
+import re
+from collections import Counter
+
+from rich.markup import escape
+
+from textual.app import ComposeResult
+from textual.screen import ModalScreen
+from textual.widgets import Static, Input, OptionList
+from textual.widgets.option_list import Option
+from textual.containers import Vertical
+from textual import on
+
+RESULT_LIMIT = 50
+# Candidate sets up to this size are fully ranked; larger ones use the tiered scan
+SCORE_LIMIT = 2000
+# Trigrams shared by more sessions than this carry no signal for typo matching
+FUZZY_POSTING_LIMIT = 15000
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SessionIndex:
+    """Trigram index over name, host, folder and profile of every session.
+
+    Kept in sync with the SessionStore through its subscriber hook, so edits
+    only touch the postings of the changed session. Tokens of three or more
+    characters narrow the candidates through the trigram postings; sorted
+    name and host/folder lists answer prefix matches with a bisect, so the
+    best-ranked hits are found without scoring the whole archive.
+    """
+
+    def __init__(self, store=None):
+        self.entries = {}
+        self.postings = {}
+        self.names = []
+        # (key, id) for every host and folder, plus each folder path component onwards
+        self.prefixes = []
+        if store is not None:
+            for conf in store.all():
+                self.add(conf, sort=False)
+            self.names.sort()
+            self.prefixes.sort()
+            store.subscribe(self.on_change)
+
+    def haystack(self, conf):
+        return " ".join(str(v) for v in (conf.name, conf.host, conf.folder, conf.profile, *conf.tags)).lower()
+
+    def prefix_keys(self, conf):
+        folder = str(conf.folder).lower()
+        parts = folder.split("/")
+        return {str(conf.host).lower(), *("/".join(parts[i:]) for i in range(len(parts)))}
+
+    def add(self, conf, sort=True):
+        hay = self.haystack(conf)
+        name = (conf.name or conf.host).lower()
+        keys = self.prefix_keys(conf)
+        self.entries[conf.id] = (conf, hay, name, keys)
+        if sort:
+            bisect.insort(self.names, (name, conf.id))
+            for key in keys:
+                bisect.insort(self.prefixes, (key, conf.id))
+        else:
+            self.names.append((name, conf.id))
+            self.prefixes.extend((key, conf.id) for key in keys)
+        for gram in trigrams(hay):
+            self.postings.setdefault(gram, set()).add(conf.id)
+
+    @staticmethod
+    def unlist(items, item):
+        pos = bisect.bisect_left(items, item)
+        if pos < len(items) and items[pos] == item:
+            del items[pos]
+
+    def remove(self, conf):
+        entry = self.entries.pop(conf.id, None)
+        if not entry:
+            return
+        self.unlist(self.names, (entry[2], conf.id))
+        for key in entry[3]:
+            self.unlist(self.prefixes, (key, conf.id))
+        for gram in trigrams(entry[1]):
+            ids = self.postings.get(gram)
+            if ids:
+                ids.discard(conf.id)
+                if not ids:
+                    del self.postings[gram]
+
+    def on_change(self, old, new):
+        if old:
+            self.remove(old)
+        if new:
+            self.add(new)
+
+    def candidates(self, tokens):
+        """Ids containing every trigram of every long token (None = no long tokens)."""
+        grams = set()
+        for token in tokens:
+            grams |= trigrams(token)
+        if not grams:
+            return None
+        postings = sorted((self.postings.get(g, ()) for g in grams), key=len)
+        if not postings[0]:
+            return set()
+        result = set(postings[0])
+        for ids in postings[1:]:
+            result &= ids
+            if not result:
+                break
+        return result
+
+    def search(self, query, limit=RESULT_LIMIT):
+        """Best matching SessionConfigs: name prefix, host/folder prefix, name, then anywhere."""
+        tokens = query.lower().split()
+        if not tokens:
+            return [self.entries[i][0] for _, i in self.names[:limit]]
+        first = tokens[0]
+        # Every short token sits inside some trigram of any haystack holding it,
+        # so one missing from all of them cannot match exactly: skip the walk
+        if any(len(t) < 3 and not any(t in gram for gram in self.postings) for t in tokens):
+            return self.fuzzy(tokens, limit)
+        ids = self.candidates(tokens)
+        if ids is not None and len(ids) <= SCORE_LIMIT:
+            # Trigrams already narrowed it down: verify and rank every candidate
+            def ranked():
+                for session_id in ids:
+                    conf, hay, name, keys = self.entries[session_id]
+                    if all(t in hay for t in tokens):
+                        yield self.rank(first, name, keys), name, session_id
+            found = [r[2] for r in heapq.nsmallest(limit, ranked())]
+        else:
+            found = self.scan(tokens, ids, limit)
+        if not found:
+            return self.fuzzy(tokens, limit)
+        return [self.entries[i][0] for i in found]
+
+    @staticmethod
+    def rank(first, name, keys):
+        if name.startswith(first):
+            return 0
+        if any(key.startswith(first) for key in keys):
+            return 1
+        return 2 if first in name else 3
+
+    def take_prefix(self, items, first, tokens, ids, found, limit):
+        """Add ids whose key in the sorted ``items`` starts with ``first``, up to ``limit``."""
+        if len(found) >= limit:
+            return
+        entries, others = self.entries, tokens[1:]
+        for pos in range(bisect.bisect_left(items, (first,)), len(items)):
+            key, session_id = items[pos]
+            if not key.startswith(first):
+                break
+            if ids is not None and session_id not in ids:
+                continue
+            hay = entries[session_id][1]
+            if all(t in hay for t in others):
+                found[session_id] = None
+                if len(found) >= limit:
+                    break
+
+    def scan(self, tokens, ids, limit):
+        """Tiered search for broad queries; each tier stops once ``limit`` hits are found."""
+        first = tokens[0]
+        found = {}
+        # Tiers 1 and 2: names, then hosts and folders, starting with the first
+        # token, straight off the sorted lists
+        self.take_prefix(self.names, first, tokens, ids, found, limit)
+        self.take_prefix(self.prefixes, first, tokens, ids, found, limit)
+        if len(found) < limit:
+            # Tiers 3 and 4: the first token inside the name, then anywhere. The
+            # walk ends as soon as it holds enough hits, so a broad query never
+            # visits the whole archive
+            rest = []
+            for session_id in (self.entries if ids is None else ids):
+                conf, hay, name, keys = self.entries[session_id]
+                if session_id in found or not all(t in hay for t in tokens):
+                    continue
+                if first in name:
+                    found[session_id] = None
+                else:
+                    rest.append(session_id)
+                if len(found) + len(rest) >= limit:
+                    break
+            for session_id in rest[:limit - len(found)]:
+                found[session_id] = None
+        return list(found)
+
+    def fuzzy(self, tokens, limit):
+        """Typo-tolerant fallback: rank by shared trigrams, then characters in order."""
+        pattern = re.compile(".*?".join(re.escape(c) for c in "".join(tokens)))
+        grams = set()
+        for token in tokens:
+            grams |= trigrams(token)
+        scores = Counter()
+        for gram in grams:
+            ids = self.postings.get(gram, ())
+            if len(ids) <= FUZZY_POSTING_LIMIT:
+                scores.update(ids)
+        needed = max(1, len(grams) // 2)
+        hits = [(-score, self.entries[i][2]) + (i,) for i, score in scores.items() if score >= needed]
+        if not hits and len(self.entries) <= 5000:
+            # Too short for trigrams: subsequence match over a small archive
+            hits = [(0, name, i) for i, (_, hay, name, _) in self.entries.items() if pattern.search(hay)]
+        return [self.entries[h[2]][0] for h in heapq.nsmallest(limit, hits)]
+
+
+class QuickConnectModal(ModalScreen):
+    """Fuzzy palette over the archive; Enter opens the highlighted session."""
+
+    BINDINGS = [("escape", "dismiss_palette", "Close")]
+
+    def __init__(self, index):
+        super().__init__()
+        self.index = index
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="modal-dialog", classes="palette-dialog"):
+            yield Static("QUICK LINK", id="modal-title")
+            yield Input(placeholder="name, host, folder, profile...", id="palette-input")
+            yield OptionList(id="palette-results")
+
+    def on_mount(self):
+        self.refresh_results("")
+        self.query_one("#palette-input").focus()
+
+    def refresh_results(self, query):
+        results = self.query_one("#palette-results")
+        results.clear_options()
+        results.add_options([
+            Option(f"{escape(conf.name or conf.host)}  [dim]{escape(conf.host)}  //  {escape(conf.folder)}  //  {escape(conf.profile)}[/dim]",
+                   id=conf.id)
+            for conf in self.index.search(query)
+        ])
+        if results.option_count:
+            results.highlighted = 0
+
+    @on(Input.Changed, "#palette-input")
+    def on_query(self, event: Input.Changed):
+        self.refresh_results(event.value)
+
+    def on_key(self, event):
+        # Arrow keys move through results while typing continues in the input
+        if event.key in ("up", "down"):
+            results = self.query_one("#palette-results")
+            if results.option_count:
+                step = -1 if event.key == "up" else 1
+                results.highlighted = ((results.highlighted or 0) + step) % results.option_count
+            event.stop()
+
+    @on(Input.Submitted, "#palette-input")
+    def on_submit(self, event: Input.Submitted):
+        results = self.query_one("#palette-results")
+        if results.highlighted is not None:
+            self.dismiss(self.index.entries[results.get_option_at_index(results.highlighted).id][0])
+
+    @on(OptionList.OptionSelected, "#palette-results")
+    def on_pick(self, event: OptionList.OptionSelected):
+        self.dismiss(self.index.entries[event.option.id][0])
+
+    def action_dismiss_palette(self):
+        self.dismiss(None)
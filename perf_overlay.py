@@ -0,0 +1,70 @@
+import time
+
+from rich.table import Table
+from rich.markup import escape
+from textual.widgets import Static
+
+from metrics import METRICS
+
+# Seconds between overlay refreshes while it is visible
+OVERLAY_INTERVAL = 1.0
+
+
+def _ms(value):
+    return "-" if value is None else f"{value * 1000:.2f}"
+
+
+class MetricsOverlay(Static):
+    """Live per-session performance table, toggled with Ctrl+G.
+
+    Shown docked over the terminal area. While visible it turns on the
+    registry's timers and redraws once a second; hidden, it stops both.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.previous = {}
+        self.timer = None
+
+    def on_mount(self):
+        self.display = False
+
+    def toggle(self):
+        self.display = not self.display
+        METRICS.overlay = self.display
+        if self.display:
+            self.previous = {}
+            self.update_table()
+            self.timer = self.set_interval(OVERLAY_INTERVAL, self.update_table)
+        elif self.timer:
+            self.timer.stop()
+            self.timer = None
+
+    def update_table(self):
+        now = time.monotonic()
+        table = Table(title="NEURAL LINK TELEMETRY", expand=True, box=None, header_style="bold #6366f1",
+                      title_style="bold #10b981")
+        for column in ("LINK", "IN KB/s", "OUT B/s", "RECV Q", "SEND Q", "FEED p50/p95 ms",
+                       "TRIG p95 ms", "FRAME p50/p95 ms", "CONNECT ms", "RECONN"):
+            table.add_column(column, justify="left" if column in ("LINK", "CONNECT ms") else "right")
+        current = {}
+        for m in sorted(METRICS.snapshot(), key=lambda m: m.name):
+            current[m.session_id] = (m.bytes_in, m.bytes_out, now)
+            last = self.previous.get(m.session_id)
+            if last and now > last[2]:
+                rate_in = f"{(m.bytes_in - last[0]) / (now - last[2]) / 1024:.1f}"
+                rate_out = f"{(m.bytes_out - last[1]) / (now - last[2]):.0f}"
+            else:
+                rate_in = rate_out = "-"
+            depths = m.queue_depths()
+            connect = " ".join(f"{phase}={seconds * 1000:.0f}" for phase, seconds in m.connect.items()) or "-"
+            table.add_row(
+                escape(m.name), rate_in, rate_out,
+                str(depths.get("recv", "-")), str(depths.get("send", "-")),
+                f"{_ms(m.feed.percentile(0.5))}/{_ms(m.feed.percentile(0.95))}",
+                _ms(m.triggers.percentile(0.95)),
+                f"{_ms(m.frame.percentile(0.5))}/{_ms(m.frame.percentile(0.95))}",
+                connect, str(m.reconnects),
+            )
+        self.previous = current
+        self.update(table)
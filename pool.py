@@ -0,0 +1,234 @@
+import functools
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Seconds between SSH keepalive packets on pooled transports
+KEEPALIVE = 30
+# Transports with no open channels are closed after this many idle seconds
+IDLE_TIMEOUT = 300
+CONNECT_TIMEOUT = 10
+# Upper bound on handshakes in flight; opening a 200-device folder queues
+# behind these workers instead of starting 200 threads
+CONNECT_WORKERS = int(os.environ.get("NEUROSSH_CONNECT_WORKERS", 16))
+
+
+@functools.cache
+def timed_client_class():
+    """SSHClient subclass that notes when key exchange ends and authentication starts.
+
+    Built on first use so paramiko is only imported once a link is opened.
+    """
+    import paramiko
+
+    class TimedClient(paramiko.SSHClient):
+        kex_done = None
+
+        def _auth(self, *args, **kwargs):
+            self.kex_done = time.perf_counter()
+            return super()._auth(*args, **kwargs)
+
+    return TimedClient
+
+
+class PooledTransport:
+    """One authenticated SSH connection shared by every tab to the same target.
+
+    ``phases`` holds the seconds spent in TCP connect, key exchange and
+    authentication when the connection was made. ``via`` is the bastion's
+    entry for a connection tunnelled through a jump host.
+    """
+
+    def __init__(self, key, client, phases=None, via=None):
+        self.key = key
+        self.client = client
+        self.via = via
+        self.transport = client.get_transport()
+        self.phases = phases or {}
+        self.created = time.monotonic()
+        self.channels = 0
+        self.last_used = time.monotonic()
+
+    @property
+    def alive(self):
+        return self.transport is not None and self.transport.is_active()
+
+    def close(self):
+        self.client.close()
+
+
+class TransportPool:
+    """Process-wide pool of authenticated transports keyed by (host, port, user, jump).
+
+    ``open_shell`` reuses a live transport when one exists, so a second tab to
+    a known host only costs a channel open. Dead transports are replaced
+    transparently and idle ones are reaped in the background.
+
+    A target behind a bastion (``jump``) is reached over a direct-tcpip
+    channel of the bastion's own pooled transport: a hundred devices behind
+    one jump host cost one bastion handshake, and the bastion stays up for as
+    long as any of them does. ``jump`` is the bastion's (host, port, user, password).
+    """
+
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, keepalive=KEEPALIVE):
+        self.idle_timeout = idle_timeout
+        self.keepalive = keepalive
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._reaper = None
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _open_tunnel(self, host, port, jump, timeout):
+        """A direct-tcpip channel to (host, port) from the bastion, and the bastion's entry."""
+        import paramiko
+        for attempt in range(2):
+            bastion = self.acquire(*jump, timeout=timeout)
+            try:
+                sock = bastion.transport.open_channel("direct-tcpip", (host, port), ("127.0.0.1", 0),
+                                                      timeout=timeout)
+            except (paramiko.ChannelException, paramiko.SSHException, EOFError, OSError) as e:
+                # A refused forward is the target's problem; anything else, the bastion's
+                if attempt or isinstance(e, paramiko.ChannelException):
+                    raise
+                self.discard(bastion)
+                continue
+            with self._lock:
+                bastion.channels += 1
+                bastion.last_used = time.monotonic()
+            return sock, bastion
+
+    def _connect(self, key, password, timeout, jump=None):
+        import paramiko
+        host, port, user, _ = key
+        started = time.perf_counter()
+        # TCP connect (or the tunnel through the bastion) done here so it can
+        # be timed apart from the SSH handshake
+        if jump:
+            sock, via = self._open_tunnel(host, port, jump, timeout)
+        else:
+            sock, via = socket.create_connection((host, port), timeout), None
+        connected = time.perf_counter()
+        client = timed_client_class()()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        try:
+            client.connect(host, port=port, username=user, password=password, timeout=timeout, sock=sock)
+        except BaseException:
+            sock.close()
+            if via:
+                self.release(via)
+            raise
+        done = time.perf_counter()
+        kex_done = client.kex_done or done
+        client.get_transport().set_keepalive(self.keepalive)
+        phases = {"tcp": connected - started, "kex": kex_done - connected, "auth": done - kex_done}
+        return PooledTransport(key, client, phases, via)
+
+    def acquire(self, host, port, user, password, timeout=CONNECT_TIMEOUT, jump=None):
+        """Return a live pooled transport for the target, connecting if needed."""
+        key = (host, port, user, jump[:3] if jump else None)
+        # Per-key lock: ten tabs opened at once to one router share one handshake
+        with self._key_lock(key):
+            entry = self.entries.get(key)
+            if entry and not entry.alive:
+                self._close(entry)
+                entry = None
+            if entry is None:
+                entry = self._connect(key, password, timeout, jump)
+                with self._lock:
+                    self.entries[key] = entry
+                self._start_reaper()
+            return entry
+
+    def open_channel(self, host, port, user, password, timeout=CONNECT_TIMEOUT, setup=None,
+                     window_size=None, max_packet_size=None, jump=None):
+        """Open a session channel on the pooled transport, reconnecting once if it died.
+
+        ``setup(channel)`` runs before the channel is handed out (pty, shell,
+        exec, sftp...); failures there count as a dead transport too. Bulk
+        transfers ask for a bigger ``window_size`` than paramiko's default.
+        """
+        import paramiko
+        for attempt in range(2):
+            entry = self.acquire(host, port, user, password, timeout, jump)
+            try:
+                channel = entry.transport.open_session(window_size=window_size, max_packet_size=max_packet_size,
+                                                       timeout=timeout)
+                if setup:
+                    setup(channel)
+            except (paramiko.SSHException, EOFError, OSError):
+                self.discard(entry)
+                if attempt:
+                    raise
+                continue
+            with self._lock:
+                entry.channels += 1
+                entry.last_used = time.monotonic()
+            return channel, entry
+
+    def open_shell(self, host, port, user, password, term="xterm", width=120, height=40,
+                   timeout=CONNECT_TIMEOUT, jump=None):
+        """Open an interactive shell channel with a PTY."""
+        def setup(channel):
+            channel.get_pty(term, width, height)
+            channel.invoke_shell()
+        return self.open_channel(host, port, user, password, timeout, setup, jump=jump)
+
+    def release(self, entry):
+        """Called when a channel opened through ``open_shell`` is closed."""
+        with self._lock:
+            entry.channels = max(0, entry.channels - 1)
+            entry.last_used = time.monotonic()
+
+    def discard(self, entry):
+        with self._lock:
+            if self.entries.get(entry.key) is entry:
+                del self.entries[entry.key]
+        self._close(entry)
+
+    def _close(self, entry):
+        entry.close()
+        if entry.via:
+            # The tunnel was one of the bastion's channels
+            self.release(entry.via)
+            entry.via = None
+
+    def _start_reaper(self):
+        with self._lock:
+            if self._reaper and self._reaper.is_alive():
+                return
+            self._reaper = threading.Thread(target=self._reap, daemon=True)
+            self._reaper.start()
+
+    def _reap(self):
+        while True:
+            time.sleep(min(self.idle_timeout, 30))
+            now = time.monotonic()
+            with self._lock:
+                stale = [e for e in self.entries.values()
+                         if not e.alive or (e.channels == 0 and now - e.last_used > self.idle_timeout)]
+                for entry in stale:
+                    del self.entries[entry.key]
+                done = not self.entries
+                if done:
+                    self._reaper = None
+            for entry in stale:
+                self._close(entry)
+            if done:
+                return
+
+    def close_all(self):
+        with self._lock:
+            entries = list(self.entries.values())
+            self.entries.clear()
+        for entry in entries:
+            entry.close()
+
+
+POOL = TransportPool()
+CONNECTOR = ThreadPoolExecutor(max_workers=CONNECT_WORKERS, thread_name_prefix="connect")
@@ -0,0 +1,86 @@
+import queue
+import threading
+
+# Largest single recv from the channel; paramiko hands back whatever is
+# buffered up to this size, so big dumps arrive in few calls.
+RECV_SIZE = 32768
+# Upper bound on how much we glue together before handing a batch to the UI.
+BATCH_SIZE = 262144
+# On EOF, how long to wait for the exit status or channel close that follows
+# a clean logout; EOF with neither behind it marks the link as dropped
+EXIT_GRACE = 1.0
+# Number of batches allowed in flight. When the UI falls behind the reader
+# blocks, paramiko's window fills and the remote end is throttled.
+QUEUE_DEPTH = 64
+
+
+class ChannelReader(threading.Thread):
+    """Drains a paramiko channel into a bounded queue as soon as data arrives.
+
+    The thread sits in a blocking ``recv`` while the session is idle, so a
+    quiet tab costs nothing. ``on_data`` is invoked once per burst (not per
+    chunk) to wake the consumer; ``None`` is queued on EOF, with ``dropped``
+    already set. Callables in ``taps`` see every batch on the reader thread,
+    before it is queued.
+    """
+
+    def __init__(self, channel, on_data, maxsize=QUEUE_DEPTH):
+        super().__init__(daemon=True)
+        self.channel = channel
+        self.on_data = on_data
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.taps = []
+        # True once EOF arrived with no exit status or close following it
+        self.dropped = False
+        self._pending = threading.Event()
+        self._stopped = threading.Event()
+
+    def run(self):
+        self.channel.settimeout(None)
+        while not self._stopped.is_set():
+            try:
+                data = self.channel.recv(RECV_SIZE)
+            except Exception:
+                data = b""
+            if not data:
+                # Set when the exit status arrives or the channel closes
+                self.dropped = not self.channel.status_event.wait(EXIT_GRACE)
+                self._push(None)
+                return
+            chunks = [data]
+            size = len(data)
+            # Drain everything already buffered so one wake-up carries the burst.
+            while size < BATCH_SIZE and self.channel.recv_ready():
+                more = self.channel.recv(RECV_SIZE)
+                if not more:
+                    break
+                chunks.append(more)
+                size += len(more)
+            data = b"".join(chunks)
+            for tap in self.taps:
+                tap(data)
+            self._push(data)
+
+    def _push(self, item):
+        while not self._stopped.is_set():
+            try:
+                self.queue.put(item, timeout=0.5)
+                break
+            except queue.Full:
+                continue
+        if not self._pending.is_set():
+            self._pending.set()
+            self.on_data()
+
+    def drain(self):
+        """Return all queued batches. Called from the UI thread."""
+        self._pending.clear()
+        items = []
+        while True:
+            try:
+                items.append(self.queue.get_nowait())
+            except queue.Empty:
+                return items
+
+    def stop(self):
+        self._stopped.set()
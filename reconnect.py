@@ -0,0 +1,136 @@
+import json
+import os
+import random
+import tempfile
+import time
+
+# Backoff before retry n is a random delay in [0, min(RECONNECT_CAP, RECONNECT_BASE * 2**n)]
+# seconds ("full jitter"), so tabs dropped together don't retry in lockstep
+RECONNECT_BASE = 1.0
+RECONNECT_CAP = 60.0
+# Reconnects started per second, across every tab and host; a site outage
+# then comes back as a trickle instead of a herd on the jump host
+RECONNECT_RATE = 4.0
+# Open tabs are remembered beside the session archive and reopened at launch
+TABS_FILE = ".open-tabs.json"
+
+
+def backoff(failures, base=RECONNECT_BASE, cap=RECONNECT_CAP):
+    return random.uniform(0, min(cap, base * 2 ** failures))
+
+
+def target_key(config):
+    return (config.host, config.port)
+
+
+class Target:
+    def __init__(self):
+        self.failures = 0
+        self.probe = None
+        self.waiting = []
+
+
+class ReconnectScheduler:
+    """Decides when dropped links try again; used from the UI thread only.
+
+    Tabs are grouped by target (host, port). Only one tab per target probes
+    at a time, with jittered exponential backoff between failed probes; the
+    rest wait and follow as soon as a probe gets through (their channels
+    then ride the pooled transport it built). Probes and followers to all
+    targets share one rate limit. Terminals are driven through ``reconnect_in(delay,
+    attempt)`` and report back with ``result()``.
+    """
+
+    def __init__(self, rate=RECONNECT_RATE, clock=time.monotonic):
+        self.rate = rate
+        self.clock = clock
+        self.targets = {}
+        self.next_slot = 0.0
+
+    def _slot(self, delay):
+        """Delay pushed back to the next free slot of the global rate limit."""
+        now = self.clock()
+        at = max(now + delay, self.next_slot)
+        self.next_slot = at + 1 / self.rate
+        return at - now
+
+    def _probe(self, key):
+        target = self.targets[key]
+        target.waiting = [t for t in target.waiting if not t.closed]
+        if not target.waiting:
+            del self.targets[key]
+            return
+        term = target.probe = target.waiting.pop(0)
+        term.reconnect_in(self._slot(backoff(target.failures)), target.failures + 1)
+
+    def lost(self, term):
+        key = target_key(term.config)
+        target = self.targets.setdefault(key, Target())
+        if term is not target.probe and term not in target.waiting:
+            target.waiting.append(term)
+        if target.probe is None:
+            self._probe(key)
+        else:
+            term.reconnect_in(None, 0)
+
+    def result(self, term, ok):
+        key = target_key(term.config)
+        target = self.targets.get(key)
+        if target is None or target.probe is not term:
+            # A follower; if it failed after all, it queues up again
+            if not ok:
+                self.lost(term)
+            return
+        target.probe = None
+        if not ok:
+            target.failures += 1
+            target.waiting.insert(0, term)
+            self._probe(key)
+            return
+        del self.targets[key]
+        for follower in target.waiting:
+            if not follower.closed:
+                follower.reconnect_in(self._slot(0), 1)
+
+    def cancel(self, term):
+        """Forget a tab that was closed while it waited."""
+        key = target_key(term.config)
+        target = self.targets.get(key)
+        if target is None:
+            return
+        if term in target.waiting:
+            target.waiting.remove(term)
+        if target.probe is term:
+            target.probe = None
+            self._probe(key)
+        elif not target.waiting and target.probe is None:
+            del self.targets[key]
+
+
+RECONNECTS = ReconnectScheduler()
+
+
+def tabs_path(vault):
+    return os.path.join(os.path.dirname(os.path.abspath(vault)), TABS_FILE)
+
+
+def save_open_tabs(path, ids, active):
+    directory = os.path.dirname(path)
+    fd, tmp = tempfile.mkstemp(prefix=".tabs-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump({"tabs": ids, "active": active}, f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def load_open_tabs(path):
+    """(session ids in tab order, active id) saved by the last run."""
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+        return list(data.get("tabs", [])), data.get("active")
+    except (OSError, ValueError, AttributeError):
+        return [], None
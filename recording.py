@@ -0,0 +1,230 @@
+import bisect
+import codecs
+import datetime
+import json
+import os
+import pickle
+import queue
+import sys
+import threading
+import time
+import zlib
+
+from models import BASE_DIR
+from sessionlog import CLOSING, FLUSH_INTERVAL, WRITE_BUFFER
+
+RECORD_DIR = os.path.join(BASE_DIR, "recordings")
+RECORD_MODES = [("Off", False), ("Asciicast v2", True)]
+# The player keeps a copy of the screen after every this many characters of
+# output, so a seek re-parses at most this much (pyte manages a few hundred
+# KB/s) instead of everything from the start
+SNAPSHOT_CHARS = 32 * 1024
+
+
+def recording_name(name):
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+
+
+class CastRecorder:
+    """Records a session as asciicast v2 (header line + ``[time, code, text]`` lines).
+
+    ``output()`` and ``input()`` only stamp the time and enqueue, so they are
+    safe to call from the reader thread, the event loop or the UI; decoding,
+    JSON encoding and disk writes happen on a background thread through a
+    large buffer that is flushed whenever the session goes quiet.
+    """
+
+    def __init__(self, name, width, height, directory=RECORD_DIR):
+        self.name = recording_name(name)
+        self.width = width
+        self.height = height
+        self.directory = directory
+        self.path = None
+        self.started = time.monotonic()
+        self.queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def output(self, data):
+        self.queue.put((time.monotonic() - self.started, "o", data))
+
+    def input(self, data):
+        self.queue.put((time.monotonic() - self.started, "i", data))
+
+    def close(self):
+        """Stop after everything queued so far is written; returns at once."""
+        self.queue.put(None)
+        CLOSING.add(self._thread)
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        now = datetime.datetime.now()
+        stem = os.path.join(self.directory, f"session_{self.name}_{now.strftime('%Y%m%d_%H%M%S')}")
+        path, suffix = f"{stem}.cast", 1
+        while os.path.exists(path):
+            path = f"{stem}-{suffix}.cast"
+            suffix += 1
+        self.path = path
+        f = open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER)
+        header = {"version": 2, "width": self.width, "height": self.height,
+                  "timestamp": int(now.timestamp()), "title": self.name, "env": {"TERM": "xterm"}}
+        f.write(json.dumps(header) + "\n")
+        return f
+
+    def _run(self):
+        # One decoder per direction keeps multi-byte characters split across reads intact
+        decoders = {code: codecs.getincrementaldecoder("utf-8")(errors="replace") for code in "oi"}
+        try:
+            f = self._open()
+        except OSError:
+            f = None
+        while True:
+            try:
+                item = self.queue.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                if f:
+                    f.flush()
+                continue
+            if item is None:
+                if f:
+                    f.close()
+                return
+            if f is None:
+                continue  # unwritable directory: drain and drop
+            at, code, data = item
+            text = data if isinstance(data, str) else decoders[code].decode(data)
+            if not text:
+                continue
+            try:
+                f.write(f"[{at:.6f}, \"{code}\", {json.dumps(text, ensure_ascii=False)}]\n")
+            except OSError:
+                # A full disk must not take the session down with it
+                f.close()
+                f = None
+
+
+def list_recordings(name, directory=RECORD_DIR):
+    """Recordings of one session, newest first."""
+    prefix = f"session_{recording_name(name)}_"
+    try:
+        files = [f for f in os.listdir(directory) if f.startswith(prefix) and f.endswith(".cast")]
+    except FileNotFoundError:
+        return []
+    return [os.path.join(directory, f) for f in sorted(files, reverse=True)]
+
+
+def load_cast(path):
+    """Return (header, output events as (time, text)) from an asciicast v2 file."""
+    with open(path, "r", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("version") != 2:
+            raise ValueError(f"{path}: not an asciicast v2 recording")
+        lines = [line for line in f.read().splitlines() if line.strip()]
+    # One C-level parse for the whole body instead of one json.loads per event
+    try:
+        events = json.loads("[" + ",".join(lines) + "]")
+    except ValueError:
+        # A recording cut short by a crash ends in a partial line; keep what parses
+        events = []
+        for line in lines:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                break
+    return header, [(e[0], e[2]) for e in events if e[1] == "o"]
+
+
+def take_snapshot(screen):
+    """Compressed copy of a pyte screen's state (a few KB for a full 120x40 screen)."""
+    state = {k: v for k, v in vars(screen).items() if k not in ("buffer", "dirty")}
+    rows = {y: dict(row) for y, row in screen.buffer.items() if row}
+    return zlib.compress(pickle.dumps((state, rows), pickle.HIGHEST_PROTOCOL), 1)
+
+
+def restore_snapshot(screen, snapshot):
+    state, rows = pickle.loads(zlib.decompress(snapshot))
+    vars(screen).update(state)
+    screen.buffer.clear()
+    for y, row in rows.items():
+        screen.buffer[y].update(row)
+    screen.dirty.update(range(screen.lines))
+
+
+class CastPlayer:
+    """Feeds a recording's output into a pyte screen, with snapshot-backed seeking.
+
+    Loading parses the whole recording once, taking a snapshot every
+    ``snapshot_chars`` of output, so any point, even on the first seek, is
+    reached by restoring the nearest snapshot and parsing at most
+    ``snapshot_chars``. Construct it off the UI thread for long recordings.
+    ``play_until`` and ``seek`` accept a time budget so the viewer can spread
+    the work over several frames.
+    """
+
+    def __init__(self, path, snapshot_chars=SNAPSHOT_CHARS):
+        import pyte
+        from fastpath import FastStream
+        self.header, self.events = load_cast(path)
+        self.times = [t for t, _ in self.events]
+        self.duration = self.times[-1] if self.times else 0.0
+        self.screen = pyte.Screen(self.header["width"], self.header["height"])
+        self.stream = FastStream(self.screen)
+        self.snapshot_chars = snapshot_chars
+        # Event index each snapshot was taken at (ascending); index 0 is the blank screen
+        self.snapshot_at = [0]
+        self.snapshots = [take_snapshot(self.screen)]
+        self.position = 0
+        self._since_snapshot = 0
+        self._feed(len(self.events), None)
+        self._restore(0)
+
+    @property
+    def clock(self):
+        """Recording time of the last event fed."""
+        return self.times[self.position - 1] if self.position else 0.0
+
+    def _feed(self, until, budget):
+        deadline = time.perf_counter() + budget if budget else None
+        while self.position < until:
+            text = self.events[self.position][1]
+            self.stream.feed(text)
+            self.position += 1
+            if self.position > self.snapshot_at[-1]:
+                self._since_snapshot += len(text)
+                # Only between escape sequences: a fresh Stream starts in the ground state
+                if self._since_snapshot >= self.snapshot_chars and self.stream._taking_plain_text:
+                    self.snapshot_at.append(self.position)
+                    self.snapshots.append(take_snapshot(self.screen))
+                    self._since_snapshot = 0
+            if deadline and time.perf_counter() > deadline:
+                break
+        return self.position >= until
+
+    def play_until(self, t, budget=None):
+        """Feed every event up to recording time ``t``; False if the budget ran out first."""
+        return self._feed(bisect.bisect_right(self.times, t), budget)
+
+    def _restore(self, i):
+        from fastpath import FastStream
+        restore_snapshot(self.screen, self.snapshots[i])
+        self.stream = FastStream(self.screen)
+        self.position = self.snapshot_at[i]
+        self._since_snapshot = 0
+
+    def seek(self, t, budget=None):
+        """Show the screen as it was at time ``t``; call again while it returns False."""
+        target = bisect.bisect_right(self.times, t)
+        i = bisect.bisect_right(self.snapshot_at, target) - 1
+        if target < self.position or self.snapshot_at[i] > self.position:
+            self._restore(i)
+        return self._feed(target, budget)
+
+
+if __name__ == "__main__":
+    # Usage: python recording.py dump <file.cast> [seconds]
+    if len(sys.argv) not in (3, 4) or sys.argv[1] != "dump":
+        print("usage: python recording.py dump <file.cast> [seconds]")
+        sys.exit(1)
+    player = CastPlayer(sys.argv[2])
+    player.seek(float(sys.argv[3]) if len(sys.argv) == 4 else player.duration)
+    print("\n".join(line.rstrip() for line in player.screen.display))
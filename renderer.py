@@ -0,0 +1,148 @@
+from collections import OrderedDict
+
+from rich.segment import Segment
+from rich.style import Style
+from textual.strip import Strip
+
+# pyte reports the 16 base colours by name; Rich spells a couple differently.
+COLOR_NAMES = {
+    "brown": "yellow",
+    "brightbrown": "bright_yellow",
+    "brightblack": "bright_black",
+    "brightred": "bright_red",
+    "brightgreen": "bright_green",
+    "brightblue": "bright_blue",
+    "brightmagenta": "bright_magenta",
+    "brightcyan": "bright_cyan",
+    "brightwhite": "bright_white",
+}
+
+
+# Scrollback strips are only built for lines that scroll into view; keep a
+# few screens' worth around for smooth scrolling.
+HISTORY_CACHE = 512
+
+
+def to_color(value):
+    """Translate a pyte colour (name, 'default' or 6-digit hex) to a Rich colour string."""
+    if value == "default":
+        return None
+    if value in COLOR_NAMES:
+        return COLOR_NAMES[value]
+    if len(value) == 6 and all(c in "0123456789abcdefABCDEF" for c in value):
+        return f"#{value}"
+    return value
+
+
+class ScreenRenderer:
+    """Keeps one cached Strip per pyte screen row and rebuilds only dirty rows.
+
+    ``update()`` consumes ``screen.dirty`` (plus cursor movement) and returns
+    the rows whose strips changed so the widget can refresh just those lines.
+    When a Scrollback is attached, lines ``0..len(history)-1`` come from it
+    and are rendered lazily, only when they scroll into the viewport.
+    """
+
+    def __init__(self, screen, history=None):
+        self.screen = screen
+        self.history = history
+        self.base_style = Style()
+        self.strips = {}
+        self.history_strips = OrderedDict()
+        self.styles = {}
+        self.cursor_visible = True
+        self._cursor = None
+
+    def style_for(self, char, cursor=False):
+        return self.attr_style(char[1:], cursor)
+
+    def attr_style(self, attr, cursor=False):
+        """Style for a pyte attribute tuple (fg, bg, bold, ..., reverse, blink)."""
+        key = (attr, cursor)
+        style = self.styles.get(key)
+        if style is None:
+            fg, bg, bold, italic, underline, strike, reverse, blink = attr
+            reverse = reverse != cursor
+            style = Style(
+                color=to_color(fg), bgcolor=to_color(bg), bold=bold or None,
+                italic=italic or None, underline=underline or None,
+                strike=strike or None, reverse=reverse or None, blink=blink or None,
+            )
+            self.styles[key] = style
+        return style
+
+    def render_row(self, y):
+        screen = self.screen
+        row = screen.buffer[y]
+        default = screen.default_char
+        cursor_x = screen.cursor.x if self.cursor_visible and y == screen.cursor.y else -1
+        segments = []
+        text, style = [], None
+        for x in range(screen.columns):
+            char = row[x] if x in row else default
+            if not char.data:
+                continue  # right half of a wide character
+            cell_style = self.style_for(char, cursor=(x == cursor_x))
+            if cell_style is not style and text:
+                segments.append(Segment("".join(text), style))
+                text = []
+            style = cell_style
+            text.append(char.data)
+        if text:
+            segments.append(Segment("".join(text), style))
+        return Strip(segments, screen.columns).apply_style(self.base_style)
+
+    def update(self):
+        """Re-render dirty rows and return their indexes."""
+        screen = self.screen
+        dirty = set(screen.dirty)
+        screen.dirty.clear()
+        cursor = (screen.cursor.x, screen.cursor.y, not screen.cursor.hidden)
+        if cursor != self._cursor:
+            if self._cursor:
+                dirty.add(self._cursor[1])
+            dirty.add(cursor[1])
+            self._cursor = cursor
+        self.cursor_visible = cursor[2]
+        dirty = {y for y in dirty if 0 <= y < screen.lines}
+        for y in dirty:
+            self.strips[y] = self.render_row(y)
+        return dirty
+
+    def render_history(self, index):
+        text, spans = self.history.get(index)
+        if spans is None:
+            segments = [Segment(text, self.attr_style(self.screen.default_char[1:]))]
+        else:
+            segments, pos = [], 0
+            for length, attr in spans:
+                segments.append(Segment(text[pos:pos + length], self.attr_style(attr)))
+                pos += length
+        return Strip(segments).apply_style(self.base_style)
+
+    def history_line(self, index):
+        key = self.history.first + index
+        strip = self.history_strips.get(key)
+        if strip is None:
+            strip = self.history_strips[key] = self.render_history(index)
+            if len(self.history_strips) > HISTORY_CACHE:
+                self.history_strips.popitem(last=False)
+        return strip
+
+    def line(self, y):
+        """Strip for widget line ``y``: scrollback first, then the live screen."""
+        if self.history is not None:
+            if y < len(self.history):
+                return self.history_line(y)
+            y -= len(self.history)
+        strip = self.strips.get(y)
+        if strip is None:
+            strip = self.strips[y] = self.render_row(y)
+        return strip
+
+    def invalidate(self, base_style=None):
+        if base_style is not None:
+            self.base_style = base_style
+        self.strips.clear()
+        self.history_strips.clear()
+        self.screen.dirty.update(range(self.screen.lines))
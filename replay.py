@@ -0,0 +1,179 @@
+import os
+import time
+
+from rich.markup import escape
+from textual.app import ComposeResult
+from textual.geometry import Region
+from textual.screen import ModalScreen
+from textual.widget import Widget
+from textual.widgets import Static, OptionList
+from textual.widgets.option_list import Option
+from textual.containers import Vertical
+from textual import on
+
+from recording import list_recordings
+from renderer import ScreenRenderer
+
+# Playback speeds on keys 1/2/3; None parses as fast as the budget allows
+SPEEDS = {"1": 1.0, "2": 10.0, "3": None}
+SPEED_LABELS = {1.0: "1x", 10.0: "10x", None: "MAX"}
+TICK = 1 / 30
+# Parse time allowed per tick at max speed or while seeking, so keys stay responsive
+TICK_BUDGET = 0.02
+
+
+def _clock(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+class RecordingPicker(ModalScreen):
+    """Recordings of one session, newest first; Enter opens the replay viewer."""
+
+    BINDINGS = [("escape", "dismiss_picker", "Close")]
+
+    def __init__(self, name):
+        super().__init__()
+        self.session_name = name
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="modal-dialog", classes="palette-dialog"):
+            yield Static(f"RECORDINGS // {escape(self.session_name)}", id="modal-title")
+            yield OptionList(id="recording-list")
+
+    def on_mount(self):
+        recordings = self.query_one("#recording-list")
+        for path in list_recordings(self.session_name):
+            size = os.path.getsize(path) / 1024
+            recordings.add_option(Option(f"{escape(os.path.basename(path))}  [dim]{size:,.0f} KB[/dim]", id=path))
+        if recordings.option_count:
+            recordings.highlighted = 0
+        else:
+            recordings.add_option(Option("[dim]No recordings yet. Enable Recording in the session config.[/dim]",
+                                         disabled=True))
+        recordings.focus()
+
+    @on(OptionList.OptionSelected, "#recording-list")
+    def on_pick(self, event: OptionList.OptionSelected):
+        self.dismiss(event.option.id)
+
+    def action_dismiss_picker(self):
+        self.dismiss(None)
+
+
+class CastView(Widget):
+    """Renders a CastPlayer's screen, rebuilding only the rows pyte marked dirty."""
+
+    def __init__(self, player, **kwargs):
+        super().__init__(**kwargs)
+        self.player = player
+        self.renderer = ScreenRenderer(player.screen)
+
+    def on_mount(self):
+        self.renderer.invalidate(self.rich_style)
+
+    def get_content_width(self, container, viewport):
+        return self.player.screen.columns
+
+    def get_content_height(self, container, viewport, width):
+        return self.player.screen.lines
+
+    def repaint(self):
+        width = self.player.screen.columns
+        for y in self.renderer.update():
+            self.refresh(Region(0, y, width, 1))
+
+    def render_line(self, y):
+        return self.renderer.line(y).crop_extend(0, self.size.width, self.rich_style)
+
+
+class ReplayScreen(ModalScreen):
+    """Plays an asciicast recording at 1x, 10x or max speed, with seeking.
+
+    Playback advances on a timer; max speed and seeks parse for at most
+    TICK_BUDGET per tick, and any position is reached from the nearest of
+    the screen snapshots the player took while loading, so the UI never
+    freezes on a long recording.
+    """
+
+    BINDINGS = [
+        ("escape", "close_replay", "Close"),
+        ("space", "toggle_pause", "Pause"),
+        ("1", "speed('1')", "1x"),
+        ("2", "speed('2')", "10x"),
+        ("3", "speed('3')", "Max"),
+        ("left", "seek(-10)", "-10s"),
+        ("right", "seek(10)", "+10s"),
+        ("pageup", "seek(-60)", "-1m"),
+        ("pagedown", "seek(60)", "+1m"),
+        ("home", "seek(-1e12)", "Start"),
+        ("end", "seek(1e12)", "End"),
+    ]
+
+    def __init__(self, player, name):
+        super().__init__()
+        self.player = player
+        self.recording_name = name
+        self.clock = 0.0
+        self.speed = SPEEDS["1"]
+        self.paused = False
+        self.seeking = None
+        self._last_tick = time.monotonic()
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="modal-dialog", classes="replay-dialog"):
+            yield Static(f"REPLAY // {escape(self.recording_name)}", id="modal-title")
+            yield CastView(self.player, id="replay-view")
+            yield Static(id="replay-status")
+
+    def on_mount(self):
+        self.set_interval(TICK, self.tick)
+        self.update_status()
+
+    def tick(self):
+        now = time.monotonic()
+        elapsed, self._last_tick = now - self._last_tick, now
+        player = self.player
+        if self.seeking is not None:
+            if player.seek(self.seeking, TICK_BUDGET):
+                self.seeking = None
+        elif not self.paused:
+            if self.speed is None:
+                player.play_until(player.duration, TICK_BUDGET)
+                self.clock = player.clock
+            else:
+                self.clock = min(self.clock + elapsed * self.speed, player.duration)
+                player.play_until(self.clock, TICK_BUDGET)
+            if player.position >= len(player.events):
+                self.clock = player.duration
+                self.paused = True
+        self.query_one(CastView).repaint()
+        self.update_status()
+
+    def update_status(self):
+        player = self.player
+        if self.seeking is not None:
+            state = f"SEEKING {player.position * 100 // max(1, len(player.events))}%"
+        else:
+            state = "PAUSED" if self.paused else "PLAYING"
+        self.query_one("#replay-status").update(
+            f"{_clock(self.clock)} / {_clock(player.duration)}  [b]{SPEED_LABELS[self.speed]}[/b]  {state}"
+            f"  [dim]SPACE pause  1/2/3 speed  ←/→ 10s  PgUp/PgDn 1m  Home/End  ESC close[/dim]")
+
+    def action_toggle_pause(self):
+        if self.paused and self.player.position >= len(self.player.events):
+            self.action_seek(-1e12)  # finished: play again from the start
+        self.paused = not self.paused
+        self.update_status()
+
+    def action_speed(self, key):
+        self.speed = SPEEDS[key]
+        self.update_status()
+
+    def action_seek(self, delta):
+        self.clock = min(max(self.clock + delta, 0.0), self.player.duration)
+        self.seeking = self.clock
+        self.update_status()
+
+    def action_close_replay(self):
+        self.dismiss(None)
@@ -0,0 +1,92 @@
+from array import array
+from collections import deque
+from itertools import groupby, repeat
+from operator import itemgetter
+
+import pyte
+from pyte.screens import Margins
+
+DEFAULT_SCROLLBACK = 100000
+# Text and attributes (fg, bg, bold...) of a pyte Char
+DATA = itemgetter(0)
+ATTRS = itemgetter(slice(1, None))
+
+
+class Scrollback:
+    """Bounded ring buffer of lines that scrolled off the top of the screen.
+
+    Lines are stored compactly: plain lines as UTF-8 ``bytes`` and styled
+    lines as ``(bytes, array)`` where the array holds run-length pairs of
+    ``(length, attribute id)``. Attribute tuples are interned once per
+    buffer, so a line costs roughly its text length plus a few spans.
+    """
+
+    def __init__(self, limit=DEFAULT_SCROLLBACK):
+        self.lines = deque(maxlen=limit)
+        self.attrs = []
+        self._attr_ids = {}
+        # Total lines ever appended; lets callers key caches by absolute line number
+        self.total = 0
+
+    def __len__(self):
+        return len(self.lines)
+
+    @property
+    def first(self):
+        """Absolute number of the oldest line still held."""
+        return self.total - len(self.lines)
+
+    def _attr_id(self, attr):
+        attr_id = self._attr_ids.get(attr)
+        if attr_id is None:
+            attr_id = self._attr_ids[attr] = len(self.attrs)
+            self.attrs.append(attr)
+        return attr_id
+
+    def append(self, row, columns, default):
+        """Encode a pyte buffer row and push it into the ring."""
+        default_attr = default[1:]
+        # Columns past the last one written are blank
+        width = min(columns, max(row, default=-1) + 1)
+        chars = list(map(row.get, range(width), repeat(default)))
+        while chars and chars[-1] == default:
+            chars.pop()
+        text = "".join(map(DATA, chars)).encode("utf-8")
+        spans = None
+        # A line uses few distinct cells; checking those is cheaper than every column
+        if not set(map(ATTRS, set(chars))) <= {default_attr}:
+            # Run-length (length, attribute id) pairs; right halves of wide characters take no run
+            runs = [(sum(1 for _ in group), attr) for attr, group in groupby(ATTRS(c) for c in chars if c.data)]
+            if len(runs) > 1 or runs and runs[0][1] != default_attr:
+                spans = array("I")
+                for length, attr in runs:
+                    spans.extend((length, self._attr_id(attr)))
+        self.lines.append(text if spans is None else (text, spans))
+        self.total += 1
+
+    def get(self, index):
+        """Return ``(text, [(length, attr), ...] or None)`` for a held line."""
+        line = self.lines[index]
+        if isinstance(line, bytes):
+            return line.decode("utf-8"), None
+        text, spans = line
+        return text.decode("utf-8"), [(spans[i], self.attrs[spans[i + 1]]) for i in range(0, len(spans), 2)]
+
+    def text(self, index):
+        line = self.lines[index]
+        return (line if isinstance(line, bytes) else line[0]).decode("utf-8")
+
+
+class ScrollbackScreen(pyte.Screen):
+    """A pyte Screen that hands rows scrolling off the top to a Scrollback."""
+
+    def __init__(self, columns, lines, history):
+        super().__init__(columns, lines)
+        self.history = history
+
+    def index(self):
+        top, bottom = self.margins or Margins(0, self.lines - 1)
+        # Only full-screen scrolls produce history; scroll regions (vi, top) don't
+        if self.cursor.y == bottom and top == 0:
+            self.history.append(self.buffer[top], self.columns, self.default_char)
+        super().index()
@@ -0,0 +1,338 @@
+import glob
+import json
+import mmap
+import multiprocessing
+import os
+import re
+import sys
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from dataclasses import dataclass
+
+from models import BASE_DIR
+from sessionlog import LOG_DIR
+
+# Hits kept per search, and per file or tab so one noisy log can't crowd out the rest
+RESULT_LIMIT = 500
+SOURCE_LIMIT = 100
+# Files are scanned in line-aligned windows of about this size; a window is
+# lowercased once and searched with bytes.find, several times faster than an
+# IGNORECASE regex
+WINDOW = 16 * 1024 * 1024
+# Log sets larger than this are split across worker processes (scanning holds
+# the GIL, so threads would not help); smaller ones are scanned in-process
+PARALLEL_BYTES = 64 * 1024 * 1024
+SEARCH_WORKERS = min(8, os.cpu_count() or 2)
+# Characters of context kept on each side of a hit
+CONTEXT = 120
+INDEX_PATH = os.path.join(BASE_DIR, ".search-index.json")
+INDEX_VERSION = 1
+TOKEN = re.compile(rb"[a-z][a-z0-9_-]{2,}")
+TOKEN_CHARS = set(b"abcdefghijklmnopqrstuvwxyz0123456789_-")
+
+
+@dataclass
+class Hit:
+    source: str      # tab id for live scrollback, file path for saved logs
+    label: str
+    line: int        # live: absolute scrollback line (see Scrollback.first); file: 0-based line
+    offset: int      # file: byte offset of the line, for the preview
+    before: str
+    match: str
+    after: str
+    live: bool = False
+
+
+def log_files():
+    """Saved session text (Ctrl+S) and plain session logs, newest first."""
+    patterns = [os.path.join(d, "session_*.txt") for d in {os.getcwd(), os.path.abspath(BASE_DIR)}]
+    patterns.append(os.path.join(LOG_DIR, "session_*.log"))
+    files = {os.path.abspath(p) for pattern in patterns for p in glob.glob(pattern)}
+    return sorted(files, key=lambda p: os.path.getmtime(p), reverse=True)
+
+
+def scan(buf, needle, fold=True, limit=SOURCE_LIMIT):
+    """Find ``needle`` in ``buf`` (bytes or mmap); returns (line, offset, before, match, after) tuples.
+
+    At most one hit per line. ``needle`` must already be lowercase when
+    ``fold`` is set.
+    """
+    hits, line, start, size = [], 0, 0, len(buf)
+    while start < size:
+        end = buf.find(b"\n", min(start + WINDOW, size))
+        end = size if end < 0 else end + 1
+        window = buf[start:end]
+        hay = window.lower() if fold else window
+        counted = 0
+        i = hay.find(needle)
+        while i >= 0:
+            line += window.count(b"\n", counted, i)
+            line_start = window.rfind(b"\n", 0, i) + 1
+            line_end = window.find(b"\n", i)
+            line_end = len(window) if line_end < 0 else line_end
+            stop = i + len(needle)
+            hits.append((line, start + line_start,
+                         window[max(line_start, i - CONTEXT):i].decode("utf-8", "replace"),
+                         window[i:stop].decode("utf-8", "replace"),
+                         window[stop:min(line_end, stop + CONTEXT)].decode("utf-8", "replace")))
+            if len(hits) >= limit:
+                return hits
+            counted = line_end
+            i = hay.find(needle, line_end)
+        line += window.count(b"\n", counted)
+        start = end
+    return hits
+
+
+def scan_file(path, needle, fold=True, limit=SOURCE_LIMIT):
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return scan(mm, needle, fold, limit)
+    except OSError:
+        return []
+
+
+def terminal_snapshot(term):
+    """Copy what a tab's search needs; must run on the UI thread (pyte mutates these)."""
+    return (f"id_{term.config.id}", term.config.name or term.config.host, term.history.first,
+            list(term.history.lines), list(term.terminal_screen.display))
+
+
+def scan_terminal(snapshot, needle, fold=True, limit=SOURCE_LIMIT):
+    tab_id, label, first, lines, display = snapshot
+    blob = b"\n".join(line if isinstance(line, bytes) else line[0] for line in lines)
+    if lines:
+        blob += b"\n"
+    blob += "\n".join(row.rstrip() for row in display).encode("utf-8")
+    # Screen rows continue the scrollback numbering, so line - history.first is the widget row
+    return [Hit(tab_id, label, first + n, offset, before, match, after, live=True)
+            for n, offset, before, match, after in scan(blob, needle, fold, limit)]
+
+
+def query_tokens(query):
+    """Index tokens a matching line must contain whole: those not cut off by the query's ends."""
+    text = query.lower().encode("utf-8")
+    tokens = set()
+    for m in TOKEN.finditer(text):
+        if m.start() > 0 and m.end() < len(text) \
+                and text[m.start() - 1] not in TOKEN_CHARS and text[m.end()] not in TOKEN_CHARS:
+            tokens.add(m.group().decode())
+    return tokens
+
+
+def file_tokens(path):
+    tokens = set()
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return tokens
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                start, size = 0, len(mm)
+                while start < size:
+                    end = mm.find(b"\n", min(start + WINDOW, size))
+                    end = size if end < 0 else end + 1
+                    tokens.update(TOKEN.findall(mm[start:end].lower()))
+                    start = end
+    except OSError:
+        pass
+    return {t.decode() for t in tokens}
+
+
+class ArchiveIndex:
+    """Incremental token -> files index over saved logs, persisted as JSON.
+
+    ``update()`` only tokenizes files that are new or whose mtime/size
+    changed. ``candidates()`` narrows a search to files holding every whole
+    word of the query; queries without one (short, or just a fragment) scan
+    everything. Indexing costs about as much as a few plain scans of the
+    same data, so it pays off for archives that are searched repeatedly.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self.files = {}      # path -> [mtime_ns, size, file id]
+        self.postings = {}   # token -> set of file ids
+        self.next_id = 0
+        self._lock = threading.Lock()
+        self._updating = threading.Lock()
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if data.get("version") == INDEX_VERSION:
+            self.files = data["files"]
+            self.postings = {token: set(ids) for token, ids in data["postings"].items()}
+            self.next_id = data["next_id"]
+        return self
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(prefix=".search-", suffix=".json", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"version": INDEX_VERSION, "files": self.files, "next_id": self.next_id,
+                           "postings": {token: sorted(ids) for token, ids in self.postings.items()}}, f)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _drop(self, file_id):
+        for token in [t for t, ids in self.postings.items() if file_id in ids]:
+            ids = self.postings[token]
+            ids.discard(file_id)
+            if not ids:
+                del self.postings[token]
+
+    def update(self, paths):
+        """Index new and changed files and forget deleted ones; returns how many changed.
+
+        Tokenizing runs in the worker pool (a separate process even on one
+        core, so the UI keeps the GIL) and outside the lock, so searches keep
+        going meanwhile and scan whatever is not indexed yet. A call made
+        while another update is running returns 0 at once.
+        """
+        if not self._updating.acquire(blocking=False):
+            return 0
+        try:
+            return self._update(paths)
+        finally:
+            self._updating.release()
+
+    def _update(self, paths):
+        todo = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entry = self.files.get(path)
+            if not entry or entry[:2] != [st.st_mtime_ns, st.st_size]:
+                todo.append((path, [st.st_mtime_ns, st.st_size]))
+        tokenized = _process_pool().map(file_tokens, [path for path, _ in todo]) if todo else []
+        changed = 0
+        for (path, stamp), tokens in zip(todo, tokenized):
+            with self._lock:
+                if path in self.files:
+                    self._drop(self.files[path][2])
+                self.files[path] = stamp + [self.next_id]
+                for token in tokens:
+                    self.postings.setdefault(token, set()).add(self.next_id)
+                self.next_id += 1
+            changed += 1
+        with self._lock:
+            for path in set(self.files) - set(paths):
+                self._drop(self.files.pop(path)[2])
+                changed += 1
+            if changed:
+                self.save()
+        return changed
+
+    def candidates(self, query, paths):
+        """The subset of ``paths`` that can contain ``query``."""
+        tokens = query_tokens(query)
+        if not tokens:
+            return paths
+        with self._lock:
+            ids = None
+            for token in tokens:
+                ids = self.postings.get(token, set()) if ids is None else ids & self.postings.get(token, set())
+            result = []
+            for path in paths:
+                entry = self.files.get(path)
+                # Files not indexed yet, or changed since, are always scanned
+                if entry is None or entry[2] in ids or entry[:2] != _stamp(path):
+                    result.append(path)
+            return result
+
+
+def _stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+_pool = None
+
+
+def _process_pool():
+    global _pool
+    if _pool is None:
+        # Textual swaps sys.stderr for an object without a real descriptor,
+        # which multiprocessing would hand to its resource tracker process
+        stderr, sys.stderr = sys.stderr, sys.__stderr__
+        try:
+            resource_tracker.ensure_running()
+        finally:
+            sys.stderr = stderr
+        # spawn, not fork: the UI process is full of threads
+        _pool = ProcessPoolExecutor(max_workers=SEARCH_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def search_files(paths, needle, fold=True, limit=SOURCE_LIMIT):
+    """Scan log files, in worker processes when there is enough data to pay for them."""
+    sizes = {}
+    for path in paths:
+        try:
+            sizes[path] = os.path.getsize(path)
+        except OSError:
+            pass
+    paths = [p for p in paths if p in sizes]
+    if len(paths) > 1 and SEARCH_WORKERS > 1 and sum(sizes.values()) >= PARALLEL_BYTES:
+        # Biggest first so the long scans start early
+        ordered = sorted(paths, key=sizes.get, reverse=True)
+        futures = {p: _process_pool().submit(scan_file, p, needle, fold, limit) for p in ordered}
+        results = {p: f.result() for p, f in futures.items()}
+    else:
+        results = {p: scan_file(p, needle, fold, limit) for p in paths}
+    return [Hit(p, os.path.basename(p), n, offset, before, match, after)
+            for p in paths for n, offset, before, match, after in results[p]]
+
+
+def search(query, snapshots, paths, index=None, limit=RESULT_LIMIT):
+    """Search open tabs (``terminal_snapshot`` copies) and saved logs for a literal string.
+
+    Case-insensitive unless the query has an upper-case letter. Live tabs
+    come first, then logs newest first. With an ``index`` (kept current by
+    the caller, e.g. ``ArchiveIndex.update`` on a background thread) only
+    logs that can match are scanned.
+    """
+    fold = query == query.lower()
+    needle = query.encode("utf-8")
+    if index is not None:
+        paths = index.candidates(query, paths)
+    hits = [hit for snapshot in snapshots for hit in scan_terminal(snapshot, needle, fold)]
+    hits.extend(search_files(paths, needle, fold))
+    return hits[:limit]
+
+
+def read_context(path, offset, radius=5):
+    """Up to ``radius`` lines either side of the line starting at byte ``offset``."""
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                start = offset
+                for _ in range(radius):
+                    if start == 0:
+                        break
+                    start = mm.rfind(b"\n", 0, start - 1) + 1
+                end = offset
+                for _ in range(radius + 1):
+                    newline = mm.find(b"\n", end)
+                    end = len(mm) if newline < 0 else newline + 1
+                return mm[start:end].decode("utf-8", "replace").splitlines()
+    except OSError:
+        return []
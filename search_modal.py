@@ -0,0 +1,104 @@
+from rich.markup import escape
+
+from textual.app import ComposeResult
+from textual.screen import ModalScreen
+from textual.widgets import Static, Input, OptionList
+from textual.widgets.option_list import Option
+from textual.containers import Vertical
+from textual import on, work
+
+from search import search, log_files, read_context, terminal_snapshot, RESULT_LIMIT
+from terminal import CyberTerminal
+
+
+def hit_label(hit):
+    where = f"{escape(hit.label)}:{hit.line + 1}" if not hit.live else f"{escape(hit.label)} [b]LIVE[/b]"
+    return (f"[dim]{where}[/dim]  {escape(hit.before.lstrip())}"
+            f"[reverse]{escape(hit.match)}[/reverse]{escape(hit.after.rstrip())}")
+
+
+class SearchModal(ModalScreen):
+    """Literal search over open tabs' scrollback and saved session logs.
+
+    Enter runs the search on a worker thread; tabs are copied on the UI
+    thread first since pyte keeps mutating them. Picking a live hit jumps
+    to that line in its tab; a log hit shows the surrounding lines.
+    """
+
+    BINDINGS = [("escape", "dismiss_search", "Close")]
+
+    def __init__(self, index=None):
+        super().__init__()
+        self.index = index
+        self.hits = []
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="modal-dialog", classes="search-dialog"):
+            yield Static("SEARCH // SCROLLBACK + LOGS", id="modal-title")
+            yield Input(placeholder="text to find (case-sensitive if it has capitals)", id="search-input")
+            yield Static("", id="search-status")
+            yield OptionList(id="search-results")
+            yield Static("", id="search-preview")
+
+    def on_mount(self):
+        if self.index is not None:
+            self.refresh_index()
+        self.query_one("#search-input").focus()
+
+    @work(thread=True, exclusive=True, group="index")
+    def refresh_index(self):
+        self.index.update(log_files())
+
+    @on(Input.Submitted, "#search-input")
+    def on_submit(self, event: Input.Submitted):
+        query = event.value
+        if not query:
+            return
+        snapshots = [terminal_snapshot(term) for term in self.app.query(CyberTerminal)]
+        self.query_one("#search-status").update("[dim]Searching...[/dim]")
+        self.run_search(query, snapshots)
+
+    @work(thread=True, exclusive=True, group="search")
+    def run_search(self, query, snapshots):
+        hits = search(query, snapshots, log_files(), self.index)
+        self.app.call_from_thread(self.show_hits, query, hits)
+
+    def show_hits(self, query, hits):
+        self.hits = hits
+        results = self.query_one("#search-results")
+        results.clear_options()
+        results.add_options([Option(hit_label(hit), id=str(i)) for i, hit in enumerate(hits)])
+        more = "+" if len(hits) >= RESULT_LIMIT else ""
+        self.query_one("#search-status").update(f"{len(hits)}{more} hits for [b]{escape(query)}[/b]")
+        self.query_one("#search-preview").update("")
+        if hits:
+            results.highlighted = 0
+            results.focus()
+
+    def on_key(self, event):
+        # Arrow keys move through results while the cursor stays in the input
+        if event.key in ("up", "down") and self.query_one("#search-input").has_focus:
+            results = self.query_one("#search-results")
+            if results.option_count:
+                step = -1 if event.key == "up" else 1
+                results.highlighted = ((results.highlighted or 0) + step) % results.option_count
+            event.stop()
+
+    @on(OptionList.OptionHighlighted, "#search-results")
+    def on_highlight(self, event: OptionList.OptionHighlighted):
+        hit = self.hits[int(event.option.id)]
+        preview = self.query_one("#search-preview")
+        if hit.live:
+            preview.update("[dim]Enter jumps to this line in its tab.[/dim]")
+            return
+        lines = read_context(hit.source, hit.offset)
+        preview.update(f"[dim]{escape(hit.source)}[/dim]\n" + "\n".join(escape(line) for line in lines))
+
+    @on(OptionList.OptionSelected, "#search-results")
+    def on_pick(self, event: OptionList.OptionSelected):
+        hit = self.hits[int(event.option.id)]
+        if hit.live:
+            self.dismiss(hit)
+
+    def action_dismiss_search(self):
+        self.dismiss(None)
@@ -1,6 +1,25 @@
+import csv
+import json
+import re
+import socket
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
 from threading import Thread
 
+from ansi import ANSI
+from models import get_credentials, get_jump, missing_credentials
+from pool import POOL, CONNECT_TIMEOUT
+
+# Hosts worked on at once by run_commands
+EXEC_WORKERS = 32
+COMMAND_TIMEOUT = 60
+# A line ending in a CLI prompt: "admin@cRPD> ", "admin@cRPD# ", "router#", "user@host:~$ "
+PROMPT = re.compile(r"[\w.@()\[\]:/~-]+[>#$%] ?$")
+# The user@host or hostname a prompt starts with; later prompts are anchored on
+# it, allowing for a changed mode or path ("router(config)#", "user@host:/tmp$")
+PROMPT_NAME = re.compile(r"[\w.@-]+")
+
 def run_sequence(terminal, commands):
     def execute():
         for cmd in commands:
@@ -11,3 +30,172 @@ def run_sequence(terminal, commands):
                 terminal.channel.send(cmd + "\n")
                 time.sleep(0.5) # Basic pacing
     Thread(target=execute, daemon=True).start()
+
+@dataclass
+class CommandResult:
+    command: str
+    output: str = ""
+    exit_status: int = None
+    elapsed: float = 0.0
+    error: str = None
+
+@dataclass
+class HostResult:
+    session_id: str
+    name: str
+    host: str
+    results: list = field(default_factory=list)
+    error: str = None
+
+def clean_output(text):
+    return ANSI.sub("", text).replace("\r\n", "\n").replace("\r", "")
+
+def exec_one(config, creds, command, timeout):
+    """Run one command over a fresh exec channel on the pooled transport."""
+    channel, entry = POOL.open_channel(config.host, config.port, creds['user'], creds['pass'], CONNECT_TIMEOUT,
+                                       jump=get_jump(config))
+    try:
+        channel.set_combine_stderr(True)
+        channel.settimeout(timeout)
+        channel.exec_command(command)
+        chunks = []
+        while True:
+            data = channel.recv(65536)
+            if not data:
+                break
+            chunks.append(data)
+        return b"".join(chunks).decode("utf-8", errors="replace"), channel.recv_exit_status()
+    finally:
+        channel.close()
+        POOL.release(entry)
+
+class PromptSession:
+    """Drives an interactive shell, returning as soon as the prompt comes back.
+
+    With the default ``prompt``, the generic pattern only has to recognise
+    the prompt after the login banner (``learn_prompt``); from then on the
+    session waits for that device's own prompt.
+    """
+
+    def __init__(self, channel, prompt=PROMPT, timeout=COMMAND_TIMEOUT):
+        self.channel = channel
+        self.prompt = prompt
+        self.timeout = timeout
+        self.chunks = []
+        # Raw text after the last newline received: the only place a prompt can be
+        self.line = ""
+
+    def read_until_prompt(self):
+        deadline = time.monotonic() + self.timeout
+        self.channel.settimeout(0.5)
+        while True:
+            # Only the unterminated last line can be the prompt: a finished
+            # line ending in ">" or "%" is output ("<rpc-reply>", "45%").
+            # Escape sequences never span a newline, so cleaning just that
+            # line matches the same as cleaning everything
+            tail = clean_output(self.line)
+            if tail.strip() and self.prompt.search(tail):
+                output = clean_output("".join(self.chunks))
+                self.chunks, self.line = [], ""
+                return output
+            if time.monotonic() > deadline:
+                raise TimeoutError("prompt did not return")
+            try:
+                data = self.channel.recv(65536)
+            except socket.timeout:
+                continue
+            if not data:
+                raise EOFError("channel closed")
+            text = data.decode("utf-8", errors="replace")
+            self.chunks.append(text)
+            newline = text.rfind("\n")
+            self.line = text[newline + 1:] if newline >= 0 else self.line + text
+
+    def learn_prompt(self):
+        """Read the login banner; returns it."""
+        banner = self.read_until_prompt()
+        name = PROMPT_NAME.match(banner[banner.rfind("\n") + 1:].lstrip())
+        if self.prompt is PROMPT and name:
+            self.prompt = re.compile("^" + re.escape(name.group()) + r"\S*[>#$%] ?$")
+        return banner
+
+    def run(self, command):
+        self.channel.send(command + "\n")
+        lines = self.read_until_prompt().split("\n")
+        # Drop the echoed command line and the trailing prompt
+        if lines and command.strip() and command.strip() in lines[0]:
+            lines = lines[1:]
+        return "\n".join(lines[:-1]).strip("\n")
+
+def run_host(config, commands, mode="exec", timeout=COMMAND_TIMEOUT, prompt=PROMPT):
+    result = HostResult(config.id, config.name, config.host)
+    creds = get_credentials(config.profile)
+    try:
+        if not creds:
+            raise LookupError(missing_credentials(config.profile))
+        if mode == "exec":
+            # Surface connect/auth failures once per host rather than per command
+            POOL.acquire(config.host, config.port, creds['user'], creds['pass'], CONNECT_TIMEOUT, get_jump(config))
+            for cmd in commands:
+                started = time.monotonic()
+                item = CommandResult(cmd)
+                try:
+                    item.output, item.exit_status = exec_one(config, creds, cmd, timeout)
+                except Exception as e:
+                    item.error = str(e) or type(e).__name__
+                item.elapsed = time.monotonic() - started
+                result.results.append(item)
+        else:
+            channel, entry = POOL.open_shell(config.host, config.port, creds['user'], creds['pass'],
+                                             timeout=CONNECT_TIMEOUT, jump=get_jump(config))
+            try:
+                session = PromptSession(channel, prompt, timeout)
+                session.learn_prompt()  # banner / MOTD
+                for cmd in commands:
+                    started = time.monotonic()
+                    item = CommandResult(cmd)
+                    try:
+                        item.output = session.run(cmd)
+                    except Exception as e:
+                        item.error = str(e) or type(e).__name__
+                    item.elapsed = time.monotonic() - started
+                    result.results.append(item)
+                    if item.error:
+                        break  # the shell is in an unknown state
+            finally:
+                channel.close()
+                POOL.release(entry)
+    except Exception as e:
+        result.error = str(e) or type(e).__name__
+    return result
+
+def run_commands(configs, commands, mode="exec", workers=EXEC_WORKERS, timeout=COMMAND_TIMEOUT,
+                 on_result=None):
+    """Run ``commands`` on every session in parallel and return a HostResult per session.
+
+    ``mode`` is ``"exec"`` (one exec channel per command) or ``"prompt"``
+    (one interactive shell, each command finishing when the prompt returns).
+    ``on_result(host_result)`` is called from worker threads as hosts finish.
+    """
+    def work(config):
+        host_result = run_host(config, commands, mode, timeout)
+        if on_result:
+            on_result(host_result)
+        return host_result
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(configs)))) as executor:
+        return list(executor.map(work, configs))
+
+def export_json(results, path):
+    with open(path, "w") as f:
+        json.dump([asdict(r) for r in results], f, indent=2)
+
+def export_csv(results, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["session_id", "name", "host", "command", "exit_status", "elapsed", "error", "output"])
+        for host in results:
+            if host.error and not host.results:
+                writer.writerow([host.session_id, host.name, host.host, "", "", "", host.error, ""])
+            for item in host.results:
+                writer.writerow([host.session_id, host.name, host.host, item.command, item.exit_status,
+                                 f"{item.elapsed:.3f}", item.error or "", item.output])
@@ -0,0 +1,162 @@
+import datetime
+import gzip
+import os
+import queue
+import sys
+import threading
+import time
+import weakref
+
+try:
+    import zstandard
+except ImportError:  # optional: only needed for .zst logs
+    zstandard = None
+
+from models import BASE_DIR
+
+LOG_DIR = os.path.join(BASE_DIR, "logs")
+LOG_MODES = [("Off", "off"), ("Plain", "plain"), ("Gzip", "gzip"), ("Zstd", "zstd")]
+EXTENSIONS = {"plain": ".log", "gzip": ".log.gz", "zstd": ".log.zst"}
+
+# Rotate after this many raw bytes or this many seconds, whichever comes first
+MAX_BYTES = 64 * 1024 * 1024
+ROTATE_SECONDS = 24 * 60 * 60
+# Idle time after which buffered data is flushed to disk
+FLUSH_INTERVAL = 1.0
+WRITE_BUFFER = 1024 * 1024
+# Writer threads of closed logs and recordings that may still be draining
+CLOSING = weakref.WeakSet()
+
+
+def open_log(path, mode):
+    """Open a log file for binary writing ('wb') or reading ('rb') by extension."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, compresslevel=6)
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("zstd logs need the 'zstandard' package")
+        raw = open(path, mode)
+        if "w" in mode:
+            return zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    return open(path, mode, buffering=WRITE_BUFFER)
+
+
+class SessionLog:
+    """Appends raw channel bytes to a per-session log from a background thread.
+
+    ``write()`` only enqueues, so it is safe to call from the reader thread
+    (or the UI) without ever touching the disk there.
+    """
+
+    def __init__(self, name, mode="plain", directory=LOG_DIR,
+                 max_bytes=MAX_BYTES, rotate_seconds=ROTATE_SECONDS):
+        if mode not in EXTENSIONS:
+            raise ValueError(f"Unknown log mode: {mode}")
+        if mode == "zstd" and zstandard is None:
+            raise RuntimeError("zstd logs need the 'zstandard' package")
+        self.name = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+        self.mode = mode
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.path = None
+        self.queue = queue.SimpleQueue()
+        self._file = None
+        self._written = 0
+        self._opened_at = 0.0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, data):
+        self.queue.put(data)
+
+    def close(self):
+        """Stop after everything queued so far is written; returns at once."""
+        self.queue.put(None)
+        CLOSING.add(self._thread)
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(self.directory, f"session_{self.name}_{timestamp}{EXTENSIONS[self.mode]}")
+        suffix = 1
+        while os.path.exists(path):
+            path = os.path.join(self.directory, f"session_{self.name}_{timestamp}-{suffix}{EXTENSIONS[self.mode]}")
+            suffix += 1
+        self.path = path
+        self._file = open_log(path, "wb")
+        self._written = 0
+        self._opened_at = time.monotonic()
+
+    def _close_file(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _run(self):
+        while True:
+            try:
+                data = self.queue.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                if self._file:
+                    self._file.flush()
+                continue
+            if data is None:
+                self._close_file()
+                return
+            try:
+                if self._file and (self._written >= self.max_bytes or
+                                   time.monotonic() - self._opened_at >= self.rotate_seconds):
+                    self._close_file()
+                if not self._file:
+                    self._open()
+                self._file.write(data)
+                self._written += len(data)
+            except OSError:
+                # A full or unwritable disk must not take the session down with it
+                self._close_file()
+
+
+def wait_for_writers(timeout=5):
+    """Give closed logs and recordings up to ``timeout`` seconds to reach the disk (at exit)."""
+    deadline = time.monotonic() + timeout
+    for thread in list(CLOSING):
+        thread.join(max(0, deadline - time.monotonic()))
+
+
+def read_log(path, chunk_size=WRITE_BUFFER):
+    """Yield the raw bytes stored in a (possibly compressed) session log."""
+    with open_log(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def replay_log(path, columns=120, lines=40, scrollback=100000):
+    """Rebuild a terminal screen (with scrollback) from a session log."""
+    import codecs
+    from fastpath import FastStream
+    from scrollback import Scrollback, ScrollbackScreen
+
+    history = Scrollback(scrollback)
+    screen = ScrollbackScreen(columns, lines, history)
+    stream = FastStream(screen)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for chunk in read_log(path):
+        stream.feed(decoder.decode(chunk))
+    stream.feed(decoder.decode(b"", final=True))
+    return screen
+
+
+if __name__ == "__main__":
+    # Usage: python sessionlog.py replay <logfile>
+    if len(sys.argv) != 3 or sys.argv[1] != "replay":
+        print("usage: python sessionlog.py replay <logfile>")
+        sys.exit(1)
+    screen = replay_log(sys.argv[2])
+    for i in range(len(screen.history)):
+        print(screen.history.text(i))
+    print("\n".join(line.rstrip() for line in screen.display))
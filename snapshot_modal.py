@@ -0,0 +1,158 @@
+import threading
+
+from rich.markup import escape
+
+from textual.app import ComposeResult
+from textual.screen import ModalScreen
+from textual.widgets import Static, Button, DataTable, Input
+from textual.containers import Vertical, Horizontal, VerticalScroll
+from textual import on
+
+from snapshots import SnapshotStore, take_snapshots, stamp, SNAPSHOT_COMMAND
+
+# Diff lines rendered at most; the CLI (`python snapshots.py diff`) prints all of them
+DIFF_LIMIT = 2000
+DIFF_STYLE = {"+": "green", "-": "red", "@": "cyan"}
+
+
+def diff_markup(lines):
+    out = []
+    for line in lines[:DIFF_LIMIT]:
+        style = DIFF_STYLE.get(line[:1]) if not line.startswith(("+++", "---")) else "bold"
+        out.append(f"[{style}]{escape(line)}[/{style}]" if style else escape(line))
+    if len(lines) > DIFF_LIMIT:
+        out.append(f"[dim]... {len(lines) - DIFF_LIMIT} more lines[/dim]")
+    return "\n".join(out)
+
+
+class SnapshotModal(ModalScreen):
+    """Pull the running config of every session in a folder and browse/diff the archive.
+
+    Highlighting a host lists its snapshots; Enter on a snapshot diffs it
+    against the one before it, or against the snapshot marked with M.
+    """
+
+    BINDINGS = [("m", "mark", "Mark for diff")]
+
+    def __init__(self, folder, configs):
+        super().__init__()
+        self.folder = folder
+        self.configs = configs
+        self.by_id = {config.id: config for config in configs}
+        self.store = SnapshotStore()
+        self.history = []
+        self.marked = None
+        self.columns = []
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="modal-dialog", classes="snapshot-dialog"):
+            yield Static(f"CONFIG SNAPSHOTS // {self.folder} ({len(self.configs)} links)", id="modal-title")
+            yield Static("Command (run over an exec channel)", classes="field-label")
+            yield Input(SNAPSHOT_COMMAND, id="snap-command")
+            yield Static(id="snap-summary")
+            with Horizontal(id="snap-tables"):
+                yield DataTable(id="snap-hosts", cursor_type="row")
+                yield DataTable(id="snap-history", cursor_type="row")
+            with VerticalScroll(id="snap-diff-box"):
+                yield Static("[dim]Enter on a snapshot shows what changed; M marks one to compare against.[/dim]",
+                             id="snap-diff")
+            with Horizontal(classes="button-row"):
+                yield Button("SNAPSHOT", id="run", classes="btn-neuro-confirm")
+                yield Button("CLOSE", id="cancel", classes="btn-neuro-cancel")
+
+    def on_mount(self):
+        hosts = self.query_one("#snap-hosts")
+        self.columns = hosts.add_columns("Host", "Last snapshot", "Size", "Status")
+        self.query_one("#snap-history").add_columns("Taken", "Size", "Stored", "Config")
+        latest = self.store.latest(self.by_id)
+        for config in self.configs:
+            snap = latest.get(config.id)
+            hosts.add_row(config.name or config.host, stamp(snap.taken) if snap else "-",
+                          f"{snap.size:,}" if snap else "-", "", key=config.id)
+
+    def start(self):
+        command = self.query_one("#snap-command").value.strip()
+        if not command:
+            return
+        self.query_one("#run").disabled = True
+        self.query_one("#snap-summary").update(f"Pulling configs from {len(self.configs)} links...")
+        self.done = []
+
+        def work():
+            snaps = take_snapshots(self.configs, command, self.store,
+                                   on_result=lambda s: self.app.call_from_thread(self.add_result, s))
+            self.app.call_from_thread(self.finish, snaps)
+        threading.Thread(target=work, daemon=True).start()
+
+    def add_result(self, snap):
+        self.done.append(snap)
+        hosts = self.query_one("#snap-hosts")
+        _, taken_col, size_col, status_col = self.columns
+        if snap.error:
+            hosts.update_cell(snap.session_id, status_col, f"[red]{escape(snap.error)}[/red]")
+        else:
+            hosts.update_cell(snap.session_id, taken_col, stamp(snap.taken))
+            hosts.update_cell(snap.session_id, size_col, f"{snap.size:,}")
+            hosts.update_cell(snap.session_id, status_col,
+                              "[green]changed[/green]" if snap.changed else "[dim]unchanged[/dim]")
+        self.query_one("#snap-summary").update(f"{len(self.done)}/{len(self.configs)} links done...")
+
+    def finish(self, snaps):
+        failed = sum(1 for s in snaps if s.error)
+        changed = sum(1 for s in snaps if s.changed)
+        stored = sum(s.stored for s in snaps)
+        self.query_one("#snap-summary").update(
+            f"{len(snaps) - failed}/{len(snaps)} configs pulled, {changed} changed, "
+            f"{stored / 1024:.1f} KB added to the store, {failed} failed")
+        self.query_one("#run").disabled = False
+        self.show_history(self.query_one("#snap-hosts").cursor_row)
+
+    @on(DataTable.RowHighlighted, "#snap-hosts")
+    def on_host(self, event: DataTable.RowHighlighted):
+        self.show_history(event.cursor_row)
+
+    def show_history(self, row):
+        if row is None or not 0 <= row < len(self.configs):
+            return
+        self.history = self.store.history(session_id=self.configs[row].id)
+        table = self.query_one("#snap-history")
+        table.clear()
+        for snap in self.history:
+            mark = " *" if self.marked and snap.id == self.marked.id else ""
+            if snap.error:
+                table.add_row(stamp(snap.taken) + mark, "-", "-", f"[red]{escape(snap.error)}[/red]")
+            else:
+                table.add_row(stamp(snap.taken) + mark, f"{snap.size:,}", f"{snap.stored:,}", snap.digest[:12])
+
+    def highlighted_snapshot(self):
+        row = self.query_one("#snap-history").cursor_row
+        return self.history[row] if self.history and 0 <= row < len(self.history) else None
+
+    def action_mark(self):
+        snap = self.highlighted_snapshot()
+        if snap and not snap.error:
+            self.marked = snap
+            self.app.notify(f"Marked {snap.name or snap.host} {stamp(snap.taken)} for diff")
+            self.show_history(self.query_one("#snap-hosts").cursor_row)
+
+    @on(DataTable.RowSelected, "#snap-history")
+    def on_snapshot(self, event: DataTable.RowSelected):
+        new = self.highlighted_snapshot()
+        if new is None or new.error:
+            return
+        old = self.marked if self.marked and self.marked.id != new.id else self.store.previous(new)
+        diff = self.query_one("#snap-diff")
+        if old is None:
+            diff.update("[dim]First snapshot of this host; nothing to compare with.[/dim]")
+            return
+        if old.taken > new.taken:
+            old, new = new, old
+        lines = self.store.diff(old, new)
+        diff.update(diff_markup(lines) if lines else
+                    f"[dim]Identical to {escape(old.name or old.host)} {stamp(old.taken)}.[/dim]")
+
+    def on_button_pressed(self, event: Button.Pressed):
+        if event.button.id == "run":
+            self.start()
+        else:
+            self.dismiss(None)
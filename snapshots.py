@@ -0,0 +1,307 @@
+import difflib
+import hashlib
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from models import BASE_DIR
+from sequences import run_host, clean_output, COMMAND_TIMEOUT
+
+SNAPSHOT_DIR = os.path.join(BASE_DIR, "snapshots")
+SNAPSHOT_COMMAND = "show configuration | display set"
+# Hosts pulled at once; each is one handshake plus one exec channel, mostly
+# waiting on the device, so 2000 devices take a few minutes
+SNAPSHOT_WORKERS = 64
+# Configs are cut into chunks at lines whose CRC has these low bits clear
+# (about every 64 lines), within the min/max bounds. Cut points depend only on
+# the line itself, so an edit only changes the chunks around it.
+CHUNK_MASK = 63
+CHUNK_MIN_LINES = 16
+CHUNK_MAX_LINES = 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    name TEXT,
+    host TEXT NOT NULL,
+    taken REAL NOT NULL,
+    command TEXT,
+    digest TEXT,
+    size INTEGER DEFAULT 0,
+    chunks INTEGER DEFAULT 0,
+    stored INTEGER DEFAULT 0,
+    changed INTEGER DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS by_session ON snapshots (session_id, taken);
+CREATE INDEX IF NOT EXISTS by_host ON snapshots (host, taken);
+CREATE INDEX IF NOT EXISTS by_taken ON snapshots (taken);
+"""
+
+
+@dataclass
+class Snapshot:
+    id: int
+    session_id: str
+    name: str
+    host: str
+    taken: float
+    command: str
+    digest: str = None    # sha256 of the config text; None if the pull failed
+    size: int = 0
+    chunks: int = 0
+    stored: int = 0       # bytes this snapshot added to the object store
+    changed: bool = False  # differs from the session's previous config (or is its first)
+    error: str = None
+
+
+def chunk_lines(data):
+    """Split bytes into content-defined chunks of whole lines."""
+    chunks, start, lines, pos = [], 0, 0, 0
+    size = len(data)
+    while pos < size:
+        end = data.find(b"\n", pos)
+        end = size if end < 0 else end + 1
+        lines += 1
+        if lines >= CHUNK_MAX_LINES or (lines >= CHUNK_MIN_LINES and not zlib.crc32(data[pos:end]) & CHUNK_MASK):
+            chunks.append(data[start:end])
+            start, lines = end, 0
+        pos = end
+    if start < size:
+        chunks.append(data[start:])
+    return chunks
+
+
+class SnapshotStore:
+    """Content-addressed config archive with a SQLite index.
+
+    A config is stored as a manifest (``manifests/<sha256 of the text>``:
+    the list of its chunk hashes) plus zlib-compressed chunks
+    (``objects/<sha256 of the chunk>``). A config seen before costs only its
+    index row; a changed one only the chunks its edits touched. Files are
+    written once, atomically, and never modified, so concurrent writers need
+    no locking. ``index.db`` holds one row per pull, indexed by session,
+    host and time.
+    """
+
+    def __init__(self, root=SNAPSHOT_DIR):
+        self.root = root
+        self._db = None
+        self._lock = threading.Lock()
+
+    @property
+    def db(self):
+        if self._db is None:
+            os.makedirs(self.root, exist_ok=True)
+            db = sqlite3.connect(os.path.join(self.root, "index.db"), check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(SCHEMA)
+            db.row_factory = lambda cursor, row: Snapshot(*row)
+            self._db = db
+        return self._db
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _path(self, kind, digest):
+        return os.path.join(self.root, kind, digest[:2], digest[2:])
+
+    def _write(self, kind, digest, payload):
+        """Store ``payload`` under ``digest`` unless it is already there; returns bytes written."""
+        path = self._path(kind, digest)
+        if os.path.exists(path):
+            return 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return len(payload)
+
+    def put(self, text):
+        """Store a config; returns (digest, size, chunk count, bytes newly stored)."""
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        manifest = self._path("manifests", digest)
+        if os.path.exists(manifest):
+            with open(manifest, "rb") as f:
+                return digest, len(data), f.read().count(b"\n"), 0
+        hashes, stored = [], 0
+        for chunk in chunk_lines(data):
+            h = hashlib.sha256(chunk).hexdigest()
+            stored += self._write("objects", h, zlib.compress(chunk, 6))
+            hashes.append(h)
+        listing = "".join(h + "\n" for h in hashes).encode()
+        stored += self._write("manifests", digest, listing)
+        return digest, len(data), len(hashes), stored
+
+    def get(self, digest):
+        """The config text stored under ``digest``."""
+        with open(self._path("manifests", digest), "rb") as f:
+            hashes = f.read().split()
+        parts = []
+        for h in hashes:
+            with open(self._path("objects", h.decode()), "rb") as f:
+                parts.append(zlib.decompress(f.read()))
+        return b"".join(parts).decode("utf-8")
+
+    def record(self, session_id, name, host, taken, command, digest=None, size=0, chunks=0, stored=0,
+               error=None):
+        with self._lock:
+            last = self.db.execute(
+                "SELECT * FROM snapshots WHERE session_id = ? AND digest IS NOT NULL ORDER BY taken DESC LIMIT 1",
+                (session_id,)).fetchone()
+            changed = digest is not None and (last is None or last.digest != digest)
+            cursor = self.db.execute(
+                "INSERT INTO snapshots (session_id, name, host, taken, command, digest, size, chunks, stored,"
+                " changed, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (session_id, name, host, taken, command, digest, size, chunks, stored, changed, error))
+            self.db.commit()
+            return Snapshot(cursor.lastrowid, session_id, name, host, taken, command, digest, size, chunks,
+                            stored, changed, error)
+
+    def snapshot(self, snapshot_id):
+        with self._lock:
+            return self.db.execute("SELECT * FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()
+
+    def history(self, session_id=None, host=None, since=None, limit=200):
+        """Snapshots of one session (or host), newest first."""
+        where, args = [], []
+        if session_id:
+            where.append("session_id = ?")
+            args.append(session_id)
+        if host:
+            where.append("host = ?")
+            args.append(host)
+        if since:
+            where.append("taken >= ?")
+            args.append(since)
+        sql = "SELECT * FROM snapshots" + (" WHERE " + " AND ".join(where) if where else "")
+        with self._lock:
+            return self.db.execute(sql + " ORDER BY taken DESC LIMIT ?", (*args, limit)).fetchall()
+
+    def latest(self, session_ids):
+        """Newest successful snapshot per session id."""
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT s.* FROM snapshots s JOIN (SELECT session_id, MAX(taken) AS taken FROM snapshots"
+                " WHERE digest IS NOT NULL GROUP BY session_id) m"
+                " ON s.session_id = m.session_id AND s.taken = m.taken").fetchall()
+        wanted = set(session_ids)
+        return {row.session_id: row for row in rows if row.session_id in wanted}
+
+    def previous(self, snap):
+        """The last successful snapshot of the same session before ``snap``."""
+        with self._lock:
+            return self.db.execute(
+                "SELECT * FROM snapshots WHERE session_id = ? AND taken < ? AND digest IS NOT NULL"
+                " ORDER BY taken DESC LIMIT 1", (snap.session_id, snap.taken)).fetchone()
+
+    def diff(self, old, new, context=3):
+        """Unified diff lines between two snapshots (empty if the configs are identical)."""
+        if old.digest == new.digest:
+            return []
+        return list(difflib.unified_diff(
+            self.get(old.digest).splitlines(), self.get(new.digest).splitlines(),
+            f"{old.name or old.host} {stamp(old.taken)}", f"{new.name or new.host} {stamp(new.taken)}",
+            lineterm="", n=context))
+
+    def usage(self):
+        """(objects, bytes) held in the object store."""
+        count = size = 0
+        for kind in ("objects", "manifests"):
+            for directory, _, files in os.walk(os.path.join(self.root, kind)):
+                count += len(files)
+                size += sum(os.path.getsize(os.path.join(directory, name)) for name in files)
+        return count, size
+
+
+def stamp(taken):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(taken))
+
+
+def take_snapshot(store, config, command=SNAPSHOT_COMMAND, timeout=COMMAND_TIMEOUT):
+    """Pull one session's config over an exec channel and file it; returns the Snapshot."""
+    taken = time.time()
+    result = run_host(config, [command], "exec", timeout)
+    item = result.results[0] if result.results else None
+    error = result.error or (item and item.error)
+    if not error and item.exit_status not in (None, 0):
+        error = f"exit {item.exit_status}"
+    if not error and not item.output.strip():
+        error = "empty output"
+    if error:
+        return store.record(config.id, config.name, config.host, taken, command, error=error)
+    digest, size, chunks, stored = store.put(clean_output(item.output))
+    return store.record(config.id, config.name, config.host, taken, command, digest, size, chunks, stored)
+
+
+def take_snapshots(configs, command=SNAPSHOT_COMMAND, store=None, workers=SNAPSHOT_WORKERS,
+                   timeout=COMMAND_TIMEOUT, on_result=None):
+    """Snapshot every session in parallel; ``on_result(snapshot)`` is called from worker threads."""
+    store = store or SnapshotStore()
+
+    def work(config):
+        snap = take_snapshot(store, config, command, timeout)
+        if on_result:
+            on_result(snap)
+        return snap
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(configs)))) as executor:
+        return list(executor.map(work, configs))
+
+
+if __name__ == "__main__":
+    # Usage: python snapshots.py run [folder...]     (every session if no folder; for cron)
+    #        python snapshots.py list [host]
+    #        python snapshots.py show <id>
+    #        python snapshots.py diff <id> [<id>]     (against the previous snapshot if one id)
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    args = sys.argv[2:]
+    store = SnapshotStore()
+    if command == "run":
+        from store import SessionStore
+        sessions = SessionStore().load()
+        configs = [c for folder in args for c in sessions.in_folder(folder)] if args else sessions.all()
+        started = time.monotonic()
+        snaps = take_snapshots(configs, os.environ.get("NEUROSSH_SNAPSHOT_COMMAND", SNAPSHOT_COMMAND), store)
+        failed = [s for s in snaps if s.error]
+        for snap in failed:
+            print(f"{snap.name or snap.host}: {snap.error}", file=sys.stderr)
+        print(f"{len(snaps) - len(failed)}/{len(snaps)} configs in {time.monotonic() - started:.1f}s, "
+              f"{sum(s.changed for s in snaps)} changed, {sum(s.stored for s in snaps) / 1024:.1f} KB new")
+        sys.exit(1 if failed else 0)
+    elif command == "list":
+        for snap in store.history(host=args[0] if args else None):
+            status = snap.error or f"{snap.digest[:12]}  {snap.size:>9,} B  +{snap.stored:,} B"
+            print(f"{snap.id:>6}  {stamp(snap.taken)}  {snap.name or snap.host:<24}  {status}")
+    elif command in ("show", "diff") and args:
+        snaps = [store.snapshot(int(a)) for a in args[:2]]
+        missing = [a for a, snap in zip(args, snaps) if snap is None or not snap.digest]
+        if missing:
+            print(f"no stored config for snapshot {', '.join(missing)}")
+            sys.exit(1)
+        if command == "show":
+            print(store.get(snaps[0].digest), end="")
+        else:
+            old, new = snaps if len(snaps) > 1 else (store.previous(snaps[0]), snaps[0])
+            if old is None:
+                print("no earlier snapshot to compare with")
+            else:
+                print("\n".join(store.diff(old, new)) or "identical")
+    else:
+        print("usage: python snapshots.py run [folder...] | list [host] | show <id> | diff <id> [<id>]")
+        sys.exit(1)
@@ -0,0 +1,227 @@
+import dataclasses
+import json
+import os
+import tempfile
+import threading
+
+import yaml
+
+from models import SessionConfig, LOCAL_VAULT
+
+# Batch rapid edits into one write; the file is rewritten at most this often
+SAVE_DEBOUNCE = 0.5
+
+# libyaml bindings are an order of magnitude faster on large archives
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+# Bumped whenever the cache layout changes; older caches are ignored
+CACHE_VERSION = 1
+# Cache rows are positional, in SessionConfig field order (smaller and faster
+# to parse than one object per session); a changed field list voids the cache
+FIELDS = [f.name for f in dataclasses.fields(SessionConfig)]
+
+
+class SessionStore:
+    """In-memory index of the session archive, persisted to sessions.yaml.
+
+    The YAML file is parsed once; afterwards lookups by id, folder or host are
+    dictionary hits and changes are written back atomically (temp file +
+    rename) from a debounced background timer. Subscribers are called with
+    ``(old, new)`` for every change: ``old`` is None for an insert and ``new``
+    is None for a removal.
+
+    Even libyaml needs seconds to build a 10k-entry archive, so every parse
+    and every write also leaves a JSON copy beside the YAML file
+    (``.sessions.yaml.cache``). It is used instead of the YAML for as long as
+    the YAML's mtime and size match the stamp it was written with; editing
+    sessions.yaml by hand simply invalidates it.
+
+    A background write that fails (full disk, lost permission) leaves the
+    changes pending for the next save or ``close()`` and is reported to
+    ``on_error`` with the exception, on the timer's thread.
+    """
+
+    def __init__(self, path=LOCAL_VAULT, debounce=SAVE_DEBOUNCE):
+        self.path = path
+        directory, name = os.path.split(os.path.abspath(path))
+        self.cache_path = os.path.join(directory, f".{name}.cache")
+        self.debounce = debounce
+        self.by_id = {}
+        self.by_folder = {}
+        self.by_host = {}
+        self.listeners = []
+        self.on_error = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._timer = None
+
+    def load(self):
+        self.by_id.clear()
+        self.by_folder.clear()
+        self.by_host.clear()
+        try:
+            stamp = self._stamp()
+        except FileNotFoundError:
+            return self
+        rows = self._read_cache(stamp)
+        if rows is None:
+            with open(self.path, "r") as f:
+                configs = [SessionConfig(**s) for s in yaml.load(f, Loader=Loader) or []]
+            self._write_cache(stamp, configs)
+        else:
+            configs = [SessionConfig(*row) for row in rows]
+        for conf in configs:
+            self._index(conf)
+        return self
+
+    def _stamp(self):
+        st = os.stat(self.path)
+        return [st.st_mtime_ns, st.st_size]
+
+    def _read_cache(self, stamp):
+        """Session rows from the JSON cache, or None if it is missing or stale."""
+        try:
+            with open(self.cache_path, "r") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cache.get("version") != CACHE_VERSION or cache.get("source") != stamp or cache.get("fields") != FIELDS:
+            return None
+        return cache["rows"]
+
+    def _write_cache(self, stamp, configs):
+        # Only a speed-up: a read-only directory or odd YAML types just mean no cache
+        try:
+            fd, tmp = tempfile.mkstemp(prefix=".sessions-", suffix=".cache", dir=os.path.dirname(self.cache_path))
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"version": CACHE_VERSION, "source": stamp, "fields": FIELDS,
+                           "rows": [[getattr(c, name) for name in FIELDS] for c in configs]}, f)
+            os.replace(tmp, self.cache_path)
+        except (OSError, TypeError, ValueError):
+            os.unlink(tmp)
+
+    def _index(self, conf):
+        self.by_id[conf.id] = conf
+        self.by_folder.setdefault(conf.folder, {})[conf.id] = conf
+        self.by_host.setdefault(conf.host, {})[conf.id] = conf
+
+    def _unindex(self, conf):
+        del self.by_id[conf.id]
+        for index, key in ((self.by_folder, conf.folder), (self.by_host, conf.host)):
+            bucket = index[key]
+            del bucket[conf.id]
+            if not bucket:
+                del index[key]
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def all(self):
+        return list(self.by_id.values())
+
+    def get(self, session_id):
+        return self.by_id.get(session_id)
+
+    def in_folder(self, folder):
+        return list(self.by_folder.get(folder, {}).values())
+
+    def with_host(self, host):
+        return list(self.by_host.get(host, {}).values())
+
+    def folders(self):
+        return sorted(self.by_folder)
+
+    def subscribe(self, callback):
+        self.listeners.append(callback)
+
+    def _notify(self, old, new):
+        for callback in self.listeners:
+            callback(old, new)
+
+    def upsert(self, data):
+        """Insert or replace a session from a SessionModal result; returns (old, new)."""
+        conf = data if isinstance(data, SessionConfig) else SessionConfig(**data)
+        with self._lock:
+            old = self.by_id.get(conf.id)
+            if old:
+                self._unindex(old)
+            self._index(conf)
+        self._notify(old, conf)
+        self.save()
+        return old, conf
+
+    def remove(self, session_id):
+        with self._lock:
+            conf = self.by_id.get(session_id)
+            if conf:
+                self._unindex(conf)
+        if conf:
+            self._notify(conf, None)
+            self.save()
+        return conf
+
+    def remove_folder(self, folder):
+        with self._lock:
+            removed = list(self.by_folder.get(folder, {}).values())
+            for conf in removed:
+                self._unindex(conf)
+        for conf in removed:
+            self._notify(conf, None)
+        if removed:
+            self.save()
+        return removed
+
+    def save(self):
+        """Schedule a debounced write of the whole archive."""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+            self._dirty = True
+            self._timer = threading.Timer(self.debounce, self._flush_later)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_later(self):
+        try:
+            self.flush()
+        except Exception as e:
+            if self.on_error:
+                self.on_error(e)
+
+    def close(self):
+        """Write out any change still waiting on the debounce timer (or on a failed write)."""
+        with self._lock:
+            pending = self._dirty
+        if pending:
+            self.flush()
+
+    def flush(self):
+        """Write the archive now: dump to a temp file, then atomically replace."""
+        with self._write_lock:
+            with self._lock:
+                if self._timer:
+                    self._timer.cancel()
+                    self._timer = None
+                self._dirty = False
+                configs = list(self.by_id.values())
+                # Shallow copies are enough for dumping and far cheaper than asdict()
+                sessions = [dict(vars(c)) for c in configs]
+            directory = os.path.dirname(os.path.abspath(self.path))
+            try:
+                fd, tmp = tempfile.mkstemp(prefix=".sessions-", suffix=".yaml", dir=directory)
+                try:
+                    with os.fdopen(fd, "w") as f:
+                        yaml.dump(sessions, f, Dumper=Dumper)
+                    os.replace(tmp, self.path)
+                except BaseException:
+                    os.unlink(tmp)
+                    raise
+            except BaseException:
+                with self._lock:
+                    self._dirty = True
+                raise
+            self._write_cache(self._stamp(), configs)
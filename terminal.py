@@ -1,22 +1,85 @@
-import threading
-import paramiko
-import pyte
-import socket
-from textual.widgets import Static
+import codecs
+import time
+from string import Template
+from rich.markup import escape
+from textual.widget import Widget
+from textual.geometry import Region
+from textual.message import Message
 from textual import events
-from models import get_credentials
+from models import get_credentials, get_jump, missing_credentials
+from pool import POOL, CONNECTOR, CONNECT_TIMEOUT
+from reader import ChannelReader
+from renderer import ScreenRenderer
+from scrollback import Scrollback, ScrollbackScreen
+from fastpath import FastStream
+from sessionlog import SessionLog
+from recording import CastRecorder
+from transport import ASYNC_POOL, get_backend
+from writer import ChannelWriter, BRACKETED_PASTE, paste_payload
+from metrics import METRICS
+from reconnect import RECONNECTS
+from triggers import TRIGGERS
 
-class CyberTerminal(Static):
+# Coalesce repaints to roughly the display refresh rate
+FRAME_INTERVAL = 1 / 60
+# Tabs hidden for longer than this drop their cached strips (rebuilt when shown)
+HIBERNATE_AFTER = 300
+# Seconds between notifications from the same alert trigger in one tab
+ALERT_INTERVAL = 5.0
+
+class CyberTerminal(Widget):
     can_focus = True
 
-    def __init__(self, config, **kwargs):
-        super().__init__("INITIALIZING NEURAL LINK...", **kwargs)
+    class DataReady(Message):
+        """Posted from the reader thread when new output is queued."""
+        bubble = False
+
+    class Connected(Message):
+        """Posted once the connect attempt finishes; ``error`` is None on success."""
+        def __init__(self, terminal, latency, error=None):
+            super().__init__()
+            self.terminal = terminal
+            self.latency = latency
+            self.error = error
+
+    def __init__(self, config, deadline=None, **kwargs):
+        super().__init__(**kwargs)
         self.config = config
-        # Virtual terminal emulator screen - balanced size for scrollback vs performance
-        self.terminal_screen = pyte.Screen(120, 100)  # 100 lines for scrollback
-        self.stream = pyte.Stream(self.terminal_screen)
+        # Optional time.monotonic() deadline shared by a bulk connect batch
+        self.deadline = deadline
+        # Virtual terminal screen matches the remote PTY; rows scrolling off the
+        # top are kept in a bounded, compact scrollback ring
+        self.history = Scrollback(config.scrollback)
+        self.terminal_screen = ScrollbackScreen(120, 40, self.history)
+        self.stream = FastStream(self.terminal_screen)
+        self.renderer = ScreenRenderer(self.terminal_screen, self.history)
+        self._history_total = 0
+        self._frame_pending = False
+        # Hidden tabs keep feeding pyte but skip rendering until shown again
+        self.background = False
+        self.hidden_since = None
+        self._stale = False
+        self.stream.feed("INITIALIZING NEURAL LINK...\r\n")
         self.channel = None
-        self.client = None
+        self.link = None
+        self.reader = None
+        self.writer = None
+        # Per-tab counters for the performance overlay and Prometheus export
+        self.metrics = METRICS.register(config.id, config.name or config.host, config.host)
+        self.session_log = None
+        self.recording = None
+        # Output triggers from triggers.yaml (None if none apply to this session)
+        self.triggers = TRIGGERS.for_config(config)
+        self.captures = {}
+        self.alerted = {}
+        self.closed = False
+        # Set while a dropped link is being re-established (screen and logs carry on)
+        self.reconnecting = False
+        self.reconnect_timer = None
+        # "paramiko": pooled transport + reader thread; "asyncssh": event loop only
+        self.backend = get_backend()
+        # Incremental decoder keeps multi-byte characters split across reads intact
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
         
         # KEY MAP: Translates Textual keys to ANSI escape sequences for SSH
         self.KEY_MAP = {
@@ -45,43 +108,361 @@ class CyberTerminal(Static):
         }
 
     def on_mount(self):
-        # Refresh the UI every 100ms (reduced from 50ms for better performance)
-        self.set_interval(0.1, self.update_terminal)
-        threading.Thread(target=self.connect_ssh, daemon=True).start()
+        self.renderer.invalidate(self.rich_style)
+        self.connect()
+
+    def connect(self):
+        if self.backend == "asyncssh":
+            self.run_worker(self.connect_async(), exit_on_error=False)
+        else:
+            # Bounded worker pool rather than one thread per tab
+            CONNECTOR.submit(self.connect_ssh)
+
+    def connect_timeout(self, started):
+        timeout = CONNECT_TIMEOUT
+        if self.deadline is not None:
+            timeout = min(timeout, self.deadline - started)
+            if timeout <= 0:
+                raise TimeoutError("bulk connect deadline expired")
+        return timeout
+
+    def record_connect(self, started):
+        """Connect timings: TCP/KEX/auth for a fresh link, just the channel open for a pooled one."""
+        phases = dict(self.link.phases) if self.link.created >= started else {}
+        phases["total"] = time.monotonic() - started
+        self.metrics.connect = phases
+
+    def open_writer(self):
+        self.writer = ChannelWriter(self.channel, self.config.pacing, self.metrics.record_send)
+        self.metrics.queues["send"] = self.writer.queue.qsize
+        if self.recording:
+            self.writer.taps.append(self.recording.input)
+
+    def open_session_log(self):
+        if self.reconnecting:
+            return  # a reconnected link keeps writing to the same log and recording
+        if self.config.log != "off":
+            self.session_log = SessionLog(self.config.name or self.config.host, self.config.log)
+        if self.config.record:
+            screen = self.terminal_screen
+            self.recording = CastRecorder(self.config.name or self.config.host, screen.columns, screen.lines)
+
+    def close_session_log(self):
+        if self.session_log:
+            self.session_log.close()
+            self.session_log = None
+        if self.recording:
+            self.recording.close()
+            self.recording = None
 
     def connect_ssh(self):
+        started = time.monotonic()
+        if self.closed:
+            return  # tab was killed while waiting for a connect worker
         creds = get_credentials(self.config.profile)
         if not creds:
-            self.update("[bold red]ERROR:[/bold red] Identity profile not found.")
+            error = missing_credentials(self.config.profile)
+            self.app.call_from_thread(self.write_status, "ERROR:", error)
+            self.post_message(self.Connected(self, 0.0, error))
             return
         try:
-            self.client = paramiko.SSHClient()
-            self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            self.client.connect(
-                self.config.host, 
-                username=creds['user'], 
-                password=creds['pass'], 
-                timeout=10
-            )
+            timeout = self.connect_timeout(started)
+            # Shared transport: a second tab to the same host skips TCP/KEX/auth.
             # Request xterm to enable colors and proper key handling
-            self.channel = self.client.invoke_shell(term='xterm', width=120, height=40)
-            self.channel.setblocking(0)
+            self.channel, self.link = POOL.open_shell(
+                self.config.host,
+                self.config.port,
+                creds['user'],
+                creds['pass'],
+                term='xterm', width=120, height=40,
+                timeout=timeout,
+                # Behind a bastion: tunnelled through its shared, pooled connection
+                jump=get_jump(self.config)
+            )
+            if self.closed:
+                self.channel.close()
+                POOL.release(self.link)
+                self.link = None
+                return
+            self.record_connect(started)
+            self.open_session_log()
+            self.open_writer()
+            # Dedicated reader: blocks while idle, drains bursts as they land
+            self.reader = ChannelReader(self.channel, lambda: self.post_message(self.DataReady()))
+            self.reader.taps.append(self.metrics.record_recv)
+            self.metrics.queues["recv"] = self.reader.queue.qsize
+            # Raw bytes go to disk from the reader thread via background writers
+            if self.session_log:
+                self.reader.taps.append(self.session_log.write)
+            if self.recording:
+                self.reader.taps.append(self.recording.output)
+            self.reader.start()
         except Exception as e:
-            self.update(f"[bold red]LINK FAILURE:[/bold red] {str(e)}")
+            self.app.call_from_thread(self.write_status, "LINK FAILURE:", str(e))
+            self.post_message(self.Connected(self, time.monotonic() - started, str(e) or type(e).__name__))
+            return
+        self.post_message(self.Connected(self, time.monotonic() - started))
+
+    async def connect_async(self):
+        """asyncssh backend: connect on the app's event loop, no per-tab threads."""
+        started = time.monotonic()
+        creds = get_credentials(self.config.profile)
+        if not creds:
+            error = missing_credentials(self.config.profile)
+            self.write_status("ERROR:", error)
+            self.post_message(self.Connected(self, 0.0, error))
+            return
+        try:
+            timeout = self.connect_timeout(started)
+            # Opened first so the banner and first prompt make it into the log
+            self.open_session_log()
+            self.channel, self.link = await ASYNC_POOL.open_shell(
+                self.config.host,
+                self.config.port,
+                creds['user'],
+                creds['pass'],
+                self.receive_output,
+                self.on_link_lost,
+                term='xterm', width=120, height=40,
+                timeout=timeout,
+                jump=get_jump(self.config)
+            )
+            if self.closed:
+                self.channel.close()
+                ASYNC_POOL.release(self.link)
+                self.link = None
+                return
+            self.record_connect(started)
+            self.open_writer()
+        except Exception as e:
+            if not self.reconnecting:
+                self.close_session_log()
+            self.write_status("LINK FAILURE:", str(e))
+            self.post_message(self.Connected(self, time.monotonic() - started, str(e) or type(e).__name__))
+            return
+        self.post_message(self.Connected(self, time.monotonic() - started))
+
+    def receive_output(self, data):
+        """asyncssh data callback; runs on the event loop, so it feeds the screen directly."""
+        self.metrics.record_recv(data)
+        if self.session_log:
+            self.session_log.write(data)
+        if self.recording:
+            self.recording.output(data)
+        self.feed_output(data)
+
+    def on_link_lost(self, exc):
+        if self.channel:
+            self.channel.closed = True
+        if not self.closed:
+            # asyncssh reports a clean channel close without an exception
+            self.end_output(exc is not None)
+
+    def link_lost(self):
+        """Drop the dead channel and queue this tab with the reconnect scheduler."""
+        if self.reader:
+            self.reader.stop()
+            self.reader = None
+        self.writer = None
+        if self.channel:
+            self.channel.close()
+        (ASYNC_POOL if self.backend == "asyncssh" else POOL).release(self.link)
+        self.link = None
+        # A reconnect is not part of a bulk connect batch any more
+        self.deadline = None
+        self.reconnecting = True
+        RECONNECTS.lost(self)
+
+    def reconnect_in(self, delay, attempt):
+        """Called by the scheduler: retry after ``delay`` seconds, or wait (None) for another tab's probe."""
+        if delay is None:
+            self.write_notice(f"[ LINK LOST // waiting for {self.config.host} ]")
+            return
+        if delay <= 0:
+            self.call_later(self.reconnect)
+            return
+        self.write_notice(f"[ LINK LOST // reconnect attempt {attempt} in {delay:.1f}s ]")
+        self.reconnect_timer = self.set_timer(delay, self.reconnect)
+
+    def reconnect(self):
+        self.reconnect_timer = None
+        if not self.closed:
+            self.connect()
+
+    def on_cyber_terminal_connected(self, message):
+        if not self.reconnecting:
+            return
+        # Reconnect attempts are this tab's business, not a bulk connect's
+        message.stop()
+        if message.error:
+            RECONNECTS.result(self, False)
+            return
+        self.reconnecting = False
+        self.metrics.reconnects += 1
+        self.write_notice("[ LINK RESTORED ]")
+        RECONNECTS.result(self, True)
+
+    def write_notice(self, text):
+        """Print a marker line into the terminal screen (bold yellow)."""
+        self.stream.feed(f"\x1b[0m\r\n\x1b[1;33m{text}\x1b[0m\r\n")
+        self.schedule_frame()
+
+    def write_status(self, label, text):
+        """Print a status line into the terminal screen (bold red label)."""
+        self.stream.feed(f"\x1b[1;31m{label}\x1b[0m {text}\r\n")
+        self.schedule_frame()
+
+    def on_cyber_terminal_data_ready(self, message):
+        self.update_terminal()
 
     def update_terminal(self):
-        if self.channel and self.channel.recv_ready():
-            try:
-                data = self.channel.recv(4096).decode('utf-8', errors='ignore')
-                if data:  # Only process if we actually got data
-                    self.stream.feed(data)
-                    self.refresh()
-            except Exception:
-                pass
-
-    def render(self):
-        # Join the virtual screen buffer into a single string for display
-        return "\n".join(self.terminal_screen.display)
+        """Feed every batch the reader has queued into the screen, then repaint once."""
+        if not self.reader:
+            return
+        batches = self.reader.drain()
+        if not batches:
+            return
+        data = b"".join(b for b in batches if b)
+        if data:
+            self.feed_output(data)
+        if None in batches:
+            self.end_output(self.reader.dropped)
+
+    def feed_output(self, data):
+        """Decode raw channel output into the virtual screen and queue a repaint."""
+        text = self.decoder.decode(data)
+        if self.triggers:
+            text = self.run_triggers(text)
+        if METRICS.enabled:
+            started = time.perf_counter()
+            self.stream.feed(text)
+            self.metrics.feed.observe(time.perf_counter() - started)
+        else:
+            self.stream.feed(text)
+        self.schedule_frame()
+
+    def run_triggers(self, text):
+        """Match output triggers on a decoded batch; returns it with highlights added."""
+        if METRICS.enabled:
+            started = time.perf_counter()
+            text, hits = self.triggers.scan(text)
+            self.metrics.triggers.observe(time.perf_counter() - started)
+        else:
+            text, hits = self.triggers.scan(text)
+        for hit in hits:
+            self.metrics.trigger_hits += 1
+            trigger = hit.trigger
+            if trigger.action == "respond":
+                # $name in the response expands to a capture or a named group of this match
+                if self.writer:
+                    self.writer.write(Template(trigger.response).safe_substitute(self.captures, **hit.groups))
+            elif trigger.action == "capture":
+                values = {k: v for k, v in hit.groups.items() if v is not None} or {trigger.name: hit.match}
+                if any(self.captures.get(k) != v for k, v in values.items()):
+                    self.captures.update(values)
+                    self.app.notify(", ".join(f"{k} = {escape(v)}" for k, v in values.items()),
+                                    title=f"{self.config.name or self.config.host} // {trigger.name}", timeout=4)
+            else:
+                now = time.monotonic()
+                if now - self.alerted.get(trigger.name, -ALERT_INTERVAL) >= ALERT_INTERVAL:
+                    self.alerted[trigger.name] = now
+                    self.app.bell()
+                    self.app.notify(escape(hit.line.strip()), title=f"{self.config.name or self.config.host} // {trigger.name}",
+                                    severity="warning", timeout=8)
+        return text
+
+    def end_output(self, dropped=False):
+        """The shell's output ended: reconnect if the link ``dropped``, else mark it closed.
+
+        A remote close on a healthy transport is a logout, exit status or not
+        (some network CLIs send none after ``exit``); only a dead transport,
+        or EOF with no close following it, means the link dropped.
+        """
+        self.stream.feed(self.decoder.decode(b"", final=True))
+        # Whatever the remote left half-parsed (an escape sequence cut off) is dropped
+        self.stream = FastStream(self.terminal_screen)
+        # A reconnect starts on a fresh line: drop the partial one the scanner carried
+        self.triggers = TRIGGERS.for_config(self.config)
+        if self.link is not None and (dropped or not self.link.alive):
+            self.link_lost()
+            return
+        self.stream.feed("\r\n[ LINK CLOSED ]\r\n")
+        self.schedule_frame()
+
+    def schedule_frame(self):
+        """Request a repaint; bursts arriving within one frame share it."""
+        if self.background:
+            self._stale = True
+            return
+        if not self._frame_pending:
+            self._frame_pending = True
+            self.set_timer(FRAME_INTERVAL, self.flush_frame)
+
+    def flush_frame(self):
+        self._frame_pending = False
+        if self.background:
+            self._stale = True
+            return
+        if METRICS.enabled:
+            started = time.perf_counter()
+            self.repaint_dirty()
+            self.metrics.frame_pending += time.perf_counter() - started
+            # render_line adds its row-building time until the refresh lands
+            self.call_after_refresh(self.close_frame)
+        else:
+            self.repaint_dirty()
+
+    def close_frame(self):
+        self.metrics.frame.observe(self.metrics.frame_pending)
+        self.metrics.frame_pending = 0.0
+
+    def repaint_dirty(self):
+        width = self.terminal_screen.columns
+        dirty = self.renderer.update()
+        if self.history.total != self._history_total:
+            # New scrollback lines shift the live screen down: grow and repaint
+            self._history_total = self.history.total
+            self.refresh(layout=True)
+            return
+        offset = len(self.history)
+        for y in dirty:
+            self.refresh(Region(0, offset + y, width, 1))
+
+    def set_background(self, background):
+        """Hide (stop rendering) or show the tab; a shown tab repaints once, in full."""
+        if background == self.background:
+            return
+        self.background = background
+        if background:
+            self.hidden_since = time.monotonic()
+            return
+        self.hidden_since = None
+        if self._stale:
+            self._stale = False
+            self.renderer.update()
+            self._history_total = self.history.total
+            self.refresh(layout=True)
+
+    def hibernate(self):
+        """Free the render caches of a long-hidden tab; the connection is untouched."""
+        if self.background and self.renderer.strips:
+            self.renderer.invalidate()
+            self._stale = True
+
+    def get_content_width(self, container, viewport):
+        return self.terminal_screen.columns
+
+    def get_content_height(self, container, viewport, width):
+        return len(self.history) + self.terminal_screen.lines
+
+    def render_line(self, y):
+        # Only rows pyte marked dirty were rebuilt; scrollback is rendered on demand
+        if METRICS.enabled:
+            started = time.perf_counter()
+            strip = self.renderer.line(y).crop_extend(0, self.size.width, self.rich_style)
+            self.metrics.frame_pending += time.perf_counter() - started
+            return strip
+        return self.renderer.line(y).crop_extend(0, self.size.width, self.rich_style)
 
     def on_key(self, event: events.Key) -> None:
         # Let app-level shortcuts pass through (q for quit, ctrl+s for save, etc.)
@@ -90,32 +471,58 @@ class CyberTerminal(Static):
 
         # 2. Check if the connection is alive
         if not self.channel or self.channel.closed:
+            # Nothing to send to (connecting, failed, reconnecting), but typed
+            # letters must not fall through to the app's single-key folder
+            # actions (C, X, T, S, P...)
+            if event.character and event.character.isprintable():
+                event.stop()
             return
 
-        try:
-            # Handle mapped special keys (Arrows, F-keys, etc.)
-            if event.key in self.KEY_MAP:
-                self.channel.send(self.KEY_MAP[event.key])
-            # Handle Enter
-            elif event.key == "enter":
-                self.channel.send("\r")
-            # Handle Backspace
-            elif event.key == "backspace":
-                self.channel.send("\x7f")
-            # Handle Tab
-            elif event.key == "tab":
-                self.channel.send("\t")
-            # Handle Escape
-            elif event.key == "escape":
-                self.channel.send("\x1b")
-            # Handle standard character input
-            elif event.character:
-                self.channel.send(event.character)
-
-            # Prevent Textual from using the key for UI navigation
-            event.stop()
-        except (socket.error, EOFError):
-            pass
+        # Handle mapped special keys (Arrows, F-keys, etc.)
+        if event.key in self.KEY_MAP:
+            data = self.KEY_MAP[event.key]
+        # Handle Enter
+        elif event.key == "enter":
+            data = "\r"
+        # Handle Backspace
+        elif event.key == "backspace":
+            data = "\x7f"
+        # Handle Tab
+        elif event.key == "tab":
+            data = "\t"
+        # Handle Escape
+        elif event.key == "escape":
+            data = "\x1b"
+        # Handle standard character input. Control chords land here too:
+        # broadcast, quick link, telemetry and search (Ctrl+B/O/G/F) are
+        # readline and Emacs keys, so a live shell gets them; they reach the
+        # app from the sidebar, the tab bar or a tab with no link
+        elif event.character:
+            data = event.character
+        else:
+            return
+
+        self.send_input(data)
+        # Prevent Textual from using the key for UI navigation
+        event.stop()
+
+    def on_paste(self, event: events.Paste) -> None:
+        if not self.channel or self.channel.closed:
+            return
+        # pyte keeps private modes shifted left by 5 (DECSET 2004 = bracketed paste)
+        bracketed = (BRACKETED_PASTE << 5) in self.terminal_screen.mode
+        self.send_input(paste_payload(event.text, bracketed))
+        event.stop()
+
+    def send_input(self, data):
+        """Send typed input, fanning it out to every target while broadcast is on."""
+        broadcaster = getattr(self.app, "broadcaster", None)
+        if broadcaster and broadcaster.active:
+            broadcaster.send(data, origin=self)
+            return
+        # Coalesced and written off the UI thread; one write per burst, not per key
+        if self.writer:
+            self.writer.write(data)
 
     def on_unmount(self):
         """Clean up connection when the widget is removed."""
@@ -123,10 +530,20 @@ class CyberTerminal(Static):
 
     def close_ssh(self):
         """Close the SSH connection."""
+        self.closed = True
+        METRICS.unregister(self.metrics)
+        if self.reconnect_timer:
+            self.reconnect_timer.stop()
+        RECONNECTS.cancel(self)
+        if self.reader:
+            self.reader.stop()
+        self.close_session_log()
         if self.channel:
             self.channel.close()
-        if self.client:
-            self.client.close()
+        if self.link:
+            # The transport stays pooled for other tabs until it idles out
+            (ASYNC_POOL if self.backend == "asyncssh" else POOL).release(self.link)
+            self.link = None
 
     def save_session(self, filename=None):
         """Save the terminal session to a text file."""
@@ -136,7 +553,9 @@ class CyberTerminal(Static):
             filename = f"session_{self.config.name}_{timestamp}.txt"
 
         try:
-            content = "\n".join(self.terminal_screen.display)
+            lines = [self.history.text(i) for i in range(len(self.history))]
+            lines.extend(self.terminal_screen.display)
+            content = "\n".join(lines)
             with open(filename, "w") as f:
                 f.write(content)
             return filename
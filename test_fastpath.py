@@ -0,0 +1,39 @@
+import glob
+import os
+import random
+
+import pyte
+
+from fastpath import FastStream, differential, fuzz_text, read_output
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_plain_text_and_sgr():
+    screen = pyte.Screen(20, 3)
+    FastStream(screen).feed("ab\x1b[1;31mcd\x1b[0m\r\nef")
+    assert screen.display == ["abcd" + " " * 16, "ef" + " " * 18, " " * 20]
+    assert screen.buffer[0][2].fg == "red" and screen.buffer[0][2].bold
+    assert screen.buffer[0][4].fg == "default"
+
+
+def test_matches_pyte_on_fuzzed_output():
+    for seed in range(20):
+        rng = random.Random(seed)
+        text = fuzz_text(rng, rng.randint(100, 5000))
+        for chunks in (None, 1, 13, 500):
+            assert differential(text, chunks, seed=seed) is None, (seed, chunks)
+
+
+def test_matches_pyte_on_fake_server_output():
+    from benchmarks.fakeserver import BULK, top_frame
+    text = BULK.decode()[:50_000] + "".join(top_frame(n).decode() for n in range(5))
+    for chunks in (None, 7, 4096):
+        assert differential(text, chunks) is None, chunks
+
+
+def test_matches_pyte_on_saved_sessions():
+    for path in glob.glob(os.path.join(HERE, "session_*.txt")):
+        text = read_output(path)
+        for chunks in (None, 7, 4096):
+            assert differential(text, chunks) is None, (path, chunks)
@@ -0,0 +1,57 @@
+import base64
+import os
+
+import pytest
+
+import models
+from models import IdentityStore, SessionConfig, get_credentials, get_jump, missing_credentials, parse_jump
+
+
+def test_parse_jump():
+    assert parse_jump("bastion") == (None, "bastion", 22)
+    assert parse_jump("ops@bastion:2222") == ("ops", "bastion", 2222)
+    assert parse_jump(" 10.0.0.1:22 ") == (None, "10.0.0.1", 22)
+    assert parse_jump("ops@[2001:db8::1]:2200") == ("ops", "2001:db8::1", 2200)
+    assert parse_jump("2001:db8::1") == (None, "2001:db8::1", 22)
+    assert parse_jump("me@corp@bastion") == ("me@corp", "bastion", 22)
+
+
+@pytest.mark.parametrize("spec", ["", "ops@", "bastion:ssh", "[2001:db8::1]:x"])
+def test_parse_jump_rejects(spec):
+    with pytest.raises(ValueError):
+        parse_jump(spec)
+
+
+@pytest.fixture
+def vault(tmp_path, monkeypatch):
+    monkeypatch.setenv("NEUROSSH_VAULT_KEY", base64.urlsafe_b64encode(os.urandom(32)).decode())
+    store = IdentityStore(str(tmp_path / "identities.yaml"))
+    store.unlock()
+    store.set("DEV", "dev-user", "dev-pass")
+    store.set("BASTION", "ops", "ops-pass")
+    monkeypatch.setattr(models, "IDENTITIES", store)
+    return store
+
+
+def test_get_jump(vault):
+    assert get_jump(SessionConfig(name="a", host="h")) is None
+    assert get_jump(SessionConfig(name="a", host="h", jump="bastion:2222")) == ("bastion", 2222, "dev-user", "dev-pass")
+    assert get_jump(SessionConfig(name="a", host="h", jump="root@bastion", jump_profile="BASTION")) == \
+        ("bastion", 22, "root", "ops-pass")
+
+
+def test_missing_profile_has_no_default_credentials(vault):
+    assert get_credentials("NOPE") is None
+    assert missing_credentials("NOPE") == "Identity profile 'NOPE' not found."
+    with pytest.raises(LookupError):
+        get_jump(SessionConfig(name="a", host="h", jump="bastion", jump_profile="NOPE"))
+
+
+def test_wrong_key_locks_the_vault(vault, monkeypatch):
+    monkeypatch.setenv("NEUROSSH_VAULT_KEY", base64.urlsafe_b64encode(os.urandom(32)).decode())
+    store = IdentityStore(vault.path)
+    monkeypatch.setattr(models, "IDENTITIES", store)
+    assert get_credentials("DEV") is None
+    assert "different key" in missing_credentials("DEV")
+    with pytest.raises(PermissionError):
+        store.set("DEV", "x", "y")
@@ -0,0 +1,80 @@
+from models import SessionConfig
+from palette import SessionIndex, trigrams
+
+
+def index(*configs):
+    idx = SessionIndex()
+    for conf in configs:
+        idx.on_change(None, conf)
+    return idx
+
+
+def names(results):
+    return [conf.name for conf in results]
+
+
+def test_trigrams():
+    assert trigrams("abcd") == {"abc", "bcd"}
+    assert trigrams("ab") == set()
+
+
+def test_ranks_name_prefix_then_host_folder_prefix_then_name_then_anywhere():
+    idx = index(SessionConfig(name="edge-core", host="10.1.1.1"),
+                SessionConfig(name="lab-1", host="192.168.0.1", folder="core/f1"),
+                SessionConfig(name="dist-1", host="10.2.2.2", folder="DC1", tags=["core"]),
+                SessionConfig(name="core-1", host="10.3.3.3"))
+    assert names(idx.search("core")) == ["core-1", "lab-1", "edge-core", "dist-1"]
+
+
+def test_broad_query_uses_the_same_tiers(monkeypatch):
+    monkeypatch.setattr("palette.SCORE_LIMIT", 0)
+    idx = index(SessionConfig(name="edge-core", host="10.1.1.1"),
+                SessionConfig(name="lab-1", host="192.168.0.1", folder="core/f1"),
+                SessionConfig(name="core-1", host="10.3.3.3"))
+    assert names(idx.search("core")) == ["core-1", "lab-1", "edge-core"]
+
+
+def test_every_token_must_match():
+    idx = index(SessionConfig(name="rtr-1", host="10.0.0.1", profile="PROD"),
+                SessionConfig(name="rtr-2", host="10.0.0.2", profile="DEV"))
+    assert names(idx.search("rtr prod")) == ["rtr-1"]
+
+
+def test_folder_path_components_are_prefixes():
+    idx = index(SessionConfig(name="a", host="h1", folder="DC1/F1"),
+                SessionConfig(name="b", host="h2", folder="DC2"))
+    found = idx.scan(["f1"], None, 10)
+    assert [idx.entries[i][0].name for i in found] == ["a"]
+
+
+def test_scan_stops_at_limit():
+    idx = index(*(SessionConfig(name=f"n{i}", host=f"10.0.{i}.1") for i in range(100)))
+    assert len(idx.scan(["10."], None, 5)) == 5
+
+
+def test_typo_falls_back_to_shared_trigrams():
+    idx = index(SessionConfig(name="core-ams-1", host="10.0.0.1"),
+                SessionConfig(name="edge-fra-1", host="10.0.0.2"))
+    assert names(idx.search("crore-ams")) == ["core-ams-1"]
+
+
+def test_missing_short_token_skips_to_fallback():
+    idx = index(SessionConfig(name="alpha", host="10.0.0.1"))
+    assert idx.search("zq") == []
+
+
+def test_edits_update_the_index():
+    old = SessionConfig(name="old-name", host="10.0.0.1", folder="A")
+    idx = index(old)
+    new = SessionConfig(name="new-name", host="10.0.0.9", folder="B", id=old.id)
+    idx.on_change(old, new)
+    assert idx.search("old") == []
+    assert names(idx.search("new")) == ["new-name"]
+    assert names(idx.search("10.0.0.9")) == ["new-name"]
+    idx.on_change(new, None)
+    assert idx.entries == {} and idx.names == [] and idx.prefixes == [] and idx.postings == {}
+
+
+def test_empty_query_lists_by_name():
+    idx = index(SessionConfig(name="b", host="h"), SessionConfig(name="a", host="h"))
+    assert names(idx.search("")) == ["a", "b"]
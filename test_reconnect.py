@@ -0,0 +1,99 @@
+import random
+
+from models import SessionConfig
+from reconnect import ReconnectScheduler, backoff, save_open_tabs, load_open_tabs
+
+
+class Term:
+    """Records what the scheduler asks of a tab."""
+
+    def __init__(self, host="10.0.0.1"):
+        self.config = SessionConfig(name=host, host=host)
+        self.closed = False
+        self.calls = []
+
+    def reconnect_in(self, delay, attempt):
+        self.calls.append((delay, attempt))
+
+
+def scheduler(rate=4.0):
+    return ReconnectScheduler(rate=rate, clock=lambda: 0.0)
+
+
+def test_backoff_is_full_jitter_and_capped():
+    random.seed(1)
+    for failures in range(12):
+        delay = backoff(failures, base=1.0, cap=60.0)
+        assert 0 <= delay <= min(60.0, 2 ** failures)
+
+
+def test_one_probe_per_target():
+    sched = scheduler()
+    a, b, c = Term(), Term(), Term()
+    for term in (a, b, c):
+        sched.lost(term)
+    assert a.calls[0][1] == 1
+    assert b.calls == [(None, 0)] and c.calls == [(None, 0)]
+
+
+def test_failed_probe_backs_off_and_retries():
+    sched = scheduler()
+    a = Term()
+    sched.lost(a)
+    sched.result(a, False)
+    sched.result(a, False)
+    assert [attempt for _, attempt in a.calls] == [1, 2, 3]
+    assert sched.targets[("10.0.0.1", 22)].failures == 2
+
+
+def test_followers_go_through_the_rate_limit():
+    sched = scheduler(rate=4.0)
+    probe, followers = Term(), [Term() for _ in range(8)]
+    sched.lost(probe)
+    for term in followers:
+        sched.lost(term)
+    sched.result(probe, True)
+    delays = [term.calls[-1][0] for term in followers]
+    assert delays == sorted(delays)
+    assert all(later - earlier >= 0.25 - 1e-9 for earlier, later in zip(delays, delays[1:]))
+    assert not sched.targets
+
+
+def test_probes_to_different_targets_share_the_rate_limit():
+    sched = scheduler(rate=2.0)
+    random.seed(0)
+    terms = [Term(f"10.0.0.{i}") for i in range(1, 5)]
+    for term in terms:
+        sched.lost(term)
+    slots = sorted(term.calls[0][0] for term in terms)
+    assert all(later - earlier >= 0.5 - 1e-9 for earlier, later in zip(slots, slots[1:]))
+
+
+def test_closed_probe_hands_over():
+    sched = scheduler()
+    a, b = Term(), Term()
+    sched.lost(a)
+    sched.lost(b)
+    a.closed = True
+    sched.cancel(a)
+    assert b.calls[-1][1] == 1
+    b.closed = True
+    sched.cancel(b)
+    assert not sched.targets
+
+
+def test_failed_follower_queues_again():
+    sched = scheduler()
+    a, b = Term(), Term()
+    sched.lost(a)
+    sched.lost(b)
+    sched.result(a, True)
+    sched.result(b, False)
+    assert sched.targets[("10.0.0.1", 22)].probe is b
+
+
+def test_open_tabs_round_trip(tmp_path):
+    path = str(tmp_path / ".open-tabs.json")
+    assert load_open_tabs(path) == ([], None)
+    save_open_tabs(path, ["a", "b"], "b")
+    assert load_open_tabs(path) == (["a", "b"], "b")
@@ -0,0 +1,49 @@
+import pyte
+
+from scrollback import Scrollback, ScrollbackScreen
+
+
+def feed(text, limit=100, columns=20, lines=3):
+    history = Scrollback(limit)
+    screen = ScrollbackScreen(columns, lines, history)
+    pyte.Stream(screen).feed(text)
+    return screen, history
+
+
+def test_lines_scrolled_off_the_top_are_kept():
+    screen, history = feed("one\r\ntwo\r\nthree\r\nfour\r\nfive")
+    assert [history.text(i) for i in range(len(history))] == ["one", "two"]
+    assert screen.display[0].rstrip() == "three"
+
+
+def test_ring_drops_the_oldest_and_counts_every_line():
+    _, history = feed("".join(f"line {n}\r\n" for n in range(10)), limit=4)
+    assert len(history) == 4 and history.total == 8 and history.first == 4
+    assert [history.text(i) for i in range(4)] == ["line 4", "line 5", "line 6", "line 7"]
+
+
+def test_plain_lines_are_stored_as_bytes():
+    _, history = feed("plain\r\n\r\n\r\n")
+    assert history.lines[0] == b"plain"
+    assert history.get(0) == ("plain", None)
+
+
+def test_styled_lines_keep_runs_and_intern_attributes():
+    _, history = feed("ab\x1b[31mcd\x1b[0mef\r\n\x1b[31mxy\x1b[0m\r\n\r\n\r\n")
+    text, runs = history.get(0)
+    assert text == "abcdef"
+    assert [length for length, _ in runs] == [2, 2, 2]
+    assert runs[1][1][0] == "red" and runs[0][1][0] == "default"
+    assert history.get(1)[1][0][1] == runs[1][1]
+    assert len(history.attrs) == 2
+
+
+def test_wide_characters():
+    _, history = feed("漢字x\r\n\r\n\r\n")
+    assert history.get(0) == ("漢字x", None)
+
+
+def test_scroll_regions_below_the_top_make_no_history():
+    screen, history = feed("\x1b[2;3r\x1b[3;1Ha\r\nb\r\nc", lines=4)
+    assert len(history) == 0
+    assert [line.rstrip() for line in screen.display] == ["", "b", "c", ""]
@@ -0,0 +1,64 @@
+import snapshots
+from snapshots import SnapshotStore, chunk_lines
+
+
+def config(count, edit=None):
+    lines = [f"set interfaces ge-0/0/{n} unit 0 family inet address 10.{n // 256}.{n % 256}.1/30\n"
+             for n in range(count)]
+    if edit is not None:
+        lines[edit] = "set system host-name edited\n"
+    return "".join(lines)
+
+
+def test_chunks_are_whole_lines_and_rejoin():
+    data = config(5000).encode()
+    chunks = chunk_lines(data)
+    assert b"".join(chunks) == data
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    sizes = [chunk.count(b"\n") for chunk in chunks]
+    assert all(snapshots.CHUNK_MIN_LINES <= n <= snapshots.CHUNK_MAX_LINES for n in sizes[:-1])
+
+
+def test_unterminated_last_line_is_kept():
+    assert b"".join(chunk_lines(b"a\nb")) == b"a\nb"
+    assert chunk_lines(b"") == []
+
+
+def test_max_lines_bound(monkeypatch):
+    monkeypatch.setattr(snapshots, "CHUNK_MASK", 2 ** 32 - 1)  # no content cut ever matches
+    chunks = chunk_lines(b"x\n" * 3000)
+    assert [chunk.count(b"\n") for chunk in chunks] == [1024, 1024, 952]
+
+
+def test_edit_only_changes_nearby_chunks():
+    before = chunk_lines(config(5000).encode())
+    after = chunk_lines(config(5000, edit=2500).encode())
+    assert len(set(after) - set(before)) <= 2
+
+
+def test_put_dedupes_and_get_round_trips(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    text = config(3000)
+    digest, size, chunks, stored = store.put(text)
+    assert store.get(digest) == text and size == len(text.encode())
+    assert store.put(text)[3] == 0
+    edited = config(3000, edit=1500)
+    digest2, _, _, stored2 = store.put(edited)
+    assert store.get(digest2) == edited
+    assert 0 < stored2 < stored / 3  # a new manifest plus the edited chunk
+
+
+def test_record_marks_changes_and_diffs(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    first = store.record("s1", "r1", "10.0.0.1", 1.0, "show", *store.put(config(50)))
+    same = store.record("s1", "r1", "10.0.0.1", 2.0, "show", *store.put(config(50)))
+    failed = store.record("s1", "r1", "10.0.0.1", 3.0, "show", error="timeout")
+    edited = store.record("s1", "r1", "10.0.0.1", 4.0, "show", *store.put(config(50, edit=10)))
+    assert (first.changed, same.changed, failed.changed, edited.changed) == (True, False, False, True)
+    assert store.previous(edited).id == same.id
+    assert store.latest(["s1"])["s1"].id == edited.id
+    assert [s.id for s in store.history("s1")] == [edited.id, failed.id, same.id, first.id]
+    diff = store.diff(same, edited)
+    assert "+set system host-name edited" in diff
+    assert store.diff(first, same) == []
+    store.close()
@@ -0,0 +1,79 @@
+import hashlib
+import os
+
+import transfer
+from transfer import RateLimiter, discard_stale_parts, source_digest
+
+
+class Clock:
+    """Stands in for time.monotonic/time.sleep; sleeping just moves the clock."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def limiter(monkeypatch, rate):
+    clock = Clock()
+    monkeypatch.setattr(transfer.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(transfer.time, "sleep", clock.sleep)
+    return RateLimiter(rate), clock
+
+
+def test_unlimited_never_waits(monkeypatch):
+    bucket, clock = limiter(monkeypatch, 0)
+    bucket.take(10 ** 9)
+    assert clock.slept == []
+
+
+def test_starts_empty(monkeypatch):
+    bucket, clock = limiter(monkeypatch, 1000)
+    bucket.take(500)
+    assert clock.slept == [0.5]
+
+
+def test_sustained_rate(monkeypatch):
+    bucket, clock = limiter(monkeypatch, 1000)
+    start = clock.now
+    for _ in range(10):
+        bucket.take(1000)
+    assert round(clock.now - start, 6) == 10
+
+
+def test_idle_credit_is_capped_at_one_second(monkeypatch):
+    bucket, clock = limiter(monkeypatch, 1000)
+    clock.now += 60
+    bucket.take(1000)
+    assert clock.slept == []
+    bucket.take(1000)
+    assert clock.slept == [1.0]
+
+
+def test_big_block_borrows_ahead(monkeypatch):
+    bucket, clock = limiter(monkeypatch, 1000)
+    bucket.take(5000)
+    assert clock.slept == [5.0]
+
+
+def test_source_digest(tmp_path):
+    path = tmp_path / "image.bin"
+    path.write_bytes(b"x" * 3_000_000)
+    assert source_digest(str(path)) == hashlib.sha256(b"x" * 3_000_000).hexdigest()
+
+
+def test_discard_stale_parts(tmp_path):
+    target = str(tmp_path / "f.bin")
+    keep = f"{target}.1700000000-42.part"
+    for name in ("f.bin.part", "f.bin.1600000000-42.part", "f.bin.1700000000-42.part",
+                 "f.bin.b.part", "other.bin.1-2.part", "f.bin"):
+        (tmp_path / name).write_bytes(b"")
+    discard_stale_parts(target, keep)
+    assert sorted(os.listdir(tmp_path)) == ["f.bin", "f.bin.1700000000-42.part", "f.bin.b.part",
+                                            "other.bin.1-2.part"]
@@ -0,0 +1,105 @@
+import re
+
+from models import SessionConfig
+from triggers import Trigger, TriggerSet, TriggerScanner, TriggerStore, anchors, load_triggers, trie_pattern
+
+
+def scanner(*triggers):
+    return TriggerScanner(TriggerSet(list(triggers)))
+
+
+def names(hits):
+    return [hit.trigger.name for hit in hits]
+
+
+def test_anchors():
+    assert anchors(r"%BGP-5-ADJCHANGE: neighbor (\S+)") == ["%BGP-5-ADJCHANGE: neighbor "]
+    assert anchors("error|fail") == ["error", "fail"]
+    assert anchors("Error", re.IGNORECASE) == ["error"]
+    assert anchors(r"\d+") is None
+
+
+def test_trie_pattern_matches_every_word():
+    regex = re.compile(trie_pattern(["down", "dot", "up"]))
+    assert [m.group() for m in regex.finditer("up dot down do")] == ["up", "dot", "down"]
+
+
+def test_hit_waits_for_the_line_to_end():
+    scan = scanner(Trigger("err", "error: (?P<what>\\w+)", "alert"))
+    text, hits = scan.scan("error: dis")
+    assert text == "error: dis" and hits == []
+    text, hits = scan.scan("k full\r\n")
+    assert names(hits) == ["err"]
+    assert hits[0].groups == {"what": "disk"}
+    assert hits[0].line == "error: disk full"
+
+
+def test_anchor_split_across_chunks():
+    scan = scanner(Trigger("bgp", "%BGP-5-ADJCHANGE", "alert"))
+    assert scan.scan("Oct 18 %BGP-5-AD")[1] == []
+    assert names(scan.scan("JCHANGE: up\n")[1]) == ["bgp"]
+
+
+def test_instant_trigger_fires_once_on_unterminated_line():
+    scan = scanner(Trigger("more", "--More--", "respond", response=" ", instant=True))
+    assert names(scan.scan("line\r\n--More--")[1]) == ["more"]
+    assert scan.scan(" ")[1] == []
+    assert names(scan.scan("\r\n--More--")[1]) == ["more"]
+
+
+def test_ignore_case():
+    scan = scanner(Trigger("err", "error", "alert", ignore_case=True))
+    assert names(scan.scan("ERROR here\n")[1]) == ["err"]
+
+
+def test_escape_sequences_are_ignored_for_matching():
+    scan = scanner(Trigger("down", "is down", "alert"))
+    assert names(scan.scan("ge-0/0/1 is \x1b[31mdown\x1b[0m\n")[1]) == ["down"]
+
+
+def test_highlight_offsets():
+    scan = scanner(Trigger("down", "down", "highlight", style="31"))
+    text, hits = scan.scan("link down now\n")
+    assert hits == []
+    assert text == "link \x1b[31mdown\x1b[0m now\n"
+
+
+def test_highlight_offsets_skip_escape_sequences():
+    scan = scanner(Trigger("down", "down", "highlight", style="31"))
+    text, _ = scan.scan("\x1b[1mlink\x1b[0m down\n")
+    assert text == "\x1b[1mlink\x1b[0m \x1b[31mdown\x1b[0m\n"
+
+
+def test_highlight_across_chunks_colours_only_the_new_part():
+    scan = scanner(Trigger("down", "down", "highlight", style="31"))
+    assert scan.scan("link do")[0] == "link do"
+    assert scan.scan("wn\n")[0] == "\x1b[31mwn\x1b[0m\n"
+
+
+def test_unanchored_pattern_runs_on_every_line():
+    scan = scanner(Trigger("num", r"^\d+$", "alert"))
+    assert names(scan.scan("abc\n42\n")[1]) == ["num"]
+
+
+def test_load_triggers_reports_bad_entries(tmp_path):
+    path = tmp_path / "triggers.yaml"
+    path.write_text("- {name: ok, pattern: up}\n- {name: bad, pattern: '(', action: alert}\n- {name: act, pattern: x, action: nope}\n")
+    triggers, errors = load_triggers(str(path))
+    assert [t.name for t in triggers] == ["ok"]
+    assert len(errors) == 2
+    path.write_text("name: not a list\n")
+    assert load_triggers(str(path)) == ([], [f"{path}: expected a list of triggers"])
+
+
+def test_store_selects_by_tag_and_reloads(tmp_path):
+    path = tmp_path / "triggers.yaml"
+    path.write_text("- {name: all, pattern: up}\n- {name: core, pattern: down, tags: [core]}\n")
+    store = TriggerStore(str(path))
+    tagged = store.for_config(SessionConfig(name="a", host="h", tags=["core"]))
+    plain = store.for_config(SessionConfig(name="b", host="h"))
+    assert [t.name for t in tagged.set.triggers] == ["all", "core"]
+    assert [t.name for t in plain.set.triggers] == ["all"]
+    assert store.refresh() is False
+    path.write_text("[]\n")
+    assert store.refresh() is True
+    assert store.for_config(SessionConfig(name="b", host="h")) is None
@@ -0,0 +1,299 @@
+import functools
+import hashlib
+import os
+import posixpath
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from models import BASE_DIR, get_credentials, get_jump, missing_credentials
+from pool import POOL, CONNECT_TIMEOUT
+from recording import recording_name
+
+# Hosts transferring at once
+TRANSFER_WORKERS = 16
+# Local reads/writes per loop; paramiko splits them into 32 KB SFTP requests
+# and, pipelined, keeps them all in flight instead of waiting for each ack
+BLOCK = 256 * 1024
+# SFTP channel window: enough unacknowledged data to fill a long, fast link
+# (the default 2 MB caps a 100 ms path at about 20 MB/s)
+WINDOW_SIZE = 16 * 1024 * 1024
+# Read requests a download keeps outstanding
+PREFETCH_REQUESTS = 128
+DOWNLOAD_DIR = os.path.join(BASE_DIR, "downloads")
+DIRECTIONS = [("Upload to hosts", "upload"), ("Download from hosts", "download")]
+
+
+@dataclass
+class TransferItem:
+    session_id: str
+    host: str
+    source: str
+    target: str
+    size: int = 0
+    done: int = 0
+    resumed: int = 0
+    status: str = "pending"    # pending, running, done, current, failed, cancelled
+    error: str = None
+    started: float = None
+    elapsed: float = 0.0
+    sha256: str = None
+
+
+class RateLimiter:
+    """Token bucket shared by threads; ``take(n)`` blocks until n bytes may go out.
+
+    A rate of 0 means unlimited. The bucket starts empty, so even a short
+    transfer stays under the cap, and holds at most one second's worth after
+    an idle spell. Borrowing ahead (tokens going negative) is allowed, so one
+    big block never stalls forever behind a small rate.
+    """
+
+    def __init__(self, rate=0):
+        self.rate = rate
+        self.tokens = 0
+        self.stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, n):
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.stamp) * self.rate) - n
+            self.stamp = now
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+@functools.lru_cache(maxsize=256)
+def _digest(path, mtime_ns, size):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(1024 * 1024)
+            if not block:
+                return h.hexdigest()
+            h.update(block)
+
+
+def source_digest(path):
+    """SHA-256 of a local file, computed once per version of it however many hosts receive it."""
+    st = os.stat(path)
+    return _digest(os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+def discard_stale_parts(target, keep):
+    """Remove partial downloads of ``target`` other than ``keep``."""
+    directory, name = os.path.split(target)
+    stale = re.compile(re.escape(name) + r"(\.\d+-\d+)?\.part")
+    for entry in os.listdir(directory):
+        path = os.path.join(directory, entry)
+        if stale.fullmatch(entry) and path != keep:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def open_sftp(config, creds, timeout=CONNECT_TIMEOUT):
+    """SFTP client on the pooled transport for ``config``; returns (client, pool entry)."""
+    import paramiko
+    channel, entry = POOL.open_channel(config.host, config.port, creds['user'], creds['pass'], timeout,
+                                       setup=lambda ch: ch.invoke_subsystem("sftp"), window_size=WINDOW_SIZE,
+                                       jump=get_jump(config))
+    try:
+        return paramiko.SFTPClient(channel), entry
+    except BaseException:
+        channel.close()
+        POOL.release(entry)
+        raise
+
+
+def remote_rename(sftp, old, new):
+    try:
+        sftp.posix_rename(old, new)  # atomic replace where the server supports it
+    except IOError:
+        try:
+            sftp.remove(new)
+        except IOError:
+            pass
+        sftp.rename(old, new)
+
+
+class TransferJob:
+    """Copies files to or from many sessions at once over SFTP.
+
+    Uploads send every file in ``sources`` into the remote directory
+    ``remote``; downloads fetch the remote file ``remote`` from every host
+    into ``local_dir/<session name>/``. Hosts run ``workers`` at a time, each
+    on its pooled transport (one handshake per host, shared with open
+    tabs). Data goes through a per-host and a job-wide RateLimiter.
+
+    Every file is written as ``.part`` and renamed when complete, so an
+    interrupted transfer resumes from what already arrived. Upload parts
+    carry the source's hash in their name and are only resumed into the
+    same content; the hash is computed once per source, not per host. A
+    target with the source's size and mtime is left alone. Progress is
+    read from ``items`` by the UI; ``cancel()`` stops at the next block.
+    """
+
+    def __init__(self, configs, direction, sources, remote, local_dir=DOWNLOAD_DIR,
+                 workers=TRANSFER_WORKERS, host_rate=0, total_rate=0):
+        self.configs = configs
+        self.direction = direction
+        self.sources = sources
+        self.remote = remote
+        self.local_dir = local_dir
+        self.workers = workers
+        self.host_rate = host_rate
+        self.limiter = RateLimiter(total_rate)
+        self.cancelled = threading.Event()
+        self.started = None
+        self.finished = None
+        self.items = []
+        for config in configs:
+            if direction == "upload":
+                for source in sources:
+                    self.items.append(TransferItem(config.id, config.name or config.host, source,
+                                                   posixpath.join(remote, os.path.basename(source)),
+                                                   os.path.getsize(source)))
+            else:
+                target = os.path.join(local_dir, recording_name(config.name or config.host),
+                                      posixpath.basename(remote))
+                self.items.append(TransferItem(config.id, config.name or config.host, remote, target))
+
+    @property
+    def total(self):
+        return sum(item.size for item in self.items)
+
+    @property
+    def done(self):
+        return sum(item.done for item in self.items)
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        self.started = time.monotonic()
+        by_host = {}
+        for item in self.items:
+            by_host.setdefault(item.session_id, []).append(item)
+        configs = {config.id: config for config in self.configs}
+        if self.direction == "upload":
+            # Hash the sources up front, once, while nothing else is competing for the disk
+            for source in self.sources:
+                source_digest(source)
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(by_host)))) as executor:
+            list(executor.map(lambda sid: self.run_host(configs[sid], by_host[sid]), by_host))
+        self.finished = time.monotonic()
+
+    def run_host(self, config, items):
+        limiter = RateLimiter(self.host_rate)
+        creds = get_credentials(config.profile)
+        try:
+            if not creds:
+                raise LookupError(missing_credentials(config.profile))
+            sftp, entry = open_sftp(config, creds)
+        except Exception as e:
+            for item in items:
+                item.status, item.error = "failed", str(e) or type(e).__name__
+            return
+        try:
+            for item in items:
+                if self.cancelled.is_set():
+                    item.status = "cancelled"
+                    continue
+                item.started = time.monotonic()
+                item.status = "running"
+                try:
+                    (self.upload if self.direction == "upload" else self.download)(sftp, item, limiter)
+                except Exception as e:
+                    item.status, item.error = "failed", str(e) or type(e).__name__
+                item.elapsed = time.monotonic() - item.started
+        finally:
+            sftp.close()
+            POOL.release(entry)
+
+    def pump(self, read, write, item, limiter, on_block=None):
+        """Copy blocks until ``read`` is exhausted; False if the job was cancelled."""
+        while item.done < item.size:
+            if self.cancelled.is_set():
+                item.status = "cancelled"
+                return False
+            block = read(min(BLOCK, item.size - item.done))
+            if not block:
+                raise EOFError("source ended early")
+            limiter.take(len(block))
+            self.limiter.take(len(block))
+            write(block)
+            if on_block:
+                on_block(block)
+            item.done += len(block)
+        return True
+
+    def upload(self, sftp, item, limiter):
+        st = os.stat(item.source)
+        item.sha256 = source_digest(item.source)
+        try:
+            remote = sftp.stat(item.target)
+            if remote.st_size == st.st_size and int(remote.st_mtime) == int(st.st_mtime):
+                item.done, item.status = item.size, "current"
+                return
+        except IOError:
+            pass
+        part = f"{item.target}.{item.sha256[:16]}.part"
+        try:
+            offset = sftp.stat(part).st_size
+        except IOError:
+            offset = 0
+        if offset > item.size:
+            offset = 0
+        with open(item.source, "rb") as local, sftp.open(part, "r+b" if offset else "wb") as f:
+            f.set_pipelined(True)
+            local.seek(offset)
+            f.seek(offset)
+            item.done = item.resumed = offset
+            if not self.pump(local.read, f.write, item, limiter):
+                return
+        # close() above waited for every pipelined write to be acknowledged
+        remote_rename(sftp, part, item.target)
+        sftp.utime(item.target, (st.st_atime, st.st_mtime))
+        item.status = "done"
+
+    def download(self, sftp, item, limiter):
+        remote = sftp.stat(item.source)
+        item.size = remote.st_size
+        os.makedirs(os.path.dirname(item.target), exist_ok=True)
+        try:
+            st = os.stat(item.target)
+            if st.st_size == remote.st_size and int(st.st_mtime) == int(remote.st_mtime):
+                item.done, item.status = item.size, "current"
+                return
+        except OSError:
+            pass
+        # Keyed by the remote's mtime and size, like uploads by hash: a part left
+        # from an older version of the file is never resumed into the new one
+        part = f"{item.target}.{int(remote.st_mtime)}-{remote.st_size}.part"
+        discard_stale_parts(item.target, part)
+        h = hashlib.sha256()
+        offset = 0
+        if os.path.exists(part) and os.path.getsize(part) <= item.size:
+            # Hash what already arrived once; the rest is hashed as it streams in
+            with open(part, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    h.update(block)
+                    offset += len(block)
+        with sftp.open(item.source, "rb") as f, open(part, "ab" if offset else "wb") as local:
+            f.seek(offset)
+            f.prefetch(item.size, PREFETCH_REQUESTS)
+            item.done = item.resumed = offset
+            if not self.pump(f.read, local.write, item, limiter, h.update):
+                return
+        os.replace(part, item.target)
+        os.utime(item.target, (remote.st_atime, remote.st_mtime))
+        item.sha256 = h.hexdigest()
+        item.status = "done"
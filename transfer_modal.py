@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+
+from rich.markup import escape
+
+from textual.app import ComposeResult
+from textual.screen import ModalScreen
+from textual.widgets import Static, Button, DataTable, Select, Input
+from textual.containers import Vertical, Horizontal
+
+from transfer import TransferJob, DIRECTIONS, TRANSFER_WORKERS
+
+STATUS_STYLE = {"done": "green", "current": "green", "failed": "red", "cancelled": "yellow", "running": "cyan"}
+
+
+def local_sources(path):
+    """Files to upload: the file itself, or every regular file directly inside a directory."""
+    path = os.path.expanduser(path)
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, name) for name in os.listdir(path)
+                      if os.path.isfile(os.path.join(path, name)))
+    return [path] if os.path.isfile(path) else []
+
+
+def rate_field(value):
+    """KB/s from an input box; blank or 0 means unlimited. Returns bytes/s."""
+    return int(float(value or 0) * 1024)
+
+
+class TransferModal(ModalScreen):
+    """Upload files to, or download a file from, every session in a folder."""
+
+    def __init__(self, folder, configs):
+        super().__init__()
+        self.folder = folder
+        self.configs = configs
+        self.job = None
+        self.rows = {}
+        self.columns = []
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="modal-dialog", classes="transfer-dialog"):
+            yield Static(f"BULK TRANSFER // {self.folder} ({len(self.configs)} links)", id="modal-title")
+            yield Select(DIRECTIONS, id="transfer-direction", value="upload", allow_blank=False)
+            yield Static("Local file or directory (upload)", classes="field-label")
+            yield Input(placeholder="~/images/junos-21.4R3.tgz", id="transfer-local")
+            yield Static("Remote directory (upload) / remote file (download)", classes="field-label")
+            yield Input(placeholder="/var/tmp", id="transfer-remote")
+            with Horizontal(id="transfer-limits"):
+                yield Input(placeholder="KB/s per host", id="transfer-host-rate", type="number")
+                yield Input(placeholder="KB/s total", id="transfer-total-rate", type="number")
+                yield Input(str(TRANSFER_WORKERS), placeholder="hosts at once", id="transfer-workers", type="integer")
+            yield Static(id="transfer-summary")
+            yield DataTable(id="transfer-table", cursor_type="row")
+            with Horizontal(classes="button-row"):
+                yield Button("START", id="start", classes="btn-neuro-confirm")
+                yield Button("STOP", id="stop", classes="btn-neuro-cancel", disabled=True)
+                yield Button("CLOSE", id="cancel", classes="btn-neuro-cancel")
+
+    def on_mount(self):
+        table = self.query_one("#transfer-table")
+        self.columns = table.add_columns("Host", "File", "Status", "Progress", "Rate")
+
+    def start(self):
+        direction = self.query_one("#transfer-direction").value
+        remote = self.query_one("#transfer-remote").value.strip()
+        sources = []
+        if direction == "upload":
+            sources = local_sources(self.query_one("#transfer-local").value.strip())
+            if not sources:
+                self.app.notify("[bold yellow]No local files to send[/bold yellow]")
+                return
+        if not remote:
+            self.app.notify("[bold yellow]Remote path required[/bold yellow]")
+            return
+        try:
+            self.job = TransferJob(self.configs, direction, sources, remote,
+                                   workers=int(self.query_one("#transfer-workers").value or TRANSFER_WORKERS),
+                                   host_rate=rate_field(self.query_one("#transfer-host-rate").value),
+                                   total_rate=rate_field(self.query_one("#transfer-total-rate").value))
+        except (OSError, ValueError) as e:
+            self.app.notify(f"[bold red]{e}[/bold red]")
+            return
+        table = self.query_one("#transfer-table")
+        table.clear()
+        self.rows = {}
+        for i, item in enumerate(self.job.items):
+            self.rows[i] = table.add_row(item.host, os.path.basename(item.source), "pending", "-", "-")
+        self.query_one("#start").disabled = True
+        self.query_one("#stop").disabled = False
+        job = self.job
+
+        def work():
+            job.run()
+            self.app.call_from_thread(self.finish, job)
+        threading.Thread(target=work, daemon=True).start()
+        self.poll = self.set_interval(0.5, self.refresh_progress)
+
+    def refresh_progress(self):
+        job = self.job
+        if job is None or job.started is None:
+            return
+        table = self.query_one("#transfer-table")
+        _, _, status_col, progress_col, rate_col = self.columns
+        for i, item in enumerate(job.items):
+            style = STATUS_STYLE.get(item.status)
+            status = escape(item.error) if item.status == "failed" else item.status
+            if item.resumed and item.status in ("running", "done"):
+                status += f" (resumed at {item.resumed // 1024} KB)"
+            table.update_cell(self.rows[i], status_col, f"[{style}]{status}[/{style}]" if style else status)
+            if item.size:
+                table.update_cell(self.rows[i], progress_col, f"{item.done * 100 // item.size}%  {item.done / 1e6:.1f}/{item.size / 1e6:.1f} MB")
+            elapsed = item.elapsed or (time.monotonic() - item.started if item.started else 0)
+            if item.status in ("running", "done") and elapsed:
+                table.update_cell(self.rows[i], rate_col, f"{(item.done - item.resumed) / elapsed / 1e6:.1f} MB/s")
+        elapsed = (job.finished or time.monotonic()) - job.started
+        total, done = job.total, job.done
+        rate = done / elapsed if elapsed else 0
+        eta = f"  ETA {(total - done) / rate:.0f}s" if rate and job.finished is None and total > done else ""
+        finished = sum(1 for item in job.items if item.status in ("done", "current"))
+        failed = sum(1 for item in job.items if item.status == "failed")
+        self.query_one("#transfer-summary").update(
+            f"{finished}/{len(job.items)} files done, {failed} failed  |  {done / 1e6:.1f}/{total / 1e6:.1f} MB"
+            f"  {rate / 1e6:.1f} MB/s{eta}")
+
+    def finish(self, job):
+        self.poll.stop()
+        self.refresh_progress()
+        self.query_one("#start").disabled = False
+        self.query_one("#stop").disabled = True
+
+    def on_button_pressed(self, event: Button.Pressed):
+        if event.button.id == "start":
+            self.start()
+        elif event.button.id == "stop":
+            if self.job:
+                self.job.cancel()
+        else:
+            if self.job:
+                self.job.cancel()
+            self.dismiss(None)
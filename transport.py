@@ -0,0 +1,209 @@
+import asyncio
+import functools
+import importlib.util
+import os
+import threading
+import time
+
+from pool import KEEPALIVE, IDLE_TIMEOUT, CONNECT_TIMEOUT
+
+# "paramiko" (threaded, default) or "asyncssh" (runs on Textual's event loop)
+BACKEND = os.environ.get("NEUROSSH_BACKEND", "paramiko")
+# Pending output above which a channel reports itself as not ready to send
+WRITE_LIMIT = 65536
+
+
+def get_backend():
+    """The configured backend, falling back to paramiko if asyncssh is missing."""
+    # Only checks that asyncssh is installed; it is imported on the first connect
+    if BACKEND == "asyncssh" and importlib.util.find_spec("asyncssh") is not None:
+        return "asyncssh"
+    return "paramiko"
+
+
+class AsyncShellChannel:
+    """Paramiko-channel lookalike over an asyncssh channel.
+
+    Lets the rest of the app (key input, broadcast, sequences) treat both
+    backends the same. Writes from other threads are handed to the event loop.
+    """
+
+    def __init__(self, chan, loop):
+        self._chan = chan
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        self.closed = False
+
+    def _call(self, func, *args):
+        if threading.get_ident() == self._loop_thread:
+            func(*args)
+        else:
+            self._loop.call_soon_threadsafe(func, *args)
+
+    def send(self, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._call(self._chan.write, data)
+        return len(data)
+
+    def send_ready(self):
+        return not self.closed and self._chan.get_write_buffer_size() < WRITE_LIMIT
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._call(self._chan.close)
+
+
+@functools.cache
+def _asyncssh_classes():
+    """(TerminalSession, PhaseClient), built on first use so asyncssh is imported lazily."""
+    import asyncssh
+
+    class TerminalSession(asyncssh.SSHClientSession):
+        """Delivers shell output straight to callbacks on the event loop."""
+
+        def __init__(self, on_data, on_close):
+            self.on_data = on_data
+            self.on_close = on_close
+
+        def data_received(self, data, datatype):
+            self.on_data(data)
+
+        def connection_lost(self, exc):
+            self.on_close(exc)
+
+    class PhaseClient(asyncssh.SSHClient):
+        """Notes when the TCP connection is up, before the SSH handshake starts."""
+
+        connected_at = None
+
+        def connection_made(self, conn):
+            self.connected_at = time.perf_counter()
+
+    return TerminalSession, PhaseClient
+
+
+class AsyncConnection:
+    def __init__(self, key, conn, phases=None, via=None):
+        self.key = key
+        self.conn = conn
+        # The bastion's entry when tunnelled through a jump host
+        self.via = via
+        # asyncssh runs key exchange and auth in one step: "handshake" covers both
+        self.phases = phases or {}
+        self.created = time.monotonic()
+        self.channels = 0
+        self.last_used = time.monotonic()
+
+    @property
+    def alive(self):
+        return not self.conn.is_closed()
+
+    def close(self):
+        self.conn.close()
+
+
+class AsyncPool:
+    """asyncssh counterpart of pool.TransportPool: one connection per (host, port, user, jump).
+
+    Everything runs on the event loop, so there are no locks and no threads;
+    concurrent opens to the same target await a single in-flight handshake.
+    Targets behind a jump host tunnel through the bastion's pooled connection.
+    """
+
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, keepalive=KEEPALIVE):
+        self.idle_timeout = idle_timeout
+        self.keepalive = keepalive
+        self.entries = {}
+        self._connecting = {}
+
+    async def acquire(self, host, port, user, password, timeout=CONNECT_TIMEOUT, jump=None):
+        """Return a live pooled connection for the target, connecting if needed."""
+        key = (host, port, user, jump[:3] if jump else None)
+        entry = self.entries.get(key)
+        if entry and entry.alive:
+            return entry
+        if entry:
+            self.discard(entry)
+        # The handshake runs as its own task, so a tab closed mid-connect
+        # doesn't cancel it for the other tabs waiting on the same target
+        task = self._connecting.get(key)
+        if task is None:
+            task = self._connecting[key] = asyncio.ensure_future(self._connect(key, password, timeout, jump))
+            task.add_done_callback(lambda t: self._connected(key, t))
+        return await asyncio.shield(task)
+
+    async def _connect(self, key, password, timeout, jump=None):
+        import asyncssh
+        host, port, user, _ = key
+        client = _asyncssh_classes()[1]()
+        started = time.perf_counter()
+        via = await self.acquire(*jump, timeout=timeout) if jump else None
+        if via:
+            via.channels += 1  # the tunnel keeps the bastion from being evicted
+        try:
+            conn = await asyncio.wait_for(asyncssh.connect(
+                host, port=port, username=user, password=password, client_factory=lambda: client,
+                known_hosts=None, keepalive_interval=self.keepalive, tunnel=via.conn if via else ()), timeout)
+        except BaseException:
+            if via:
+                self.release(via)
+            raise
+        done = time.perf_counter()
+        connected = client.connected_at or started
+        phases = {"tcp": connected - started, "handshake": done - connected}
+        entry = self.entries[key] = AsyncConnection(key, conn, phases, via)
+        return entry
+
+    def _connected(self, key, task):
+        self._connecting.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # consumed by the waiters, or nobody is left to care
+
+    async def open_shell(self, host, port, user, password, on_data, on_close,
+                         term="xterm", width=120, height=40, timeout=CONNECT_TIMEOUT, jump=None):
+        """Open a PTY shell; returns (AsyncShellChannel, pooled connection)."""
+        import asyncssh
+        TerminalSession = _asyncssh_classes()[0]
+        for attempt in range(2):
+            entry = await self.acquire(host, port, user, password, timeout, jump)
+            try:
+                chan, _ = await asyncio.wait_for(entry.conn.create_session(
+                    lambda: TerminalSession(on_data, on_close),
+                    term_type=term, term_size=(width, height), encoding=None), timeout)
+            except (asyncssh.Error, OSError):
+                self.discard(entry)
+                if attempt:
+                    raise
+                continue
+            entry.channels += 1
+            entry.last_used = time.monotonic()
+            return AsyncShellChannel(chan, asyncio.get_running_loop()), entry
+
+    def release(self, entry):
+        entry.channels = max(0, entry.channels - 1)
+        entry.last_used = time.monotonic()
+        if entry.channels == 0:
+            asyncio.get_running_loop().call_later(self.idle_timeout, self._evict, entry)
+
+    def _evict(self, entry):
+        if entry.channels == 0 and time.monotonic() - entry.last_used >= self.idle_timeout:
+            self.discard(entry)
+
+    def discard(self, entry):
+        if self.entries.get(entry.key) is entry:
+            del self.entries[entry.key]
+        entry.close()
+        if entry.via:
+            self.release(entry.via)
+            entry.via = None
+
+    def close_all(self):
+        entries = list(self.entries.values())
+        self.entries.clear()
+        for entry in entries:
+            entry.close()
+
+
+ASYNC_POOL = AsyncPool()
@@ -0,0 +1,355 @@
+import os
+import re
+import sys
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+
+import yaml
+
+from ansi import ANSI, strip_ansi
+from models import BASE_DIR
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+TRIGGERS_FILE = os.path.join(BASE_DIR, "triggers.yaml")
+ACTIONS = ("highlight", "respond", "alert", "capture")
+# SGR parameters for highlight triggers without a style of their own (black on yellow)
+DEFAULT_STYLE = "30;43"
+# Anchors shorter than this hit too often to be worth a prefilter; such
+# patterns are run over every line instead
+MIN_ANCHOR = 2
+# Longest unterminated line carried over to the next chunk
+MAX_LINE = 4096
+# Seconds between the app's checks of triggers.yaml; open tabs switch to the
+# edited rules on the next check
+TRIGGERS_CHECK = 2.0
+
+
+@dataclass
+class Trigger:
+    """One rule from triggers.yaml.
+
+    ``pattern`` is a regular expression matched against one line of output
+    at a time, with escape sequences removed. ``instant`` triggers are also
+    tried on the unterminated last line (prompts such as ``--More--`` or
+    ``Password:`` never get a newline); the rest wait for the line to end,
+    except highlights, which colour text as soon as it arrives.
+    ``tags`` limits a trigger to sessions carrying one of them.
+    """
+    name: str
+    pattern: str
+    action: str = "highlight"
+    style: str = DEFAULT_STYLE
+    response: str = ""
+    ignore_case: bool = False
+    instant: bool = False
+    tags: list = field(default_factory=list)
+
+
+@dataclass
+class TriggerHit:
+    trigger: Trigger
+    line: str
+    match: str
+    groups: dict
+
+
+def anchors(pattern, flags=0):
+    """Literal strings, one per top-level alternative, that every match must contain; None if some branch has none."""
+    parsed = sre_parse.parse(pattern, flags)
+    branches = [parsed]
+    if len(parsed.data) == 1 and parsed.data[0][0] == sre_parse.BRANCH:
+        branches = parsed.data[0][1][1]
+    found = []
+    for branch in branches:
+        best, run = "", []
+        for op, av in list(branch) + [(None, None)]:
+            if op == sre_parse.LITERAL:
+                run.append(chr(av))
+                continue
+            if len(run) > len(best):
+                best = "".join(run)
+            run = []
+        if len(best) < MIN_ANCHOR:
+            return None
+        found.append(best.lower() if flags & re.IGNORECASE else best)
+    return found
+
+
+def trie_pattern(words):
+    """One regex matching any of ``words``, nested as a trie.
+
+    Python's re tries alternatives one by one at every position; a flat
+    ``a|b|c...`` of hundreds of literals crawls, while a trie only follows
+    the branch for the character at hand (an Aho-Corasick style scan,
+    without a compiled extension).
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node):
+        alternatives = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not alternatives:
+            return ""
+        body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+        if "" in node:
+            body = f"(?:{body})?"
+        return body
+    return emit(trie)
+
+
+class TriggerSet:
+    """A compiled group of triggers, shared by every tab using the same ones.
+
+    Each pattern contributes literal anchors (``anchors``); all anchors go
+    into one trie regex per case mode, so a chunk is scanned once no matter
+    how many triggers there are, and a trigger's own regex only runs on the
+    lines where one of its anchors turned up. Patterns without a usable
+    anchor are run over every line.
+    """
+
+    def __init__(self, triggers):
+        self.triggers = triggers
+        self.regexes = []
+        self.owners = ({}, {})    # anchor -> trigger indexes; case-sensitive, folded
+        self.unanchored = []
+        for i, trigger in enumerate(triggers):
+            flags = re.MULTILINE | (re.IGNORECASE if trigger.ignore_case else 0)
+            self.regexes.append(re.compile(trigger.pattern, flags))
+            found = anchors(trigger.pattern, flags)
+            if found is None:
+                self.unanchored.append(i)
+                continue
+            for anchor in found:
+                self.owners[trigger.ignore_case].setdefault(anchor, []).append(i)
+        for owners in self.owners:
+            # The scan reports the longest anchor at each position; shorter
+            # anchors it starts with belong to the same hit
+            for anchor in sorted(owners, key=len, reverse=True):
+                owners[anchor] = sorted({i for n in range(MIN_ANCHOR, len(anchor) + 1)
+                                         for i in owners.get(anchor[:n], ())})
+        # The scanners find lines with an anchor in them; the finders, a
+        # lookahead that also catches overlapping anchors, then list every
+        # anchor on just those lines
+        tries = [trie_pattern(owners) if owners else None for owners in self.owners]
+        self.scanners = [re.compile(trie) if trie else None for trie in tries]
+        self.finders = [re.compile(f"(?=({trie}))") if trie else None for trie in tries]
+
+
+class TriggerScanner:
+    """Per-tab matching state: the unfinished last line and what was already reported on it.
+
+    ``scan(text)`` takes each decoded chunk before it reaches the screen and
+    returns (text with highlight SGR sequences inserted, hits). Only text in
+    the current chunk can still be coloured: a match begun in an earlier one
+    is highlighted from where this chunk starts.
+    """
+
+    def __init__(self, trigger_set):
+        self.set = trigger_set
+        self.carry = ""    # raw text of the unterminated last line
+        self.seen = 0      # stripped length of it already tried by instant triggers
+
+    def scan(self, text):
+        ts = self.set
+        buf = self.carry + text
+        base = len(self.carry)
+        plain = strip_ansi(buf)
+        complete = plain.rfind("\n") + 1    # plain[:complete] are finished lines
+        tried = set()
+        hits, spans = [], []
+
+        def run(i, start, end):
+            if (i, start) in tried:
+                return
+            tried.add((i, start))
+            trigger = ts.triggers[i]
+            highlight = trigger.action == "highlight"
+            if start >= complete and not (trigger.instant or highlight):
+                return  # the line is still arriving
+            for m in ts.regexes[i].finditer(plain, start, end):
+                if highlight:
+                    # Only the part arriving in this chunk gets coloured, so
+                    # matching the same line again later does no harm
+                    if m.end() > m.start():
+                        spans.append((m.start(), m.end(), trigger.style))
+                    continue
+                if m.end() == m.start() or (start == 0 and trigger.instant and m.end() <= self.seen):
+                    continue  # empty, or reported while this line was still arriving
+                # The stretch of the line the match is on, if it was overwritten after a CR
+                line_start = plain.rfind("\r", start, m.start()) + 1 or start
+                line_end = plain.find("\r", m.end(), end)
+                line = plain[line_start:end if line_end < 0 else line_end]
+                hits.append(TriggerHit(trigger, line, m.group(), m.groupdict()))
+                break
+
+        for folded, scanner in enumerate(ts.scanners):
+            if scanner is None:
+                continue
+            hay = plain.lower() if folded else plain
+            owners, finder = ts.owners[folded], ts.finders[folded]
+            m = scanner.search(hay)
+            while m:
+                start = plain.rfind("\n", 0, m.start()) + 1
+                end = plain.find("\n", m.end())
+                end = len(plain) if end < 0 else end
+                for found in finder.finditer(hay, start, end):
+                    for i in owners[found.group(1)]:
+                        run(i, start, end)
+                m = scanner.search(hay, end + 1)
+        if ts.unanchored:
+            start = 0
+            while start < len(plain):
+                end = plain.find("\n", start)
+                end = len(plain) if end < 0 else end
+                for i in ts.unanchored:
+                    run(i, start, end)
+                start = end + 1
+
+        # Escape sequences hold no newlines, so the last line starts at the same one in buf
+        self.carry = buf[buf.rfind("\n") + 1:]
+        self.seen = len(plain) - complete
+        if len(self.carry) > MAX_LINE:
+            self.carry = self.carry[-MAX_LINE:]
+            self.seen = len(strip_ansi(self.carry))
+        if not spans:
+            return text, hits
+        return self._highlight(text, buf, base, spans), hits
+
+    @staticmethod
+    def _offsets(buf):
+        """Where each escape-free stretch of ``buf`` starts in plain offsets, and how much was removed before it."""
+        starts, shifts = [0], [0]
+        removed = 0
+        for m in ANSI.finditer(buf):
+            starts.append(m.start() - removed)
+            removed += m.end() - m.start()
+            shifts.append(removed)
+        return starts, shifts
+
+    @staticmethod
+    def _raw(starts, shifts, offset):
+        return offset + shifts[bisect_right(starts, offset) - 1]
+
+    def _highlight(self, text, buf, base, spans):
+        # The reset after a match also ends whatever colour the remote had set;
+        # SGR has no way to restore the previous attributes
+        starts = shifts = None
+        if "\x1b" in buf:
+            starts, shifts = self._offsets(buf)
+        cuts = []
+        for start, end, style in spans:
+            if starts is not None:
+                start, end = self._raw(starts, shifts, start), self._raw(starts, shifts, end - 1) + 1
+            start, end = max(start - base, 0), end - base
+            if end > 0:
+                cuts.append((start, f"\x1b[{style}m"))
+                cuts.append((end, "\x1b[0m"))
+        out, pos = [], 0
+        for at, sgr in sorted(cuts, key=lambda cut: cut[0]):
+            out.append(text[pos:at])
+            out.append(sgr)
+            pos = at
+        out.append(text[pos:])
+        return "".join(out)
+
+
+class TriggerStore:
+    """triggers.yaml, reloaded when it changes; compiled sets are cached per distinct selection.
+
+    Tabs get a scanner when they open; the app calls ``refresh`` every
+    TRIGGERS_CHECK seconds and hands open tabs new scanners when it
+    reports a change.
+    """
+
+    def __init__(self, path=TRIGGERS_FILE):
+        self.path = path
+        self.triggers = []
+        self.errors = []
+        self._stamp = None
+        self._sets = {}
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def current(self):
+        stamp = self._file_stamp()
+        if stamp != self._stamp:
+            self._stamp = stamp
+            self._sets = {}
+            self.triggers, self.errors = load_triggers(self.path) if stamp else ([], [])
+        return self.triggers
+
+    def refresh(self):
+        """Reload triggers.yaml if it changed on disk; True if it did."""
+        if self._file_stamp() == self._stamp:
+            return False
+        self.current()
+        return True
+
+    def for_config(self, config):
+        """A TriggerScanner for a session, or None if no trigger applies to it."""
+        chosen = tuple(i for i, trigger in enumerate(self.current())
+                       if not trigger.tags or set(trigger.tags) & set(config.tags))
+        if not chosen:
+            return None
+        trigger_set = self._sets.get(chosen)
+        if trigger_set is None:
+            trigger_set = self._sets[chosen] = TriggerSet([self.triggers[i] for i in chosen])
+        return TriggerScanner(trigger_set)
+
+
+def load_triggers(path=TRIGGERS_FILE):
+    """(triggers, errors) from a YAML list; invalid entries are reported and left out."""
+    try:
+        with open(path, "r") as f:
+            entries = yaml.safe_load(f) or []
+    except yaml.YAMLError as e:
+        return [], [f"{path}: {e}"]
+    if not isinstance(entries, list):
+        return [], [f"{path}: expected a list of triggers"]
+    triggers, errors = [], []
+    for n, entry in enumerate(entries):
+        try:
+            trigger = Trigger(**entry)
+            if trigger.action not in ACTIONS:
+                raise ValueError(f"action must be one of {', '.join(ACTIONS)}")
+            re.compile(trigger.pattern)
+        except (TypeError, ValueError, re.error) as e:
+            errors.append(f"trigger {entry.get('name', n + 1) if isinstance(entry, dict) else n + 1}: {e}")
+            continue
+        triggers.append(trigger)
+    return triggers, errors
+
+
+TRIGGERS = TriggerStore()
+
+
+if __name__ == "__main__":
+    # Usage: python triggers.py check [file]   (validate triggers.yaml, list what each anchors on)
+    if len(sys.argv) < 2 or sys.argv[1] != "check":
+        print("usage: python triggers.py check [triggers.yaml]")
+        sys.exit(1)
+    triggers, errors = load_triggers(sys.argv[2] if len(sys.argv) > 2 else TRIGGERS_FILE)
+    for trigger in triggers:
+        found = anchors(trigger.pattern, re.IGNORECASE if trigger.ignore_case else 0)
+        how = ", ".join(repr(a) for a in found) if found else "every line (no literal anchor)"
+        print(f"{trigger.name:<24} {trigger.action:<10} {how}")
+    for error in errors:
+        print(error, file=sys.stderr)
+    started = time.perf_counter()
+    TriggerSet(triggers)
+    print(f"{len(triggers)} triggers compiled in {(time.perf_counter() - started) * 1000:.1f} ms")
+    sys.exit(1 if errors else 0)
@@ -1,6 +1,21 @@
 from cryptography.fernet import Fernet
 import os
 
+def load_master_key():
+    """Master key from $NEUROSSH_VAULT_KEY, else vault.key (created 0600 on first use)."""
+    from models import VAULT_KEY_FILE
+    env = os.environ.get("NEUROSSH_VAULT_KEY")
+    if env:
+        return env.encode()
+    if os.path.exists(VAULT_KEY_FILE):
+        with open(VAULT_KEY_FILE, "rb") as f:
+            return f.read().strip()
+    key = Fernet.generate_key()
+    fd = os.open(VAULT_KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
 class Vault:
     def __init__(self, master_key=None):
         self.key = master_key or Fernet.generate_key()
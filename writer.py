@@ -0,0 +1,109 @@
+import queue
+import threading
+import time
+
+# How long the writer waits after the first keystroke for more to arrive.
+# Short enough to be invisible when typing, long enough that a burst of key
+# events (or a paste) leaves as one write instead of one packet per key.
+COALESCE_WINDOW = 0.004
+# Cap on a single write; larger pastes go out in pieces of this size.
+CHUNK_SIZE = 16384
+# The writer thread exits after this long without input and is restarted on
+# the next keystroke, so idle tabs don't hold a thread.
+IDLE_EXIT = 5.0
+# Poll interval while the remote window is full
+BACKOFF = 0.01
+
+BRACKETED_PASTE = 2004
+PASTE_START = "\x1b[200~"
+PASTE_END = "\x1b[201~"
+
+
+def paste_payload(text, bracketed=False):
+    """Turn clipboard text into what a terminal sends: CR line endings, optionally bracketed."""
+    text = text.replace("\r\n", "\r").replace("\n", "\r")
+    if bracketed:
+        # Strip embedded end markers so pasted text can't break out of the bracket
+        return PASTE_START + text.replace(PASTE_END, "") + PASTE_END
+    return text
+
+
+class ChannelWriter:
+    """Coalesces input for one channel into few, large writes.
+
+    ``write()`` runs on the UI thread and only enqueues. A writer thread picks
+    up the first item, waits ``COALESCE_WINDOW`` for more, and sends the lot
+    in one go; it waits out a full SSH window instead of blocking the UI.
+    With ``pacing`` (milliseconds) set, it pauses after every line for
+    devices that drop input arriving faster than their CLI can read it.
+    ``on_send(size, seconds)`` is called after each coalesced write; every
+    callable in ``taps`` sees the input as it is queued (recordings).
+    """
+
+    def __init__(self, channel, pacing=0, on_send=None):
+        self.channel = channel
+        self.pacing = pacing / 1000
+        self.on_send = on_send
+        self.taps = []
+        self.queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._running = False
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        for tap in self.taps:
+            tap(data)
+        with self._lock:
+            self.queue.put(data)
+            if not self._running:
+                self._running = True
+                threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        while True:
+            try:
+                first = self.queue.get(timeout=IDLE_EXIT)
+            except queue.Empty:
+                with self._lock:
+                    if self.queue.empty():
+                        self._running = False
+                        return
+                continue
+            time.sleep(COALESCE_WINDOW)
+            chunks = [first]
+            while True:
+                try:
+                    chunks.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            payload = b"".join(chunks)
+            started = time.perf_counter()
+            try:
+                self._send(payload)
+                if self.on_send:
+                    self.on_send(len(payload), time.perf_counter() - started)
+            except Exception:
+                pass  # channel died; the reader reports the closed link
+
+    def _send(self, payload):
+        if self.pacing:
+            lines = payload.split(b"\r")
+            for i, line in enumerate(lines):
+                last = i == len(lines) - 1
+                self._send_all(line if last else line + b"\r")
+                if not last:
+                    time.sleep(self.pacing)
+        else:
+            self._send_all(payload)
+
+    def _send_all(self, data):
+        view = memoryview(data)
+        while view:
+            if self.channel.closed:
+                return
+            if not self.channel.send_ready():
+                time.sleep(BACKOFF)
+                continue
+            sent = self.channel.send(bytes(view[:CHUNK_SIZE]))
+            view = view[sent:]